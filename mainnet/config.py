@@ -23,6 +23,7 @@ class MainnetConfig:
     INITIAL_DIFFICULTY = 5  # Fixed difficulty with 4 zeros (00000)
     MAX_DIFFICULTY = 5  # Keep difficulty constant
     BLOCK_REWARD = 50.0
+    MINING_CHUNK_SIZE = 100000  # nonces per worker task when mining in parallel
     HALVING_INTERVAL = 1051200  # blocks (4 years: 4*365*24*30 blocks at 2min intervals)
     
     # Economic Parameters
@@ -64,11 +65,20 @@ class MainnetConfig:
     MAX_INBOUND_CONNECTIONS = 117
     CONNECTION_TIMEOUT = 30
     PING_INTERVAL = 120
+    SOCKET_SEND_BUFFER = 4 * 1024 * 1024  # 4MB
+    SOCKET_RECV_BUFFER = 4 * 1024 * 1024  # 4MB
+    KNOWN_TX_CAPACITY = 10000  # tx ids remembered per peer to avoid re-relaying
+    
+    # Wallet Security
+    PBKDF2_ITERATIONS = 100000  # Applied to new wallets and on password change
     
     # Database and Storage
     DATA_DIR = os.path.expanduser("~/.gsccoin")
     BLOCKCHAIN_FILE = "mainnet_blockchain.json"
+    BLOCK_LOG_FILE = "mainnet_blocks.log"  # Blocks appended since the last full save
     WALLET_DIR = "wallets"
+    WALLET_DB = "wallets.db"
+    WALLET_TOUCH_FLUSH_INTERVAL = 30  # seconds between last_accessed writes
     LOG_DIR = "logs"
     
     # API Configuration
@@ -96,6 +106,11 @@ class MainnetConfig:
         """Get blockchain file path"""
         return os.path.join(cls.get_data_dir(), cls.BLOCKCHAIN_FILE)
     
+    @classmethod
+    def get_block_log_path(cls):
+        """Get append-only block log path"""
+        return os.path.join(cls.get_data_dir(), cls.BLOCK_LOG_FILE)
+    
     @classmethod
     def is_mainnet(cls):
         """Check if running on mainnet"""
@@ -124,6 +139,7 @@ class TestnetConfig(MainnetConfig):
     
     DATA_DIR = os.path.expanduser("~/.gsccoin-testnet")
     BLOCKCHAIN_FILE = "testnet_blockchain.json"
+    BLOCK_LOG_FILE = "testnet_blocks.log"
     
     @classmethod
     def is_mainnet(cls):
@@ -10,9 +10,14 @@ import threading
 import logging
 from datetime import datetime
 from typing import List, Dict, Optional, Tuple
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, fields
+from concurrent.futures import Executor, FIRST_COMPLETED, wait
 import os
 import pickle
+import struct
+import bisect
+import itertools
+from array import array
 from .config import Config
 
 # Set up logging
@@ -26,6 +31,20 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Amounts are signed as integer units of 1e-8 GSC
+AMOUNT_SCALE = 100000000
+
+def _search_nonce(prefix: bytes, suffix: bytes, target: str, start: int, count: int) -> Optional[int]:
+    """Search nonces [start, start + count) for a block hash meeting target"""
+    # Hash the fixed prefix once and resume from that state for every nonce
+    midstate = hashlib.sha256(prefix)
+    for nonce in range(start, start + count):
+        h = midstate.copy()
+        h.update(str(nonce).encode() + suffix)
+        if h.hexdigest().startswith(target):
+            return nonce
+    return None
+
 @dataclass
 class MainnetTransaction:
     """Production-ready transaction class with enhanced validation"""
@@ -45,13 +64,41 @@ class MainnetTransaction:
         if not self.timestamp:
             self.timestamp = time.time()
     
+    def __setattr__(self, name, value):
+        # Any field change invalidates the cached dict
+        object.__setattr__(self, name, value)
+        if name != '_dict_cache':
+            object.__setattr__(self, '_dict_cache', None)
+    
     def calculate_hash(self) -> str:
         """Calculate transaction hash with version and lock_time"""
         tx_string = f"{self.version}{self.sender}{self.receiver}{self.amount}{self.fee}{self.timestamp}{self.lock_time}"
         return hashlib.sha256(tx_string.encode()).hexdigest()
     
+    def canonical_bytes(self) -> bytes:
+        """Fixed binary layout of the signed transaction fields"""
+        sender = self.sender.encode('utf-8')
+        receiver = self.receiver.encode('utf-8')
+        return struct.pack(
+            f">H{len(sender)}sH{len(receiver)}sqqd",
+            len(sender), sender,
+            len(receiver), receiver,
+            round(self.amount * AMOUNT_SCALE),
+            round(self.fee * AMOUNT_SCALE),
+            self.timestamp
+        )
+    
     def to_dict(self) -> dict:
-        return asdict(self)
+        """Field dict, built once and copied on each call (fields are all scalars)"""
+        cached = getattr(self, '_dict_cache', None)  # Absent on transactions unpickled from older saves
+        if cached is None:
+            cached = {name: getattr(self, name) for name in TX_FIELDS}
+            object.__setattr__(self, '_dict_cache', cached)
+        return dict(cached)
+    
+    def to_row(self) -> list:
+        """Field values in TX_FIELDS order, for compact bulk encoding"""
+        return [getattr(self, name) for name in TX_FIELDS]
     
     def is_valid(self) -> Tuple[bool, str]:
         """Enhanced validation with detailed error messages"""
@@ -79,6 +126,9 @@ class MainnetTransaction:
         """Calculate transaction size in bytes"""
         return len(json.dumps(self.to_dict()).encode('utf-8'))
 
+# Transaction field names, in the order used by MainnetTransaction.to_row()
+TX_FIELDS = tuple(f.name for f in fields(MainnetTransaction))
+
 @dataclass
 class MainnetBlock:
     """Production-ready block class with enhanced features"""
@@ -108,8 +158,17 @@ class MainnetBlock:
     
     def calculate_hash(self) -> str:
         """Calculate block hash"""
-        block_string = f"{self.version}{self.index}{self.timestamp}{self.previous_hash}{self.merkle_root}{self.nonce}{self.difficulty}{self.bits}"
-        return hashlib.sha256(block_string.encode()).hexdigest()
+        return hashlib.sha256(self.header_bytes()).hexdigest()
+    
+    def header_bytes(self) -> bytes:
+        """Serialize the hashed header fields"""
+        return f"{self.version}{self.index}{self.timestamp}{self.previous_hash}{self.merkle_root}{self.nonce}{self.difficulty}{self.bits}".encode()
+    
+    def _header_parts(self) -> Tuple[bytes, bytes]:
+        """Header bytes before and after the nonce (see header_bytes)"""
+        prefix = f"{self.version}{self.index}{self.timestamp}{self.previous_hash}{self.merkle_root}".encode()
+        suffix = f"{self.difficulty}{self.bits}".encode()
+        return prefix, suffix
     
     def calculate_merkle_root(self) -> str:
         """Calculate Merkle root with proper binary tree structure"""
@@ -153,6 +212,26 @@ class MainnetBlock:
             'size': self.size
         }
     
+    @classmethod
+    def from_dict(cls, block_data: dict) -> 'MainnetBlock':
+        """Create block from dictionary"""
+        transactions = [
+            MainnetTransaction(**tx_data) 
+            for tx_data in block_data['transactions']
+        ]
+        return cls(
+            index=block_data['index'],
+            timestamp=block_data['timestamp'],
+            transactions=transactions,
+            previous_hash=block_data['previous_hash'],
+            nonce=block_data['nonce'],
+            hash=block_data['hash'],
+            merkle_root=block_data['merkle_root'],
+            difficulty=block_data['difficulty'],
+            miner=block_data['miner'],
+            reward=block_data.get('reward', Config.BLOCK_REWARD)
+        )
+    
     def mine_block(self, difficulty: int, miner_address: str, callback=None) -> dict:
         """Mine block with production-ready proof of work"""
         target = "0" * difficulty
@@ -170,14 +249,21 @@ class MainnetBlock:
         
         logger.info(f"Starting to mine block {self.index} with difficulty {difficulty}")
         
+        # Hash the fixed prefix once and resume from that state for every nonce
+        prefix, suffix = self._header_parts()
+        midstate = hashlib.sha256(prefix)
+        
         while True:
-            self.hash = self.calculate_hash()
+            h = midstate.copy()
+            h.update(str(self.nonce).encode() + suffix)
+            block_hash = h.hexdigest()
             mining_stats['nonce'] = self.nonce
             
             if callback:
                 callback(mining_stats)
             
-            if self.hash.startswith(target):
+            if block_hash.startswith(target):
+                self.hash = block_hash
                 mining_stats['found'] = True
                 mining_stats['end_time'] = time.time()
                 mining_stats['duration'] = mining_stats['end_time'] - mining_stats['start_time']
@@ -194,6 +280,73 @@ class MainnetBlock:
                 mining_stats['hash_rate'] = self.nonce / max(elapsed, 0.001)
         
         return mining_stats
+    
+    def mine_block_parallel(self, difficulty: int, miner_address: str, executor: Executor, 
+                            workers: int, callback=None,
+                            stop_event: Optional[threading.Event] = None) -> Optional[dict]:
+        """Mine block by splitting the nonce search across executor workers;
+        returns None if stop_event is set before a nonce is found"""
+        target = "0" * difficulty
+        mining_stats = {
+            'start_time': time.time(),
+            'nonce': 0,
+            'hash_rate': 0,
+            'found': False,
+            'target': target
+        }
+        
+        self.difficulty = difficulty
+        self.miner = miner_address
+        
+        # The nonce sits between fixed header fields (see header_bytes)
+        prefix, suffix = self._header_parts()
+        chunk = Config.MINING_CHUNK_SIZE
+        
+        logger.info(f"Starting to mine block {self.index} with difficulty {difficulty} on {workers} workers")
+        
+        next_start = 0
+        pending = set()
+        searched = 0
+        found_nonce = None
+        while found_nonce is None:
+            if stop_event is not None and stop_event.is_set():
+                for future in pending:
+                    future.cancel()
+                logger.info(f"Mining of block {self.index} stopped after {searched} nonces")
+                return None
+            
+            while len(pending) < workers:
+                pending.add(executor.submit(_search_nonce, prefix, suffix, target, next_start, chunk))
+                next_start += chunk
+            
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                searched += chunk
+                if result is not None and (found_nonce is None or result < found_nonce):
+                    found_nonce = result
+            
+            elapsed = time.time() - mining_stats['start_time']
+            mining_stats['nonce'] = searched
+            mining_stats['hash_rate'] = searched / max(elapsed, 0.001)
+            if callback:
+                callback(mining_stats)
+        
+        # Stop searching chunks that can no longer matter
+        for future in pending:
+            future.cancel()
+        
+        self.nonce = found_nonce
+        self.hash = self.calculate_hash()
+        
+        mining_stats['found'] = True
+        mining_stats['nonce'] = self.nonce
+        mining_stats['end_time'] = time.time()
+        mining_stats['duration'] = mining_stats['end_time'] - mining_stats['start_time']
+        mining_stats['hash_rate'] = searched / max(mining_stats['duration'], 0.001)
+        
+        logger.info(f"Block {self.index} mined! Hash: {self.hash}, Nonce: {self.nonce}, Time: {mining_stats['duration']:.2f}s")
+        return mining_stats
 
 class MainnetBlockchain:
     """Production-ready GSC blockchain implementation"""
@@ -201,11 +354,19 @@ class MainnetBlockchain:
     def __init__(self):
         self.chain: List[MainnetBlock] = []
         self.mempool: List[MainnetTransaction] = []
+        self.mempool_by_id: Dict[str, MainnetTransaction] = {}  # tx_id -> mempool transaction
+        # Columns parallel to mempool for scans that only need timestamps or fees
+        self.mempool_ts = array('d')
+        self.mempool_fee = array('d')
+        # (-fee_rate, arrival, size, tx) kept sorted, so block templates need no sort
+        self.mempool_by_fee: List[tuple] = []
+        self._mempool_seq = itertools.count()
         self.difficulty = Config.INITIAL_DIFFICULTY
         self.mining_reward = Config.BLOCK_REWARD
         self.balances: Dict[str, float] = {}
         self.utxos: Dict[str, List[dict]] = {}  # Unspent transaction outputs
         self.lock = threading.RLock()
+        self.mempool_cv = threading.Condition(self.lock)  # Notified when the mempool grows
         self.checkpoints: Dict[int, str] = {}  # Block height -> hash checkpoints
         
         # Performance metrics
@@ -282,6 +443,9 @@ class MainnetBlockchain:
             if not is_valid:
                 return False, error_msg
             
+            if transaction.tx_id in self.mempool_by_id:
+                return False, "Transaction already in mempool"
+            
             # Check for double spending
             if self.is_double_spend(transaction):
                 return False, "Double spending detected"
@@ -299,9 +463,33 @@ class MainnetBlockchain:
             
             # Add to mempool
             self.mempool.append(transaction)
+            self.mempool_by_id[transaction.tx_id] = transaction
+            self.mempool_ts.append(transaction.timestamp)
+            self.mempool_fee.append(transaction.fee)
+            tx_size = transaction.get_size()
+            bisect.insort(self.mempool_by_fee, (-transaction.fee / tx_size, next(self._mempool_seq), tx_size, transaction))
+            self.mempool_cv.notify_all()
             logger.info(f"Transaction added to mempool: {transaction.tx_id}")
             return True, "Transaction added to mempool"
     
+    def remove_transactions_from_mempool(self, tx_ids) -> int:
+        """Remove transactions from the mempool by id, rebuilding the list once"""
+        with self.lock:
+            removed = 0
+            for tx_id in tx_ids:
+                if self.mempool_by_id.pop(tx_id, None) is not None:
+                    removed += 1
+            
+            if removed:
+                keep = [i for i, tx in enumerate(self.mempool) if tx.tx_id in self.mempool_by_id]
+                # Slice assignment keeps references to the mempool list valid
+                self.mempool[:] = [self.mempool[i] for i in keep]
+                self.mempool_ts = array('d', [self.mempool_ts[i] for i in keep])
+                self.mempool_fee = array('d', [self.mempool_fee[i] for i in keep])
+                self.mempool_by_fee[:] = [entry for entry in self.mempool_by_fee
+                                          if entry[3].tx_id in self.mempool_by_id]
+            return removed
+    
     def is_double_spend(self, transaction: MainnetTransaction) -> bool:
         """Check if transaction is a double spend"""
         # Check against mempool
@@ -312,7 +500,9 @@ class MainnetBlockchain:
                 return True
         return False
     
-    def mine_pending_transactions(self, miner_address: str, callback=None, force_mine=False) -> MainnetBlock:
+    def mine_pending_transactions(self, miner_address: str, callback=None, force_mine=False,
+                                  executor: Executor = None, workers: int = 1,
+                                  stop_event: Optional[threading.Event] = None) -> MainnetBlock:
         """Mine a new block with pending transactions - only mines if mempool has transactions"""
         with self.lock:
             if not self.mempool and not force_mine:
@@ -350,7 +540,13 @@ class MainnetBlockchain:
             )
             
             # Mine the block
-            mining_stats = new_block.mine_block(self.difficulty, miner_address, callback)
+            if executor is not None:
+                mining_stats = new_block.mine_block_parallel(self.difficulty, miner_address, executor, workers,
+                                                             callback, stop_event)
+                if mining_stats is None:
+                    return None  # Stopped before a nonce was found
+            else:
+                mining_stats = new_block.mine_block(self.difficulty, miner_address, callback)
             
             # Add block to chain
             self.chain.append(new_block)
@@ -359,9 +555,7 @@ class MainnetBlockchain:
             self.update_balances_from_block(new_block)
             
             # Remove mined transactions from mempool
-            for tx in selected_txs:
-                if tx in self.mempool:
-                    self.mempool.remove(tx)
+            self.remove_transactions_from_mempool(tx.tx_id for tx in selected_txs)
             
             # Update metrics
             self.update_metrics(new_block, mining_stats)
@@ -374,14 +568,11 @@ class MainnetBlockchain:
     
     def select_transactions_for_block(self) -> List[MainnetTransaction]:
         """Select transactions for mining (fee priority)"""
-        # Sort by fee per byte (highest first)
-        sorted_txs = sorted(self.mempool, key=lambda tx: tx.fee / tx.get_size(), reverse=True)
-        
+        # mempool_by_fee is already ordered by fee per byte (highest first)
         selected = []
         total_size = 0
         
-        for tx in sorted_txs:
-            tx_size = tx.get_size()
+        for _, _, tx_size, tx in self.mempool_by_fee:
             if (total_size + tx_size <= Config.MAX_BLOCK_SIZE and 
                 len(selected) < Config.MAX_TRANSACTIONS_PER_BLOCK):
                 selected.append(tx)
@@ -469,9 +660,57 @@ class MainnetBlockchain:
             
             return True, "Chain is valid"
     
+    def append_block_to_disk(self, block: MainnetBlock, filename: str = None):
+        """Append a single block to the block log without rewriting the chain"""
+        if not filename:
+            filename = Config.get_block_log_path()
+        
+        record = json.dumps(block.to_dict(), separators=(',', ':')).encode('utf-8')
+        with self.lock:
+            with open(filename, 'ab') as f:
+                f.write(struct.pack('!I', len(record)) + record)
+    
+    def _replay_block_log(self, filename: str = None):
+        """Apply blocks appended to the block log since the last full save"""
+        if not filename:
+            filename = Config.get_block_log_path()
+        
+        if not os.path.exists(filename):
+            return
+        
+        replayed = 0
+        with open(filename, 'rb') as f:
+            while True:
+                header = f.read(4)
+                if len(header) < 4:
+                    break
+                record = f.read(struct.unpack('!I', header)[0])
+                try:
+                    block = MainnetBlock.from_dict(json.loads(record))
+                except (ValueError, KeyError, TypeError) as e:
+                    logger.warning(f"Bad record in block log ({e!r}), stopping replay")
+                    break
+                
+                # Skip blocks already covered by the snapshot
+                if block.index < len(self.chain) and self.chain[block.index].hash == block.hash:
+                    continue
+                
+                if block.index != len(self.chain) or block.previous_hash != self.chain[-1].hash:
+                    logger.warning(f"Block log record {block.index} does not extend the chain "
+                                   f"(height {len(self.chain)}), skipping")
+                    continue
+                
+                self.chain.append(block)
+                self.update_balances_from_block(block)
+                replayed += 1
+        
+        if replayed:
+            logger.info(f"Replayed {replayed} blocks from {filename}")
+    
     def save_blockchain(self, filename: str = None):
         """Save blockchain to file"""
-        if not filename:
+        use_default_path = not filename
+        if use_default_path:
             filename = Config.get_blockchain_path()
         
         with self.lock:
@@ -489,15 +728,23 @@ class MainnetBlockchain:
             with open(filename, 'w') as f:
                 json.dump(blockchain_data, f, indent=2)
             
+            # The full snapshot now covers every logged block
+            if use_default_path:
+                open(Config.get_block_log_path(), 'wb').close()
+            
             logger.info(f"Blockchain saved to {filename}")
     
     def load_blockchain(self, filename: str = None):
         """Load blockchain from file"""
-        if not filename:
+        use_default_path = not filename
+        if use_default_path:
             filename = Config.get_blockchain_path()
         
         if not os.path.exists(filename):
             logger.info("No existing blockchain file found, starting fresh")
+            if use_default_path:
+                with self.lock:
+                    self._replay_block_log()
             return
         
         try:
@@ -513,23 +760,7 @@ class MainnetBlockchain:
                 # Load chain
                 self.chain = []
                 for block_data in data['chain']:
-                    transactions = [
-                        MainnetTransaction(**tx_data) 
-                        for tx_data in block_data['transactions']
-                    ]
-                    block = MainnetBlock(
-                        index=block_data['index'],
-                        timestamp=block_data['timestamp'],
-                        transactions=transactions,
-                        previous_hash=block_data['previous_hash'],
-                        nonce=block_data['nonce'],
-                        hash=block_data['hash'],
-                        merkle_root=block_data['merkle_root'],
-                        difficulty=block_data['difficulty'],
-                        miner=block_data['miner'],
-                        reward=block_data.get('reward', Config.BLOCK_REWARD)
-                    )
-                    self.chain.append(block)
+                    self.chain.append(MainnetBlock.from_dict(block_data))
                 
                 # Load other data
                 self.difficulty = data.get('difficulty', Config.INITIAL_DIFFICULTY)
@@ -537,6 +768,10 @@ class MainnetBlockchain:
                 self.balances = data.get('balances', {})
                 self.metrics = data.get('metrics', self.metrics)
                 self.checkpoints = data.get('checkpoints', {})
+                
+                # Blocks mined after the snapshot was written
+                if use_default_path:
+                    self._replay_block_log()
             
             logger.info(f"Blockchain loaded from {filename} - {len(self.chain)} blocks")
             
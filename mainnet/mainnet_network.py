@@ -3,6 +3,8 @@ GSC Coin Mainnet P2P Network Implementation
 Production-ready networking with enhanced security and reliability
 """
 
+import os
+import sys
 import socket
 import threading
 import json
@@ -12,32 +14,141 @@ import logging
 import ssl
 import select
 from datetime import datetime
-from typing import Dict, List, Set, Optional, Tuple
+from typing import Callable, Dict, List, Set, Optional, Tuple
 import struct
 import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from .config import Config
-from .mainnet_blockchain import MainnetBlockchain, MainnetTransaction, MainnetBlock
+from .mainnet_blockchain import MainnetBlockchain, MainnetTransaction, MainnetBlock, TX_FIELDS
+
+try:
+    from pybloom_live import ScalableBloomFilter
+    BLOOM_AVAILABLE = True
+except ImportError:
+    BLOOM_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+# Segment batching option: TCP_CORK on Linux, TCP_NOPUSH on BSD/macOS
+_TCP_CORK_OPTION = getattr(socket, 'TCP_CORK', None) or getattr(socket, 'TCP_NOPUSH', None)
+
+def tune_socket(sock: socket.socket):
+    """Disable Nagle and enlarge kernel buffers on a peer socket"""
+    try:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, Config.SOCKET_SEND_BUFFER)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, Config.SOCKET_RECV_BUFFER)
+    except OSError as e:
+        logger.debug(f"Failed to tune socket options: {e}")
+
+def verify_block_hashes(blocks: List[MainnetBlock], headers: List[bytes]) -> List[bool]:
+    """Check a batch of pre-serialized block headers against their claimed hashes"""
+    sha256 = hashlib.sha256
+    return [
+        sha256(header).hexdigest() == block.hash
+        for block, header in zip(blocks, headers)
+    ]
+
+class RecentIds:
+    """Bounded set of ids, forgetting the oldest first (fallback when pybloom_live is missing)"""
+    
+    __slots__ = ('ids', 'order')
+    
+    def __init__(self, capacity: int):
+        self.ids: Set[str] = set()
+        self.order = deque(maxlen=capacity)
+    
+    def __contains__(self, item: str) -> bool:
+        return item in self.ids
+    
+    def add(self, item: str):
+        if item in self.ids:
+            return
+        if len(self.order) == self.order.maxlen:
+            self.ids.discard(self.order[0])
+        self.order.append(item)
+        self.ids.add(item)
+
+class KnownTxFilter:
+    """Per-peer set of known tx ids, safe to share between reader, validator and broadcast threads"""
+    
+    __slots__ = ('_ids', '_lock')
+    
+    def __init__(self, ids):
+        self._ids = ids  # ScalableBloomFilter or RecentIds
+        self._lock = threading.Lock()
+    
+    def __contains__(self, item: str) -> bool:
+        with self._lock:
+            return item in self._ids
+    
+    def add(self, item: str):
+        with self._lock:
+            self._ids.add(item)
+    
+    def add_if_new(self, item: str) -> bool:
+        """Add an id, returning True only for the one caller that added it first"""
+        with self._lock:
+            if item in self._ids:
+                return False
+            self._ids.add(item)
+            return True
+
+PROTOCOL_VERSION = 2
+COMPACT_MEMPOOL_VERSION = 2  # First protocol version that reads field/row mempool dumps
+
+def encode_mempool(transactions: List[MainnetTransaction], compact: bool = True) -> dict:
+    """MEMPOOL payload: field names once plus one value list per transaction,
+    or the older list of transaction dicts for peers that predate it"""
+    if compact:
+        return {'fields': TX_FIELDS, 'rows': [tx.to_row() for tx in transactions]}
+    return {'transactions': [tx.to_dict() for tx in transactions]}
+
+def peer_reads_compact_mempool(peer: 'PeerConnection') -> bool:
+    """Whether the peer advertised a protocol version that reads field/row dumps"""
+    return (peer.version or 0) >= COMPACT_MEMPOOL_VERSION
+
+def is_mempool_request(payload: dict) -> bool:
+    """A MEMPOOL message without transactions asks for ours; otherwise it carries theirs"""
+    return 'rows' not in payload and 'transactions' not in payload
+
+def decode_mempool(payload: dict) -> List[dict]:
+    """Transaction dicts from a MEMPOOL payload in the compact or the older dict format"""
+    if 'rows' in payload:
+        names = payload.get('fields', TX_FIELDS)
+        return [dict(zip(names, row)) for row in payload['rows']]
+    return payload.get('transactions', [])
+
+def new_known_tx_filter():
+    """Create the per-peer filter of transaction ids the peer already has"""
+    if BLOOM_AVAILABLE:
+        return KnownTxFilter(ScalableBloomFilter(initial_capacity=Config.KNOWN_TX_CAPACITY, error_rate=0.001))
+    return KnownTxFilter(RecentIds(Config.KNOWN_TX_CAPACITY))
+
 class NetworkMessage:
     """Network message protocol for GSC mainnet"""
     
-    # Message types
-    VERSION = "version"
-    VERACK = "verack"
-    PING = "ping"
-    PONG = "pong"
-    GETBLOCKS = "getblocks"
-    BLOCKS = "blocks"
-    GETTX = "gettx"
-    TX = "tx"
-    MEMPOOL = "mempool"
-    PEERS = "peers"
-    DISCONNECT = "disconnect"
+    __slots__ = ('type', 'payload', 'timestamp', 'checksum')
+    
+    # Message types. Interned, so the == checks in dispatch usually succeed on the
+    # pointer check alone; keep them as ==, since `is` would silently miss any
+    # type string that was not interned
+    VERSION = sys.intern("version")
+    VERACK = sys.intern("verack")
+    PING = sys.intern("ping")
+    PONG = sys.intern("pong")
+    GETBLOCKS = sys.intern("getblocks")
+    BLOCKS = sys.intern("blocks")
+    GETTX = sys.intern("gettx")
+    TX = sys.intern("tx")
+    MEMPOOL = sys.intern("mempool")
+    PEERS = sys.intern("peers")
+    DISCONNECT = sys.intern("disconnect")
     
     def __init__(self, msg_type: str, payload: dict = None):
-        self.type = msg_type
+        self.type = sys.intern(msg_type)
         self.payload = payload or {}
         self.timestamp = time.time()
         self.checksum = self.calculate_checksum()
@@ -59,7 +170,7 @@ class NetworkMessage:
             'timestamp': self.timestamp,
             'checksum': self.checksum
         }
-        json_data = json.dumps(data).encode('utf-8')
+        json_data = json.dumps(data, separators=(',', ':')).encode('utf-8')
         compressed = zlib.compress(json_data)
         
         # Add length prefix
@@ -75,6 +186,7 @@ class NetworkMessage:
             
             msg = cls(msg_data['type'], msg_data['payload'])
             msg.timestamp = msg_data['timestamp']
+            msg.checksum = msg.calculate_checksum()  # Over the sender's timestamp
             
             # Verify checksum
             if msg.checksum != msg_data['checksum']:
@@ -88,9 +200,17 @@ class NetworkMessage:
 class PeerConnection:
     """Represents a connection to a peer node"""
     
+    __slots__ = (
+        'socket', 'address', 'addr_str', 'is_outbound', 'connected_at', 'last_ping', 'last_pong',
+        'version', 'user_agent', 'services', 'height', 'relay', 'bytes_sent',
+        'bytes_received', 'messages_sent', 'messages_received', 'lock', 'send_queue',
+        'is_alive', 'known_tx', 'last_full_send', 'last_mempool_req'
+    )
+    
     def __init__(self, socket_conn: socket.socket, address: Tuple[str, int], is_outbound: bool = False):
         self.socket = socket_conn
         self.address = address
+        self.addr_str = f"{address[0]}:{address[1]}"  # Same form as the node's peers keys
         self.is_outbound = is_outbound
         self.connected_at = time.time()
         self.last_ping = 0
@@ -107,15 +227,21 @@ class PeerConnection:
         self.lock = threading.Lock()
         self.send_queue = []
         self.is_alive = True
+        self.known_tx = new_known_tx_filter()  # tx ids sent to or received from this peer
+        self.last_full_send = 0.0  # Last time our full mempool was sent to this peer
+        self.last_mempool_req = 0.0  # Last time we asked this peer for its mempool
     
     def send_message(self, message: NetworkMessage) -> bool:
         """Send message to peer"""
+        return self.send_raw(message.to_bytes())
+    
+    def send_raw(self, data: bytes) -> bool:
+        """Send an already serialized message to peer"""
         try:
             with self.lock:
                 if not self.is_alive:
                     return False
                 
-                data = message.to_bytes()
                 self.socket.sendall(data)
                 self.bytes_sent += len(data)
                 self.messages_sent += 1
@@ -162,6 +288,50 @@ class PeerConnection:
             data += chunk
         return data
     
+    def queue_message(self, data: bytes) -> bool:
+        """Queue a serialized message for the next batched flush"""
+        with self.lock:
+            if self.is_alive:
+                self.send_queue.append(data)
+            return self.is_alive
+    
+    def flush_send_queue(self) -> bool:
+        """Write all queued messages with a single corked send"""
+        try:
+            with self.lock:
+                if not self.send_queue or not self.is_alive:
+                    return self.is_alive
+                
+                batch, self.send_queue = self.send_queue, []
+                data = b''.join(batch)
+                with self.corked():
+                    self.socket.sendall(data)
+                self.bytes_sent += len(data)
+                self.messages_sent += len(batch)
+                return True
+        except Exception as e:
+            logger.error(f"Failed to flush messages to {self.address}: {e}")
+            self.disconnect()
+            return False
+    
+    @contextmanager
+    def corked(self):
+        """Hold back partial segments while sending a burst of messages (caller holds self.lock)"""
+        self._set_cork(1)
+        try:
+            yield self
+        finally:
+            self._set_cork(0)
+    
+    def _set_cork(self, value: int):
+        """Toggle TCP_CORK/TCP_NOPUSH where the platform supports it"""
+        if _TCP_CORK_OPTION is None or not self.is_alive:
+            return
+        try:
+            self.socket.setsockopt(socket.IPPROTO_TCP, _TCP_CORK_OPTION, value)
+        except OSError:
+            pass
+    
     def ping(self):
         """Send ping to peer"""
         self.last_ping = time.time()
@@ -205,7 +375,7 @@ class MainnetNetworkNode:
         self.blockchain = blockchain
         self.port = port or Config.DEFAULT_PORT
         self.node_id = self.generate_node_id()
-        self.version = 1
+        self.version = PROTOCOL_VERSION
         self.user_agent = f"GSC-Core:1.0.0"
         self.services = 1  # NODE_NETWORK
         
@@ -219,6 +389,14 @@ class MainnetNetworkNode:
         # Threading
         self.lock = threading.RLock()
         self.threads: List[threading.Thread] = []
+        self._validator: Optional[ThreadPoolExecutor] = None
+        self._block_sequencer: Optional[ThreadPoolExecutor] = None
+        self._send_event = threading.Event()  # Set when peer send queues need flushing
+        
+        # Called with the peer's address after each mempool dump is processed
+        self.on_mempool_received: Optional[Callable[[str], None]] = None
+        # Called with (tx_id, peer address) for each transaction a peer adds to our mempool
+        self.on_peer_transaction: Optional[Callable[[str, str], None]] = None
         
         # Network statistics
         self.stats = {
@@ -254,6 +432,18 @@ class MainnetNetworkNode:
         self.running = True
         logger.info(f"Starting GSC mainnet node on port {self.port}")
         
+        # Worker pool for block reconstruction and validation
+        self._validator = ThreadPoolExecutor(
+            max_workers=os.cpu_count() or 1,
+            thread_name_prefix="gsc-validator"
+        )
+        # Single worker so synced blocks reach the chain in received order,
+        # and waiting on validator results never ties up a validator worker
+        self._block_sequencer = ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix="gsc-block-sequencer"
+        )
+        
         # Start server thread
         server_thread = threading.Thread(target=self._run_server, daemon=True)
         server_thread.start()
@@ -264,6 +454,11 @@ class MainnetNetworkNode:
         maintenance_thread.start()
         self.threads.append(maintenance_thread)
         
+        # Start queued-send flusher thread
+        send_thread = threading.Thread(target=self._send_loop, daemon=True)
+        send_thread.start()
+        self.threads.append(send_thread)
+        
         # Connect to seed nodes
         self._connect_to_seeds()
     
@@ -274,6 +469,7 @@ class MainnetNetworkNode:
         
         logger.info("Stopping GSC mainnet node")
         self.running = False
+        self._send_event.set()
         
         # Disconnect all peers
         with self.lock:
@@ -292,12 +488,21 @@ class MainnetNetworkNode:
         for thread in self.threads:
             if thread.is_alive():
                 thread.join(timeout=5)
+        
+        if self._validator:
+            self._validator.shutdown(wait=False, cancel_futures=True)
+            self._validator = None
+        if self._block_sequencer:
+            self._block_sequencer.shutdown(wait=False, cancel_futures=True)
+            self._block_sequencer = None
     
     def _run_server(self):
         """Run the P2P server"""
         try:
             self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            # Buffer sizes set on the listener are inherited by accepted sockets
+            tune_socket(self.server_socket)
             self.server_socket.bind(('0.0.0.0', self.port))
             self.server_socket.listen(Config.MAX_INBOUND_CONNECTIONS)
             
@@ -309,6 +514,7 @@ class MainnetNetworkNode:
                     ready, _, _ = select.select([self.server_socket], [], [], 1.0)
                     if ready:
                         client_socket, address = self.server_socket.accept()
+                        tune_socket(client_socket)
                         self._handle_incoming_connection(client_socket, address)
                 except socket.timeout:
                     continue
@@ -371,6 +577,7 @@ class MainnetNetworkNode:
         try:
             # Create socket connection
             sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            tune_socket(sock)
             sock.settimeout(Config.CONNECTION_TIMEOUT)
             sock.connect((host, port))
             
@@ -399,7 +606,7 @@ class MainnetNetworkNode:
     
     def _handle_peer(self, peer: PeerConnection):
         """Handle communication with a peer"""
-        peer_key = f"{peer.address[0]}:{peer.address[1]}"
+        peer_key = peer.addr_str
         
         try:
             # Send version message
@@ -452,7 +659,10 @@ class MainnetNetworkNode:
             elif message.type == NetworkMessage.TX:
                 self._handle_transaction(peer, message)
             elif message.type == NetworkMessage.MEMPOOL:
-                self._handle_mempool_request(peer, message)
+                if is_mempool_request(message.payload):
+                    self._handle_mempool_request(peer, message)
+                else:
+                    self._handle_mempool(peer, message)
             elif message.type == NetworkMessage.PEERS:
                 self._handle_peers(peer, message)
             else:
@@ -508,33 +718,59 @@ class MainnetNetworkNode:
     def _handle_blocks(self, peer: PeerConnection, message: NetworkMessage):
         """Handle incoming blocks"""
         blocks_data = message.payload.get('blocks', [])
+        if not blocks_data:
+            return
         
-        for block_data in blocks_data:
+        validator = self._validator
+        sequencer = self._block_sequencer
+        if validator is None or sequencer is None:
+            # Node not started (or stopping) - process inline
+            prepared = []
+            for block_data in blocks_data:
+                try:
+                    prepared.append(self._prepare_block(block_data))
+                except Exception as e:
+                    logger.error(f"Failed to process block: {e}")
+            self._add_synced_blocks(prepared)
+            return
+        
+        # Reconstruct blocks in parallel so the peer loop keeps reading;
+        # the sequencer adds each message's blocks in received order
+        futures = [validator.submit(self._prepare_block, block_data) for block_data in blocks_data]
+        sequencer.submit(self._add_prepared_blocks, futures)
+    
+    def _prepare_block(self, block_data: dict) -> Tuple[MainnetBlock, bytes]:
+        """Reconstruct a block and pre-serialize its header for hash checks"""
+        block = MainnetBlock.from_dict(block_data)
+        return block, block.header_bytes()
+    
+    def _add_prepared_blocks(self, futures: list):
+        """Wait for one message's reconstructed blocks, then add them in order"""
+        prepared = []
+        for future in futures:
+            try:
+                prepared.append(future.result())
+            except Exception as e:
+                logger.error(f"Failed to process block: {e}")
+        self._add_synced_blocks(prepared)
+    
+    def _add_synced_blocks(self, prepared: List[Tuple[MainnetBlock, bytes]]):
+        """Verify block hashes as a batch, then validate and add each block in order"""
+        if not prepared:
+            return
+        
+        blocks, headers = zip(*prepared)
+        for block, hash_ok in zip(blocks, verify_block_hashes(blocks, headers)):
+            if not hash_ok:
+                logger.warning(f"Rejected block {block.index} from peer - hash mismatch")
+                continue
+            
             try:
-                # Reconstruct block
-                transactions = [
-                    MainnetTransaction(**tx_data) 
-                    for tx_data in block_data['transactions']
-                ]
-                
-                block = MainnetBlock(
-                    index=block_data['index'],
-                    timestamp=block_data['timestamp'],
-                    transactions=transactions,
-                    previous_hash=block_data['previous_hash'],
-                    nonce=block_data['nonce'],
-                    hash=block_data['hash'],
-                    merkle_root=block_data['merkle_root'],
-                    difficulty=block_data['difficulty'],
-                    miner=block_data['miner'],
-                    reward=block_data.get('reward', Config.BLOCK_REWARD)
-                )
-                
                 # Validate and add block
                 if self._validate_and_add_block(block):
-                    self.stats['blocks_synced'] += 1
+                    with self.lock:
+                        self.stats['blocks_synced'] += 1
                     logger.info(f"Synced block {block.index} from peer")
-                
             except Exception as e:
                 logger.error(f"Failed to process block: {e}")
     
@@ -543,20 +779,27 @@ class MainnetNetworkNode:
         try:
             tx_data = message.payload.get('transaction')
             if tx_data:
-                transaction = MainnetTransaction(**tx_data)
-                success, msg = self.blockchain.add_transaction_to_mempool(transaction)
-                if success:
-                    self.stats['transactions_relayed'] += 1
-                    logger.info(f"Added transaction {transaction.tx_id} to mempool from peer {peer.address[0]}")
-                    # Immediately relay to all other peers for network-wide mempool sync
-                    self._relay_transaction(transaction, exclude_peer=peer)
-                    # Notify about new transaction for mining
-                    self._notify_new_transaction(transaction)
-                else:
+                success, msg = self._accept_peer_transaction(peer, MainnetTransaction(**tx_data))
+                if not success:
                     logger.warning(f"Failed to add transaction to mempool: {msg}")
         except Exception as e:
             logger.error(f"Failed to process transaction: {e}")
     
+    def _accept_peer_transaction(self, peer: PeerConnection, transaction: MainnetTransaction) -> Tuple[bool, str]:
+        """Add a transaction received from a peer to the mempool and relay it if new"""
+        peer.known_tx.add(transaction.tx_id)
+        success, msg = self.blockchain.add_transaction_to_mempool(transaction)
+        if success:
+            self.stats['transactions_relayed'] += 1
+            logger.info(f"Added transaction {transaction.tx_id} to mempool from peer {peer.address[0]}")
+            if self.on_peer_transaction:
+                self.on_peer_transaction(transaction.tx_id, peer.addr_str)
+            # Immediately relay to all other peers for network-wide mempool sync
+            self._relay_transaction(transaction, exclude_peer=peer)
+            # Notify about new transaction for mining
+            self._notify_new_transaction(transaction)
+        return success, msg
+    
     def _notify_new_transaction(self, transaction: MainnetTransaction):
         """Notify about new transaction for potential mining trigger"""
         logger.info(f"New transaction available for mining: {transaction.tx_id} ({transaction.amount} GSC)")
@@ -564,9 +807,28 @@ class MainnetNetworkNode:
     
     def _handle_mempool_request(self, peer: PeerConnection, message: NetworkMessage):
         """Handle mempool request"""
-        mempool_data = [tx.to_dict() for tx in self.blockchain.mempool]
-        mempool_msg = NetworkMessage(NetworkMessage.MEMPOOL, {'transactions': mempool_data})
-        peer.send_message(mempool_msg)
+        payload = encode_mempool(self.blockchain.mempool, compact=peer_reads_compact_mempool(peer))
+        peer.send_message(NetworkMessage(NetworkMessage.MEMPOOL, payload))
+    
+    def _handle_mempool(self, peer: PeerConnection, message: NetworkMessage):
+        """Handle a peer's mempool dump"""
+        added = 0
+        for tx_data in decode_mempool(message.payload):
+            try:
+                success, msg = self._accept_peer_transaction(peer, MainnetTransaction(**tx_data))
+            except Exception as e:
+                logger.error(f"Failed to process transaction: {e}")
+                continue
+            if success:
+                added += 1
+            else:
+                logger.debug(f"Skipped mempool transaction from peer: {msg}")
+        
+        if added:
+            logger.info(f"Added {added} transactions from {peer.addr_str} mempool")
+        
+        if self.on_mempool_received:
+            self.on_mempool_received(peer.addr_str)
     
     def _handle_peers(self, peer: PeerConnection, message: NetworkMessage):
         """Handle peers list"""
@@ -594,16 +856,22 @@ class MainnetNetworkNode:
             self.blockchain.chain.append(block)
             self.blockchain.update_balances_from_block(block)
             
+            # Log it like a mined block so a crash before the next full save
+            # doesn't break replay of anything mined on top of it
+            self.blockchain.append_block_to_disk(block)
+            
             return True
     
     def _relay_transaction(self, transaction: MainnetTransaction, exclude_peer: PeerConnection = None):
         """Relay transaction to other peers"""
-        tx_msg = NetworkMessage(NetworkMessage.TX, {'transaction': transaction.to_dict()})
+        data = self.encode_message(NetworkMessage(NetworkMessage.TX, {'transaction': transaction.to_dict()}))
         
+        # Snapshot peers under the lock and send without holding it
         with self.lock:
-            for peer in self.peers.values():
-                if peer != exclude_peer and peer.relay:
-                    peer.send_message(tx_msg)
+            candidates = [peer for peer in self.peers.values() if peer != exclude_peer and peer.relay]
+        
+        targets = [peer for peer in candidates if peer.known_tx.add_if_new(transaction.tx_id)]
+        self.broadcast_batch(data, targets)
     
     def _connect_to_seeds(self):
         """Connect to seed nodes"""
@@ -651,15 +919,55 @@ class MainnetNetworkNode:
                 logger.error(f"Maintenance error: {e}")
                 time.sleep(60)
     
+    @staticmethod
+    def encode_message(message: NetworkMessage) -> bytes:
+        """Serialize a message once so it can be sent to many peers"""
+        return message.to_bytes()
+    
     def broadcast_block(self, block: MainnetBlock):
         """Broadcast new block to all peers"""
-        block_msg = NetworkMessage(NetworkMessage.BLOCKS, {'blocks': [block.to_dict()]})
+        data = self.encode_message(NetworkMessage(NetworkMessage.BLOCKS, {'blocks': [block.to_dict()]}))
         
+        # Snapshot peers under the lock and send without holding it; a single
+        # frame gains nothing from corking (flush_send_queue corks batches)
         with self.lock:
-            for peer in self.peers.values():
-                peer.send_message(block_msg)
+            peers = list(self.peers.values())
+        
+        sent = sum(1 for peer in peers if peer.send_raw(data))
+        logger.info(f"Broadcasted block {block.index} to {sent} peers")
+    
+    def broadcast_block_async(self, block: MainnetBlock):
+        """Queue a new block for all peers; the send loop flushes it in corked batches"""
+        data = self.encode_message(NetworkMessage(NetworkMessage.BLOCKS, {'blocks': [block.to_dict()]}))
+        
+        with self.lock:
+            peers = list(self.peers.values())
+        
+        queued = self.broadcast_batch(data, peers)
+        logger.info(f"Queued block {block.index} for {queued} peers")
+    
+    def broadcast_batch(self, payload: bytes, peers: List[PeerConnection]) -> int:
+        """Hand one serialized message to the send loop for many peers at once"""
+        if not self.running:
+            # No send loop to flush the queues; write directly
+            return sum(1 for peer in peers if peer.send_raw(payload))
         
-        logger.info(f"Broadcasted block {block.index} to {len(self.peers)} peers")
+        queued = sum(1 for peer in peers if peer.queue_message(payload))
+        if queued:
+            self._send_event.set()
+        return queued
+    
+    def _send_loop(self):
+        """Flush queued peer messages whenever new ones are available"""
+        while self.running:
+            self._send_event.wait()
+            self._send_event.clear()
+            
+            with self.lock:
+                peers = list(self.peers.values())
+            
+            for peer in peers:
+                peer.flush_send_queue()
     
     def request_blocks(self, start_height: int, max_blocks: int = 500):
         """Request blocks from peers"""
@@ -5,11 +5,12 @@ Production-ready blockchain node with full functionality
 
 import os
 import sys
-import time
 import signal
 import logging
 import threading
 import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from typing import Optional
 from .config import Config, MainnetConfig, TestnetConfig
 from .mainnet_blockchain import MainnetBlockchain
@@ -28,7 +29,11 @@ class MainnetNode:
         self.wallet_manager = MainnetWalletManager()
         self.running = False
         self.mining_thread = None
+        self.mining_pool: Optional[ProcessPoolExecutor] = None
+        self.mining_workers = os.cpu_count() or 1
         self.is_mining = False
+        self._mining_stop = threading.Event()  # Set to abandon the block being mined
+        self._stop_event = threading.Event()
         
         # Set up logging
         self._setup_logging()
@@ -59,6 +64,7 @@ class MainnetNode:
             return
         
         self.running = True
+        self._stop_event.clear()
         logger.info(f"Starting GSC {self.config.NETWORK_NAME} node...")
         
         # Start network
@@ -74,11 +80,14 @@ class MainnetNode:
         
         # Keep node running
         try:
-            while self.running:
-                time.sleep(1)
+            self.wait_for_stop()
         except KeyboardInterrupt:
             self.stop()
     
+    def wait_for_stop(self):
+        """Block until the node is stopped"""
+        self._stop_event.wait()
+    
     def stop(self):
         """Stop the blockchain node"""
         if not self.running:
@@ -86,6 +95,7 @@ class MainnetNode:
         
         logger.info("Stopping GSC node...")
         self.running = False
+        self._stop_event.set()
         
         # Stop mining
         if self.is_mining:
@@ -97,6 +107,9 @@ class MainnetNode:
         # Save blockchain
         self.blockchain.save_blockchain()
         
+        # Persist pending wallet updates
+        self.wallet_manager.flush()
+        
         logger.info("GSC node stopped")
     
     def _signal_handler(self, signum, frame):
@@ -116,6 +129,14 @@ class MainnetNode:
             return
         
         self.is_mining = True
+        self._mining_stop.clear()
+        
+        # Nonce search runs in worker processes so it is not serialized on the GIL
+        self.mining_pool = ProcessPoolExecutor(
+            max_workers=self.mining_workers,
+            mp_context=multiprocessing.get_context('spawn')
+        )
+        
         self.mining_thread = threading.Thread(
             target=self._mining_loop,
             args=(miner_address,),
@@ -131,9 +152,14 @@ class MainnetNode:
             return
         
         self.is_mining = False
+        self._mining_stop.set()
         if self.mining_thread and self.mining_thread.is_alive():
             self.mining_thread.join(timeout=5)
         
+        if self.mining_pool:
+            self.mining_pool.shutdown(wait=False, cancel_futures=True)
+            self.mining_pool = None
+        
         logger.info("Stopped mining")
     
     def _mining_loop(self, miner_address: str):
@@ -142,28 +168,34 @@ class MainnetNode:
             try:
                 # Check if there are transactions to mine
                 if not self.blockchain.mempool:
-                    time.sleep(5)
+                    self._mining_stop.wait(5)
                     continue
                 
                 # Mine a new block
+                height = len(self.blockchain.chain)
+                
                 def mining_callback(stats):
                     if stats['nonce'] % 10000 == 0:
-                        logger.debug(f"Mining block {len(self.blockchain.chain)}: nonce={stats['nonce']}, rate={stats['hash_rate']:.0f} H/s")
+                        logger.debug("Mining block %d: nonce=%d, rate=%.0f H/s", height, stats['nonce'], stats['hash_rate'])
                 
-                new_block = self.blockchain.mine_pending_transactions(miner_address, mining_callback)
+                new_block = self.blockchain.mine_pending_transactions(
+                    miner_address, mining_callback,
+                    executor=self.mining_pool, workers=self.mining_workers,
+                    stop_event=self._mining_stop
+                )
                 
                 if new_block:
                     logger.info(f"Mined block {new_block.index}! Hash: {new_block.hash}")
                     
-                    # Broadcast to network
-                    self.network.broadcast_block(new_block)
+                    # Broadcast to network (flushed by the network send loop)
+                    self.network.broadcast_block_async(new_block)
                     
-                    # Save blockchain
-                    self.blockchain.save_blockchain()
+                    # Persist just the new block; stop() writes the full snapshot
+                    self.blockchain.append_block_to_disk(new_block)
                 
             except Exception as e:
                 logger.error(f"Mining error: {e}")
-                time.sleep(10)
+                self._mining_stop.wait(10)
     
     def get_status(self) -> dict:
         """Get node status information"""
@@ -210,8 +242,7 @@ def main():
             node.start_mining(args.mine)
         
         # Keep running
-        while node.running:
-            time.sleep(1)
+        node.wait_for_stop()
             
     except KeyboardInterrupt:
         node.stop()
@@ -8,32 +8,92 @@ import json
 import hashlib
 import secrets
 import base64
+import functools
 import time
 import logging
-from typing import Dict, List, Optional, Tuple
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes, serialization
-from cryptography.hazmat.primitives.asymmetric import rsa, padding
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from cryptography.hazmat.primitives.asymmetric import padding, ed25519
 import mnemonic
 from .config import Config
 from .mainnet_blockchain import MainnetTransaction
 
 logger = logging.getLogger(__name__)
 
+# PBKDF2-HMAC-SHA256 rounds used by wallets saved before the count was stored
+_PBKDF2_ITERS = 100000
+
+# Number of derived keys kept in memory across unlocks
+_KEY_CACHE_SIZE = 16
+
+# Wallet key format: 1 = RSA-2048 PEM keys (legacy), 2 = Ed25519 raw keys
+_WALLET_VERSION = 2
+
+# Hash and padding parameters for legacy RSA signatures, built once
+_SHA256 = hashes.SHA256()
+_RSA_PSS_PADDING = padding.PSS(mgf=padding.MGF1(_SHA256), salt_length=padding.PSS.MAX_LENGTH)
+
+# Wallet storage table; key material is stored as raw bytes
+_WALLET_COLUMNS = (
+    'name', 'version', 'address', 'public_key', 'private_key', 'encrypted_priv', 'salt',
+    'is_encrypted', 'created_at', 'last_accessed', 'failed_attempts', 'locked_until',
+    'backup_created', 'tx_history', 'iterations'
+)
+
+_WALLET_SCHEMA = """
+CREATE TABLE IF NOT EXISTS wallets (
+    name TEXT PRIMARY KEY,
+    version INTEGER,
+    address TEXT,
+    public_key BLOB,
+    private_key BLOB,
+    encrypted_priv BLOB,
+    salt BLOB,
+    is_encrypted INTEGER,
+    created_at REAL,
+    last_accessed REAL,
+    failed_attempts INTEGER,
+    locked_until REAL,
+    backup_created INTEGER,
+    tx_history BLOB,
+    iterations INTEGER
+)
+"""
+
+@functools.lru_cache(maxsize=4096)
+def _load_public_key(public_key: bytes):
+    """Load a raw Ed25519 public key or a PEM encoded (RSA or Ed25519) key (cached per key)"""
+    if len(public_key) == 32:
+        return ed25519.Ed25519PublicKey.from_public_bytes(public_key)
+    return serialization.load_pem_public_key(public_key)
+
 class MainnetWallet:
     """Production-ready wallet with enhanced security"""
     
+    # Fernet instances by blake2b(salt + password), shared across wallets in the process
+    _key_cache: 'OrderedDict[bytes, Fernet]' = OrderedDict()
+    _key_cache_lock = threading.Lock()
+    
     def __init__(self, name: str, password: str = None):
         self.name = name
+        self.version = _WALLET_VERSION
         self.address = ""
         self.private_key = None
         self.public_key = None
         self.encrypted_private_key = None
         self.salt = None
+        self.iterations = Config.PBKDF2_ITERATIONS
+        self._private_key_obj = None  # Parsed key, kept while unlocked
+        self._public_key_obj = None
         self.is_encrypted = False
         self.created_at = time.time()
         self.last_accessed = time.time()
+        self.history_path: Optional[str] = None  # Append-only JSON lines file, set by the manager
         self.transaction_history = []
         
         # Security features
@@ -48,48 +108,58 @@ class MainnetWallet:
         else:
             self._generate_keys()
     
+    @property
+    def transaction_history(self) -> List[dict]:
+        """Transaction history, read from the history file on first access"""
+        if self._transaction_history is None:
+            history = []
+            if self.history_path and os.path.exists(self.history_path):
+                with open(self.history_path, 'r') as f:
+                    history = [json.loads(line) for line in f if line.strip()]
+            self._transaction_history = history
+        return self._transaction_history
+    
+    @transaction_history.setter
+    def transaction_history(self, history: Optional[List[dict]]):
+        self._transaction_history = history
+    
     def _generate_keys(self):
-        """Generate RSA key pair for the wallet"""
+        """Generate Ed25519 key pair for the wallet"""
         # Generate private key
-        private_key = rsa.generate_private_key(
-            public_exponent=65537,
-            key_size=2048
-        )
+        private_key = ed25519.Ed25519PrivateKey.generate()
         
         # Get public key
         public_key = private_key.public_key()
         
-        # Serialize keys
-        private_pem = private_key.private_bytes(
-            encoding=serialization.Encoding.PEM,
-            format=serialization.PrivateFormat.PKCS8,
+        # Serialize keys (32 raw bytes each)
+        private_raw = private_key.private_bytes(
+            encoding=serialization.Encoding.Raw,
+            format=serialization.PrivateFormat.Raw,
             encryption_algorithm=serialization.NoEncryption()
         )
         
-        public_pem = public_key.public_bytes(
-            encoding=serialization.Encoding.PEM,
-            format=serialization.PublicFormat.SubjectPublicKeyInfo
+        public_raw = public_key.public_bytes(
+            encoding=serialization.Encoding.Raw,
+            format=serialization.PublicFormat.Raw
         )
         
-        self.private_key = private_pem
-        self.public_key = public_pem
+        self.private_key = private_raw
+        self.public_key = public_raw
+        self._private_key_obj = private_key
+        self._public_key_obj = public_key
         
         # Generate address from public key
-        self.address = self._generate_address(public_pem)
+        self.address = self._generate_address(public_raw)
         
         logger.info(f"Generated new wallet keys for {self.name}")
     
     def _generate_address(self, public_key_pem: bytes) -> str:
         """Generate wallet address from public key"""
         # Hash the public key
-        digest = hashes.Hash(hashes.SHA256())
-        digest.update(public_key_pem)
-        hash1 = digest.finalize()
+        hash1 = hashlib.sha256(public_key_pem).digest()
         
         # Hash again with RIPEMD160 (simplified with SHA256)
-        digest2 = hashes.Hash(hashes.SHA256())
-        digest2.update(hash1)
-        hash2 = digest2.finalize()
+        hash2 = hashlib.sha256(hash1).digest()
         
         # Take first 20 bytes and encode as GSC address
         address_bytes = hash2[:20]
@@ -99,17 +169,15 @@ class MainnetWallet:
     
     def _encrypt_private_key(self, password: str):
         """Encrypt private key with password"""
-        # Generate salt
+        # Any key cached for the old salt/password is no longer valid
+        self._forget_cached_key()
+        
+        # Generate salt (and move to the current iteration count)
         self.salt = secrets.token_bytes(32)
+        self.iterations = Config.PBKDF2_ITERATIONS
         
         # Derive key from password
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=self.salt,
-            iterations=100000,
-        )
-        key = base64.urlsafe_b64encode(kdf.derive(password.encode()))
+        key = self._derive_key(password)
         
         # Encrypt private key
         fernet = Fernet(key)
@@ -117,9 +185,37 @@ class MainnetWallet:
         
         # Clear plaintext private key
         self.private_key = None
+        self._private_key_obj = None
         
         logger.info(f"Private key encrypted for wallet {self.name}")
     
+    def _derive_key(self, password: str) -> bytes:
+        """Derive the Fernet key for this wallet's salt from a password"""
+        derived = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), self.salt, self.iterations, dklen=32)
+        return base64.urlsafe_b64encode(derived)
+    
+    def _cache_key(self, password: str) -> bytes:
+        """Fast lookup key for a salt/password pair"""
+        return hashlib.blake2b(self.salt + password.encode('utf-8'), digest_size=32).digest()
+    
+    def _remember_key(self, cache_key: bytes, fernet: Fernet):
+        """Store a ready Fernet instance, evicting the least recently used entry"""
+        cache = MainnetWallet._key_cache
+        with MainnetWallet._key_cache_lock:
+            cache[cache_key] = fernet
+            cache.move_to_end(cache_key)
+            while len(cache) > _KEY_CACHE_SIZE:
+                cache.popitem(last=False)
+        self._cached_key_id = cache_key
+    
+    def _forget_cached_key(self):
+        """Drop this wallet's Fernet instance from the cache"""
+        cache_key = getattr(self, '_cached_key_id', None)
+        if cache_key is not None:
+            with MainnetWallet._key_cache_lock:
+                MainnetWallet._key_cache.pop(cache_key, None)
+            self._cached_key_id = None
+    
     def unlock(self, password: str) -> bool:
         """Unlock encrypted wallet"""
         if not self.is_encrypted:
@@ -132,18 +228,19 @@ class MainnetWallet:
             return False
         
         try:
-            # Derive key from password
-            kdf = PBKDF2HMAC(
-                algorithm=hashes.SHA256(),
-                length=32,
-                salt=self.salt,
-                iterations=100000,
-            )
-            key = base64.urlsafe_b64encode(kdf.derive(password.encode()))
+            # Reuse the Fernet for this password if present, otherwise derive it
+            cache_key = self._cache_key(password)
+            with MainnetWallet._key_cache_lock:
+                fernet = MainnetWallet._key_cache.get(cache_key)
+                if fernet is not None:
+                    MainnetWallet._key_cache.move_to_end(cache_key)
+            if fernet is None:
+                fernet = Fernet(self._derive_key(password))
             
             # Decrypt private key
-            fernet = Fernet(key)
             self.private_key = fernet.decrypt(self.encrypted_private_key)
+            self._private_key_obj = self._parse_private_key()
+            self._remember_key(cache_key, fernet)
             
             # Reset failed attempts
             self.failed_attempts = 0
@@ -167,31 +264,38 @@ class MainnetWallet:
         """Lock the wallet by clearing private key"""
         if self.is_encrypted:
             self.private_key = None
+            self._private_key_obj = None
+            self._forget_cached_key()
             logger.info(f"Wallet {self.name} locked")
     
+    def _parse_private_key(self):
+        """Load the private key object from its stored bytes"""
+        if self.version >= 2:
+            return ed25519.Ed25519PrivateKey.from_private_bytes(self.private_key)
+        # Legacy RSA wallet
+        return serialization.load_pem_private_key(self.private_key, password=None)
+    
     def sign_transaction(self, transaction: MainnetTransaction) -> str:
         """Sign a transaction with the wallet's private key"""
         if not self.private_key:
             raise ValueError("Wallet is locked or not initialized")
         
-        # Load private key
-        private_key = serialization.load_pem_private_key(
-            self.private_key,
-            password=None
-        )
-        
-        # Create transaction data to sign
-        tx_data = f"{transaction.sender}{transaction.receiver}{transaction.amount}{transaction.fee}{transaction.timestamp}"
+        # Load private key once per unlock
+        if self._private_key_obj is None:
+            self._private_key_obj = self._parse_private_key()
+        private_key = self._private_key_obj
         
         # Sign the transaction
-        signature = private_key.sign(
-            tx_data.encode(),
-            padding.PSS(
-                mgf=padding.MGF1(hashes.SHA256()),
-                salt_length=padding.PSS.MAX_LENGTH
-            ),
-            hashes.SHA256()
-        )
+        if self.version >= 2:
+            signature = private_key.sign(transaction.canonical_bytes())
+        else:
+            # Legacy RSA wallets keep signing the original string form
+            tx_data = f"{transaction.sender}{transaction.receiver}{transaction.amount}{transaction.fee}{transaction.timestamp}"
+            signature = private_key.sign(
+                tx_data.encode(),
+                _RSA_PSS_PADDING,
+                _SHA256
+            )
         
         # Return base64 encoded signature
         return base64.b64encode(signature).decode('ascii')
@@ -199,29 +303,28 @@ class MainnetWallet:
     def verify_signature(self, transaction: MainnetTransaction, signature: str, public_key_pem: bytes = None) -> bool:
         """Verify transaction signature"""
         try:
-            # Use provided public key or wallet's public key
+            # Use provided public key or wallet's (cached) public key
             if public_key_pem is None:
-                public_key_pem = self.public_key
-            
-            # Load public key
-            public_key = serialization.load_pem_public_key(public_key_pem)
-            
-            # Create transaction data
-            tx_data = f"{transaction.sender}{transaction.receiver}{transaction.amount}{transaction.fee}{transaction.timestamp}"
+                if self._public_key_obj is None:
+                    self._public_key_obj = _load_public_key(self.public_key)
+                public_key = self._public_key_obj
+            else:
+                public_key = _load_public_key(public_key_pem)
             
             # Decode signature
             signature_bytes = base64.b64decode(signature.encode('ascii'))
             
             # Verify signature
-            public_key.verify(
-                signature_bytes,
-                tx_data.encode(),
-                padding.PSS(
-                    mgf=padding.MGF1(hashes.SHA256()),
-                    salt_length=padding.PSS.MAX_LENGTH
-                ),
-                hashes.SHA256()
-            )
+            if isinstance(public_key, ed25519.Ed25519PublicKey):
+                public_key.verify(signature_bytes, transaction.canonical_bytes())
+            else:
+                tx_data = f"{transaction.sender}{transaction.receiver}{transaction.amount}{transaction.fee}{transaction.timestamp}"
+                public_key.verify(
+                    signature_bytes,
+                    tx_data.encode(),
+                    _RSA_PSS_PADDING,
+                    _SHA256
+                )
             
             return True
             
@@ -237,13 +340,14 @@ class MainnetWallet:
             'public_key': base64.b64encode(self.public_key).decode('ascii'),
             'created_at': self.created_at,
             'backup_created_at': time.time(),
-            'version': 1
+            'version': self.version
         }
         
         if self.is_encrypted:
             backup_data.update({
                 'encrypted_private_key': base64.b64encode(self.encrypted_private_key).decode('ascii'),
                 'salt': base64.b64encode(self.salt).decode('ascii'),
+                'iterations': self.iterations,
                 'is_encrypted': True
             })
         else:
@@ -259,6 +363,7 @@ class MainnetWallet:
     def to_dict(self) -> dict:
         """Convert wallet to dictionary for storage"""
         wallet_data = {
+            'version': self.version,
             'name': self.name,
             'address': self.address,
             'public_key': base64.b64encode(self.public_key).decode('ascii'),
@@ -274,7 +379,8 @@ class MainnetWallet:
         if self.is_encrypted:
             wallet_data.update({
                 'encrypted_private_key': base64.b64encode(self.encrypted_private_key).decode('ascii'),
-                'salt': base64.b64encode(self.salt).decode('ascii')
+                'salt': base64.b64encode(self.salt).decode('ascii'),
+                'iterations': self.iterations
             })
         else:
             wallet_data.update({
@@ -283,29 +389,88 @@ class MainnetWallet:
         
         return wallet_data
     
+    def to_row(self) -> tuple:
+        """Convert wallet to a wallets table row (ordered as _WALLET_COLUMNS)"""
+        return (
+            self.name,
+            self.version,
+            self.address,
+            self.public_key,
+            None if self.is_encrypted else self.private_key,
+            self.encrypted_private_key if self.is_encrypted else None,
+            self.salt if self.is_encrypted else None,
+            int(self.is_encrypted),
+            self.created_at,
+            self.last_accessed,
+            self.failed_attempts,
+            self.locked_until,
+            int(self.backup_created),
+            None,  # tx_history lives in the history file
+            self.iterations
+        )
+    
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> 'MainnetWallet':
+        """Create wallet from a wallets table row"""
+        wallet = cls.__new__(cls)
+        wallet.name = row['name']
+        wallet.version = row['version']
+        wallet.address = row['address']
+        wallet.public_key = row['public_key']
+        wallet._private_key_obj = None
+        wallet._public_key_obj = None
+        wallet.is_encrypted = bool(row['is_encrypted'])
+        wallet.created_at = row['created_at']
+        wallet.last_accessed = row['last_accessed']
+        wallet.failed_attempts = row['failed_attempts']
+        wallet.locked_until = row['locked_until']
+        wallet.backup_created = bool(row['backup_created'])
+        wallet.history_path = None
+        # Rows written before history moved out of the database still carry it
+        wallet.transaction_history = json.loads(row['tx_history']) if row['tx_history'] else None
+        
+        if wallet.is_encrypted:
+            wallet.encrypted_private_key = row['encrypted_priv']
+            wallet.salt = row['salt']
+            wallet.iterations = row['iterations'] or _PBKDF2_ITERS
+            wallet.private_key = None
+        else:
+            wallet.private_key = row['private_key']
+            wallet.encrypted_private_key = None
+            wallet.salt = None
+            wallet.iterations = Config.PBKDF2_ITERATIONS
+        
+        return wallet
+    
     @classmethod
     def from_dict(cls, data: dict) -> 'MainnetWallet':
         """Create wallet from dictionary"""
         wallet = cls.__new__(cls)
         wallet.name = data['name']
+        wallet.version = data.get('version', 1)
         wallet.address = data['address']
         wallet.public_key = base64.b64decode(data['public_key'].encode('ascii'))
+        wallet._private_key_obj = None
+        wallet._public_key_obj = None
         wallet.is_encrypted = data['is_encrypted']
         wallet.created_at = data['created_at']
         wallet.last_accessed = data['last_accessed']
         wallet.failed_attempts = data.get('failed_attempts', 0)
         wallet.locked_until = data.get('locked_until', 0)
         wallet.backup_created = data.get('backup_created', False)
+        wallet.history_path = None
         wallet.transaction_history = data.get('transaction_history', [])
         
         if wallet.is_encrypted:
             wallet.encrypted_private_key = base64.b64decode(data['encrypted_private_key'].encode('ascii'))
             wallet.salt = base64.b64decode(data['salt'].encode('ascii'))
+            wallet.iterations = data.get('iterations', _PBKDF2_ITERS)
             wallet.private_key = None
         else:
             wallet.private_key = base64.b64decode(data['private_key'].encode('ascii'))
             wallet.encrypted_private_key = None
             wallet.salt = None
+            wallet.iterations = Config.PBKDF2_ITERATIONS
         
         return wallet
 
@@ -320,26 +485,85 @@ class MainnetWalletManager:
         # Ensure wallet directory exists
         os.makedirs(self.wallet_dir, exist_ok=True)
         
+        # Open wallet database
+        self.db_path = os.path.join(self.wallet_dir, Config.WALLET_DB)
+        self.db_lock = threading.Lock()
+        self.db = self._open_db()
+        
+        # Wallets whose last_accessed changed since the last flush
+        self._touched: Set[str] = set()
+        self._touch_timer: Optional[threading.Timer] = None
+        
         # Load existing wallets
         self._load_wallets()
     
+    def _open_db(self) -> sqlite3.Connection:
+        """Open (and create if needed) the wallet database"""
+        db = sqlite3.connect(self.db_path, check_same_thread=False)
+        db.row_factory = sqlite3.Row
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute(_WALLET_SCHEMA)
+        
+        # Databases created before iteration counts were stored
+        columns = {row['name'] for row in db.execute("PRAGMA table_info(wallets)")}
+        if 'iterations' not in columns:
+            db.execute("ALTER TABLE wallets ADD COLUMN iterations INTEGER")
+        db.commit()
+        return db
+    
     def _load_wallets(self):
         """Load wallets from disk"""
         try:
-            for filename in os.listdir(self.wallet_dir):
-                if filename.endswith('.wallet'):
-                    wallet_path = os.path.join(self.wallet_dir, filename)
-                    with open(wallet_path, 'r') as f:
-                        wallet_data = json.load(f)
-                    
-                    wallet = MainnetWallet.from_dict(wallet_data)
-                    self.wallets[wallet.name] = wallet
-                    
+            with self.db_lock:
+                rows = self.db.execute("SELECT * FROM wallets").fetchall()
+            
+            for row in rows:
+                wallet = MainnetWallet.from_row(row)
+                self.wallets[wallet.name] = wallet
+                if self._attach_history(wallet):
+                    # Rewrite the row without the embedded history
+                    self._save_wallet(wallet)
+            
+            # Move wallets still stored as per-wallet JSON files into the database
+            self._import_json_wallets()
+            
             logger.info(f"Loaded {len(self.wallets)} wallets")
             
         except Exception as e:
             logger.error(f"Failed to load wallets: {e}")
     
+    def _import_json_wallets(self):
+        """Import legacy .wallet JSON files into the wallet database"""
+        with os.scandir(self.wallet_dir) as entries:
+            wallet_paths = [
+                entry.path for entry in entries
+                if entry.name.endswith('.wallet') and entry.is_file()
+            ]
+        if not wallet_paths:
+            return
+        
+        # File reads and JSON parsing run in parallel; database writes stay on this thread
+        workers = min(32, (os.cpu_count() or 1) * 4, len(wallet_paths))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            loaded = list(executor.map(self._read_json_wallet, wallet_paths))
+        
+        for wallet_path, wallet in zip(wallet_paths, loaded):
+            if wallet.name not in self.wallets:
+                self.wallets[wallet.name] = wallet
+                self._save_wallet(wallet)
+                logger.info(f"Imported wallet {wallet.name} into {Config.WALLET_DB}")
+            
+            # Keep the original file, but stop loading it
+            os.replace(wallet_path, wallet_path + '.migrated')
+    
+    @staticmethod
+    def _read_json_wallet(wallet_path: str) -> MainnetWallet:
+        """Load a single legacy .wallet JSON file"""
+        with open(wallet_path, 'r') as f:
+            wallet_data = json.load(f)
+        return MainnetWallet.from_dict(wallet_data)
+    
     def create_wallet(self, name: str, password: str = None) -> MainnetWallet:
         """Create a new wallet"""
         if name in self.wallets:
@@ -371,13 +595,15 @@ class MainnetWalletManager:
         
         self.current_wallet = wallet
         wallet.last_accessed = time.time()
-        self._save_wallet(wallet)
+        self._touch_wallet(wallet)
         
         logger.info(f"Opened wallet: {name}")
         return wallet
     
     def close_wallet(self, name: str = None):
         """Close a wallet"""
+        self.flush()
+        
         if name:
             if name in self.wallets:
                 self.wallets[name].lock()
@@ -400,10 +626,11 @@ class MainnetWalletManager:
             if not password or not wallet.unlock(password):
                 raise ValueError("Invalid password")
         
-        # Remove wallet file
-        wallet_path = os.path.join(self.wallet_dir, f"{name}.wallet")
-        if os.path.exists(wallet_path):
-            os.remove(wallet_path)
+        # Remove wallet record and history
+        with self.db_lock, self.db:
+            self.db.execute("DELETE FROM wallets WHERE name = ?", (name,))
+        if wallet.history_path and os.path.exists(wallet.history_path):
+            os.remove(wallet.history_path)
         
         # Remove from memory
         del self.wallets[name]
@@ -414,12 +641,60 @@ class MainnetWalletManager:
         logger.info(f"Deleted wallet: {name}")
         return True
     
+    def _attach_history(self, wallet: MainnetWallet) -> bool:
+        """Give the wallet its history file, moving any in-memory history into it"""
+        if wallet.history_path is not None:
+            return False
+        
+        wallet.history_path = os.path.join(self.wallet_dir, f"{wallet.name}.history.jsonl")
+        pending = wallet._transaction_history
+        if not pending:
+            return False
+        
+        with open(wallet.history_path, 'a') as f:
+            f.writelines(json.dumps(tx, separators=(',', ':')) + '\n' for tx in pending)
+        return True
+    
     def _save_wallet(self, wallet: MainnetWallet):
         """Save wallet to disk"""
-        wallet_path = os.path.join(self.wallet_dir, f"{wallet.name}.wallet")
+        self._attach_history(wallet)
         
-        with open(wallet_path, 'w') as f:
-            json.dump(wallet.to_dict(), f, indent=2)
+        columns = ', '.join(_WALLET_COLUMNS)
+        placeholders = ', '.join('?' * len(_WALLET_COLUMNS))
+        
+        with self.db_lock, self.db:
+            self.db.execute(
+                f"INSERT OR REPLACE INTO wallets ({columns}) VALUES ({placeholders})",
+                wallet.to_row()
+            )
+            # The full row already carries last_accessed
+            self._touched.discard(wallet.name)
+    
+    def _touch_wallet(self, wallet: MainnetWallet):
+        """Schedule the wallet's last_accessed time to be persisted"""
+        with self.db_lock:
+            self._touched.add(wallet.name)
+            if self._touch_timer is None:
+                self._touch_timer = threading.Timer(Config.WALLET_TOUCH_FLUSH_INTERVAL, self.flush)
+                self._touch_timer.daemon = True
+                self._touch_timer.start()
+    
+    def flush(self):
+        """Write pending last_accessed updates to disk"""
+        with self.db_lock:
+            if self._touch_timer is not None:
+                self._touch_timer.cancel()
+                self._touch_timer = None
+            
+            updates = [
+                (self.wallets[name].last_accessed, name)
+                for name in self._touched if name in self.wallets
+            ]
+            self._touched.clear()
+            
+            if updates:
+                with self.db:
+                    self.db.executemany("UPDATE wallets SET last_accessed = ? WHERE name = ?", updates)
     
     def list_wallets(self) -> List[str]:
         """List all wallet names"""
@@ -475,31 +750,19 @@ class MainnetWalletManager:
         if name in self.wallets:
             raise ValueError(f"Wallet '{name}' already exists")
         
-        # Create wallet from backup
-        wallet = MainnetWallet.__new__(MainnetWallet)
-        wallet.name = name
-        wallet.address = backup_data['address']
-        wallet.public_key = base64.b64decode(backup_data['public_key'].encode('ascii'))
-        wallet.is_encrypted = backup_data['is_encrypted']
-        wallet.created_at = backup_data['created_at']
-        wallet.last_accessed = time.time()
-        wallet.failed_attempts = 0
-        wallet.locked_until = 0
-        wallet.backup_created = True
-        wallet.transaction_history = []
-        
-        if wallet.is_encrypted:
-            wallet.encrypted_private_key = base64.b64decode(backup_data['encrypted_private_key'].encode('ascii'))
-            wallet.salt = base64.b64decode(backup_data['salt'].encode('ascii'))
-            wallet.private_key = None
-            
-            # Unlock if password provided
-            if password:
-                wallet.unlock(password)
-        else:
-            wallet.private_key = base64.b64decode(backup_data['private_key'].encode('ascii'))
-            wallet.encrypted_private_key = None
-            wallet.salt = None
+        # Create wallet from backup (keys are decoded once, by from_dict)
+        wallet = MainnetWallet.from_dict({
+            **backup_data,
+            'last_accessed': time.time(),
+            'failed_attempts': 0,
+            'locked_until': 0,
+            'backup_created': True,
+            'transaction_history': []
+        })
+        
+        # Unlock if password provided
+        if wallet.is_encrypted and password:
+            wallet.unlock(password)
         
         # Add to manager
         self.wallets[name] = wallet
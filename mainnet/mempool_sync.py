@@ -6,12 +6,17 @@ Real-time mempool sharing across all network nodes
 import time
 import threading
 import logging
+from array import array
+from collections import OrderedDict
 from typing import Dict, List, Set
 from .mainnet_blockchain import MainnetTransaction
-from .mainnet_network import MainnetNetworkNode, NetworkMessage
+from .mainnet_network import MainnetNetworkNode, NetworkMessage, encode_mempool, peer_reads_compact_mempool
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on tracked transaction sources/propagation times
+MAX_TRACKED_TRANSACTIONS = 100000
+
 class MempoolSyncManager:
     """Manages mempool synchronization across the network"""
     
@@ -22,12 +27,17 @@ class MempoolSyncManager:
         self.sync_thread = None
         
         # Track transaction propagation
-        self.transaction_sources: Dict[str, str] = {}  # tx_id -> source_peer
-        self.propagation_times: Dict[str, float] = {}  # tx_id -> timestamp
+        self.transaction_sources: 'OrderedDict[str, str]' = OrderedDict()  # tx_id -> source_peer
+        self.propagation_times: 'OrderedDict[str, float]' = OrderedDict()  # tx_id -> timestamp
         
         # Sync settings
         self.sync_interval = 30  # seconds
         self.max_mempool_age = 3600  # 1 hour
+        self.mempool_request_interval = 120  # per peer, seconds
+        self.full_mempool_interval = 300  # per peer, seconds
+        self._sync_ack = threading.Event()  # Set when a peer's mempool arrives
+        network.on_mempool_received = self._on_mempool_received
+        network.on_peer_transaction = self._record_tx
         
     def start(self):
         """Start mempool synchronization"""
@@ -70,41 +80,60 @@ class MempoolSyncManager:
                 logger.error(f"Mempool sync error: {e}")
                 time.sleep(60)
     
-    def _request_mempool_from_peers(self):
+    def _request_mempool_from_peers(self, force: bool = False):
         """Request mempool from all connected peers"""
-        mempool_request = NetworkMessage(NetworkMessage.MEMPOOL, {})
+        payload = self.network.encode_message(NetworkMessage(NetworkMessage.MEMPOOL, {}))
         
+        # Snapshot peers under the lock and send without holding it
+        now = time.time()
         with self.network.lock:
-            for peer in self.network.peers.values():
-                if peer.is_alive:
-                    peer.send_message(mempool_request)
+            due = [peer for peer in self.network.peers.values()
+                   if peer.is_alive and (force or now - peer.last_mempool_req >= self.mempool_request_interval)]
+        
+        for peer in due:
+            peer.last_mempool_req = now
+            peer.send_raw(payload)
     
     def _clean_old_transactions(self):
         """Remove old transactions from mempool"""
-        current_time = time.time()
+        cutoff = time.time() - self.max_mempool_age
         
         with self.blockchain.lock:
-            old_transactions = []
-            for tx in self.blockchain.mempool:
-                if current_time - tx.timestamp > self.max_mempool_age:
-                    old_transactions.append(tx)
-            
-            for tx in old_transactions:
-                self.blockchain.mempool.remove(tx)
-                logger.info(f"Removed old transaction from mempool: {tx.tx_id}")
+            mempool = self.blockchain.mempool
+            old_tx_ids = [mempool[i].tx_id for i, ts in enumerate(self.blockchain.mempool_ts)
+                          if ts < cutoff]
+            if old_tx_ids:
+                self.blockchain.remove_transactions_from_mempool(old_tx_ids)
+        
+        # Log outside the lock
+        for tx_id in old_tx_ids:
+            self.transaction_sources.pop(tx_id, None)
+            self.propagation_times.pop(tx_id, None)
+            logger.info(f"Removed old transaction from mempool: {tx_id}")
     
     def _broadcast_mempool_to_new_peers(self):
         """Broadcast our mempool to newly connected peers"""
         if not self.blockchain.mempool:
             return
             
-        mempool_data = [tx.to_dict() for tx in self.blockchain.mempool]
-        mempool_msg = NetworkMessage(NetworkMessage.MEMPOOL, {'transactions': mempool_data})
-        
+        now = time.time()
         with self.network.lock:
-            for peer in self.network.peers.values():
-                if peer.is_alive and time.time() - peer.connected_at < 60:  # New peer
-                    peer.send_message(mempool_msg)
+            new_peers = [peer for peer in self.network.peers.values()
+                         if peer.is_alive and peer.connected_at > now - 60
+                         and now - peer.last_full_send >= self.full_mempool_interval]
+        
+        if not new_peers:
+            return
+        
+        # Encode each payload shape at most once, only if some peer needs it
+        payloads = {}
+        for peer in new_peers:
+            compact = peer_reads_compact_mempool(peer)
+            if compact not in payloads:
+                message = NetworkMessage(NetworkMessage.MEMPOOL, encode_mempool(self.blockchain.mempool, compact))
+                payloads[compact] = self.network.encode_message(message)
+            peer.last_full_send = now
+            peer.send_raw(payloads[compact])
     
     def add_transaction_to_network(self, transaction: MainnetTransaction) -> bool:
         """Add transaction to local mempool and broadcast to network"""
@@ -114,8 +143,7 @@ class MempoolSyncManager:
             
             if success:
                 # Record transaction details
-                self.transaction_sources[transaction.tx_id] = "local"
-                self.propagation_times[transaction.tx_id] = time.time()
+                self._record_tx(transaction.tx_id, "local")
                 
                 # Broadcast to all peers immediately
                 self._broadcast_transaction(transaction)
@@ -130,16 +158,24 @@ class MempoolSyncManager:
             logger.error(f"Error adding transaction to network: {e}")
             return False
     
+    def _record_tx(self, tx_id: str, source: str):
+        """Remember where a transaction came from, forgetting the oldest entries past the cap"""
+        self.transaction_sources[tx_id] = source
+        self.propagation_times[tx_id] = time.time()
+        
+        while len(self.transaction_sources) > MAX_TRACKED_TRANSACTIONS:
+            old_tx_id, _ = self.transaction_sources.popitem(last=False)
+            self.propagation_times.pop(old_tx_id, None)
+    
     def _broadcast_transaction(self, transaction: MainnetTransaction):
         """Broadcast transaction to all connected peers"""
-        tx_msg = NetworkMessage(NetworkMessage.TX, {'transaction': transaction.to_dict()})
+        payload = self.network.encode_message(NetworkMessage(NetworkMessage.TX, {'transaction': transaction.to_dict()}))
         
-        broadcast_count = 0
         with self.network.lock:
-            for peer in self.network.peers.values():
-                if peer.is_alive:
-                    if peer.send_message(tx_msg):
-                        broadcast_count += 1
+            alive = [peer for peer in self.network.peers.values() if peer.is_alive]
+        
+        targets = [peer for peer in alive if peer.known_tx.add_if_new(transaction.tx_id)]
+        broadcast_count = self.network.broadcast_batch(payload, targets)
         
         logger.info(f"Broadcasted transaction {transaction.tx_id} to {broadcast_count} peers")
     
@@ -147,18 +183,21 @@ class MempoolSyncManager:
         """Handle incoming mempool data from peer"""
         added_count = 0
         
+        seen_ids: Set[str] = set()
+        source = self.network.peers.get(peer_address)
+        
         for tx_data in transactions:
             try:
                 transaction = MainnetTransaction(**tx_data)
+                if source is not None:
+                    source.known_tx.add(transaction.tx_id)
                 
-                # Check if we already have this transaction
-                existing_tx = any(tx.tx_id == transaction.tx_id for tx in self.blockchain.mempool)
-                
-                if not existing_tx:
+                # Skip transactions we already have (or saw earlier in this batch)
+                if transaction.tx_id not in self.blockchain.mempool_by_id and transaction.tx_id not in seen_ids:
+                    seen_ids.add(transaction.tx_id)
                     success, _ = self.blockchain.add_transaction_to_mempool(transaction)
                     if success:
-                        self.transaction_sources[transaction.tx_id] = peer_address
-                        self.propagation_times[transaction.tx_id] = time.time()
+                        self._record_tx(transaction.tx_id, peer_address)
                         added_count += 1
                         
                         # Relay to other peers (except source)
@@ -167,20 +206,25 @@ class MempoolSyncManager:
             except Exception as e:
                 logger.error(f"Error processing mempool transaction: {e}")
         
+        self._sync_ack.set()
+        
         if added_count > 0:
             logger.info(f"Added {added_count} new transactions from peer {peer_address}")
     
+    def _on_mempool_received(self, peer_address: str):
+        """Network hook: a peer's mempool dump has been processed"""
+        self._sync_ack.set()
+    
     def _relay_transaction_except_source(self, transaction: MainnetTransaction, source_peer: str):
         """Relay transaction to all peers except the source"""
-        tx_msg = NetworkMessage(NetworkMessage.TX, {'transaction': transaction.to_dict()})
+        payload = self.network.encode_message(NetworkMessage(NetworkMessage.TX, {'transaction': transaction.to_dict()}))
         
-        relay_count = 0
         with self.network.lock:
-            for peer in self.network.peers.values():
-                peer_addr = f"{peer.address[0]}:{peer.address[1]}"
-                if peer.is_alive and peer_addr != source_peer:
-                    if peer.send_message(tx_msg):
-                        relay_count += 1
+            targets = [peer for peer in self.network.peers.values()
+                       if peer.is_alive and peer.addr_str != source_peer]
+        
+        unknown = [peer for peer in targets if peer.known_tx.add_if_new(transaction.tx_id)]
+        relay_count = self.network.broadcast_batch(payload, unknown)
         
         logger.debug(f"Relayed transaction {transaction.tx_id} to {relay_count} peers")
     
@@ -188,9 +232,20 @@ class MempoolSyncManager:
         """Get mempool statistics"""
         current_time = time.time()
         
+        with self.blockchain.lock:
+            mempool = list(self.blockchain.mempool)
+            timestamps = array('d', self.blockchain.mempool_ts)
+            total_fees = sum(self.blockchain.mempool_fee)
+        
+        source_counts: Dict[str, int] = {}
+        sources = self.transaction_sources
+        for tx in mempool:
+            source = sources.get(tx.tx_id, 'unknown')
+            source_counts[source] = source_counts.get(source, 0) + 1
+        
         stats = {
-            'total_transactions': len(self.blockchain.mempool),
-            'total_fees': sum(tx.fee for tx in self.blockchain.mempool),
+            'total_transactions': len(mempool),
+            'total_fees': total_fees,
             'average_fee': 0,
             'oldest_transaction': None,
             'newest_transaction': None,
@@ -198,12 +253,13 @@ class MempoolSyncManager:
             'propagation_stats': {}
         }
         
-        if self.blockchain.mempool:
-            stats['average_fee'] = stats['total_fees'] / len(self.blockchain.mempool)
+        if mempool:
+            stats['average_fee'] = total_fees / len(mempool)
             
-            # Find oldest and newest
-            oldest_tx = min(self.blockchain.mempool, key=lambda tx: tx.timestamp)
-            newest_tx = max(self.blockchain.mempool, key=lambda tx: tx.timestamp)
+            # Find oldest and newest from the timestamp column
+            indices = range(len(timestamps))
+            oldest_tx = mempool[min(indices, key=timestamps.__getitem__)]
+            newest_tx = mempool[max(indices, key=timestamps.__getitem__)]
             
             stats['oldest_transaction'] = {
                 'tx_id': oldest_tx.tx_id,
@@ -215,12 +271,6 @@ class MempoolSyncManager:
                 'age_seconds': current_time - newest_tx.timestamp
             }
             
-            # Source statistics
-            source_counts = {}
-            for tx in self.blockchain.mempool:
-                source = self.transaction_sources.get(tx.tx_id, 'unknown')
-                source_counts[source] = source_counts.get(source, 0) + 1
-            
             stats['transaction_sources'] = source_counts
         
         return stats
@@ -228,8 +278,9 @@ class MempoolSyncManager:
     def force_mempool_sync(self):
         """Force immediate mempool synchronization"""
         logger.info("Forcing mempool synchronization...")
-        self._request_mempool_from_peers()
-        time.sleep(2)  # Wait for responses
+        self._sync_ack.clear()
+        self._request_mempool_from_peers(force=True)
+        self._sync_ack.wait(timeout=2)  # Until the first response (or give up after 2s)
         self._broadcast_mempool_to_new_peers()
 
 class SmartMiner:
@@ -265,11 +316,22 @@ class SmartMiner:
             return
             
         self.is_mining = False
+        # Wake the mining loop if it is waiting for transactions
+        with self.blockchain.mempool_cv:
+            self.blockchain.mempool_cv.notify_all()
         if self.mining_thread and self.mining_thread.is_alive():
             self.mining_thread.join(timeout=5)
             
         logger.info("Smart mining stopped")
     
+    def _should_mine(self, last_mine_time: float) -> bool:
+        """Check if the mempool justifies mining a block now"""
+        mempool_size = len(self.blockchain.mempool)
+        return (
+            mempool_size >= self.min_transactions or  # Have enough transactions
+            (mempool_size > 0 and time.time() - last_mine_time > self.max_wait_time)  # Or waited too long
+        )
+    
     def _smart_mining_loop(self):
         """Smart mining loop - only mines when transactions are available"""
         last_mine_time = time.time()
@@ -280,10 +342,7 @@ class SmartMiner:
                 mempool_size = len(self.blockchain.mempool)
                 
                 # Check if we should mine
-                should_mine = (
-                    mempool_size >= self.min_transactions or  # Have enough transactions
-                    (mempool_size > 0 and current_time - last_mine_time > self.max_wait_time)  # Or waited too long
-                )
+                should_mine = self._should_mine(last_mine_time)
                 
                 if should_mine:
                     logger.info(f"Starting to mine block with {mempool_size} transactions")
@@ -313,15 +372,20 @@ class SmartMiner:
                         last_mine_time = current_time
                     else:
                         logger.warning("Mining failed or no transactions available")
+                        time.sleep(10)  # Back off before retrying
                 else:
                     # Wait for transactions
                     if mempool_size == 0:
                         logger.debug("Waiting for transactions in mempool...")
                     else:
                         logger.debug(f"Waiting for more transactions ({mempool_size}/{self.min_transactions})")
-                
-                # Sleep before next check
-                time.sleep(10)  # Check every 10 seconds
+                    
+                    # Sleep until the mempool grows (re-check every 10 seconds for max_wait_time)
+                    with self.blockchain.mempool_cv:
+                        self.blockchain.mempool_cv.wait_for(
+                            lambda: not self.is_mining or self._should_mine(last_mine_time),
+                            timeout=10
+                        )
                 
             except Exception as e:
                 logger.error(f"Smart mining error: {e}")
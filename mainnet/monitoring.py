@@ -8,6 +8,7 @@ import threading
 import logging
 import psutil
 import json
+from collections import deque
 from typing import Dict, List, Optional
 from prometheus_client import Counter, Gauge, Histogram, start_http_server
 from .config import Config
@@ -16,6 +17,9 @@ from .mainnet_network import MainnetNetworkNode
 
 logger = logging.getLogger(__name__)
 
+# Disk usage changes slowly; re-stat the filesystem at most this often (seconds)
+DISK_USAGE_TTL = 300
+
 class MainnetMonitoring:
     """Production monitoring system for GSC blockchain"""
     
@@ -25,6 +29,11 @@ class MainnetMonitoring:
         self.running = False
         self.monitor_thread = None
         
+        # Latest psutil readings, shared by metrics, health checks and summaries
+        self._last_sample: Optional[Dict] = None
+        self._disk_cache: Optional[tuple] = None  # (monotonic time, disk usage)
+        psutil.cpu_percent(interval=None)  # Prime the non-blocking CPU counter
+        
         # Prometheus metrics
         self.setup_metrics()
         
@@ -44,6 +53,12 @@ class MainnetMonitoring:
             'max_block_time': 1800,  # 30 minutes
             'max_mempool_size': 10000
         }
+        
+        # (height, tip hash, is_valid) from the last full chain validation
+        self._last_valid_tip: Optional[tuple] = None
+        
+        # Last totals pushed into each Prometheus counter
+        self._counter_totals: Dict[str, float] = {}
     
     def setup_metrics(self):
         """Set up Prometheus metrics"""
@@ -63,9 +78,12 @@ class MainnetMonitoring:
         self.network_messages_received = Counter('gsc_network_messages_received_total', 'Total messages received')
         
         # System metrics
-        self.system_cpu_usage = Gauge('gsc_system_cpu_usage_percent', 'CPU usage percentage')
-        self.system_memory_usage = Gauge('gsc_system_memory_usage_percent', 'Memory usage percentage')
-        self.system_disk_usage = Gauge('gsc_system_disk_usage_percent', 'Disk usage percentage')
+        # Usage gauges are read from the latest sample when scraped
+        self.system_usage = Gauge('gsc_system_usage_percent', 'System resource usage percentage', ['resource'])
+        for resource in ('cpu', 'memory', 'disk'):
+            self.system_usage.labels(resource=resource).set_function(
+                lambda resource=resource: self._system_usage(resource)
+            )
         self.system_uptime = Gauge('gsc_system_uptime_seconds', 'System uptime in seconds')
         
         # Performance metrics
@@ -113,13 +131,16 @@ class MainnetMonitoring:
         
         while self.running:
             try:
+                # Sample the system once per iteration
+                sample = self._sample_system()
+                
                 # Update metrics
                 self._update_blockchain_metrics()
                 self._update_network_metrics()
                 self._update_system_metrics(start_time)
                 
                 # Check health
-                self._check_health()
+                self._check_health(sample)
                 
                 # Sleep for monitoring interval
                 time.sleep(Config.HEALTH_CHECK_INTERVAL)
@@ -142,12 +163,20 @@ class MainnetMonitoring:
             
             # Update counters from blockchain metrics
             metrics = self.blockchain.metrics
-            self.blocks_mined._value._value = metrics.get('blocks_mined', 0)
-            self.transactions_processed._value._value = metrics.get('transactions_processed', 0)
+            self._advance_counter(self.blocks_mined, 'blocks_mined', metrics.get('blocks_mined', 0))
+            self._advance_counter(self.transactions_processed, 'transactions_processed',
+                                  metrics.get('transactions_processed', 0))
             
         except Exception as e:
             logger.error(f"Error updating blockchain metrics: {e}")
     
+    def _advance_counter(self, counter: Counter, key: str, total: float):
+        """Increment a Prometheus counter by however much a running total has grown"""
+        delta = total - self._counter_totals.get(key, 0)
+        if delta > 0:
+            counter.inc(delta)
+        self._counter_totals[key] = total
+    
     def _update_network_metrics(self):
         """Update network-related metrics"""
         try:
@@ -156,46 +185,76 @@ class MainnetMonitoring:
             
             # Network statistics
             stats = self.network.stats
-            self.network_bytes_sent._value._value = stats.get('bytes_sent', 0)
-            self.network_bytes_received._value._value = stats.get('bytes_received', 0)
-            self.network_messages_sent._value._value = stats.get('messages_sent', 0)
-            self.network_messages_received._value._value = stats.get('messages_received', 0)
+            self._advance_counter(self.network_bytes_sent, 'bytes_sent', stats.get('bytes_sent', 0))
+            self._advance_counter(self.network_bytes_received, 'bytes_received', stats.get('bytes_received', 0))
+            self._advance_counter(self.network_messages_sent, 'messages_sent', stats.get('messages_sent', 0))
+            self._advance_counter(self.network_messages_received, 'messages_received',
+                                  stats.get('messages_received', 0))
             
         except Exception as e:
             logger.error(f"Error updating network metrics: {e}")
     
+    def _sample_system(self) -> Dict:
+        """Read CPU, memory and disk usage once (CPU is measured since the previous sample)"""
+        self._last_sample = {
+            'cpu': psutil.cpu_percent(interval=None),
+            'memory': psutil.virtual_memory(),
+            'disk': self._disk_usage(),
+            'timestamp': time.time()
+        }
+        return self._last_sample
+    
+    def _disk_usage(self):
+        """Disk usage of '/', cached for DISK_USAGE_TTL seconds"""
+        now = time.monotonic()
+        if self._disk_cache is None or now - self._disk_cache[0] > DISK_USAGE_TTL:
+            self._disk_cache = (now, psutil.disk_usage('/'))
+        return self._disk_cache[1]
+    
+    def _system_usage(self, resource: str) -> float:
+        """Usage percentage of a resource from the latest system sample"""
+        sample = self._last_sample
+        if sample is None:
+            return 0.0
+        if resource == 'cpu':
+            return sample['cpu']
+        if resource == 'memory':
+            return sample['memory'].percent
+        disk = sample['disk']
+        return (disk.used / disk.total) * 100
+    
     def _update_system_metrics(self, start_time: float):
         """Update system-related metrics"""
         try:
-            # CPU usage
-            cpu_percent = psutil.cpu_percent(interval=1)
-            self.system_cpu_usage.set(cpu_percent)
-            
-            # Memory usage
-            memory = psutil.virtual_memory()
-            self.system_memory_usage.set(memory.percent)
-            
-            # Disk usage
-            disk = psutil.disk_usage('/')
-            disk_percent = (disk.used / disk.total) * 100
-            self.system_disk_usage.set(disk_percent)
-            
-            # Uptime
+            # CPU, memory and disk gauges read the latest sample at scrape time,
+            # so only uptime is pushed here
             uptime = time.time() - start_time
             self.system_uptime.set(uptime)
             
         except Exception as e:
             logger.error(f"Error updating system metrics: {e}")
     
-    def _check_health(self):
+    def _chain_valid(self) -> bool:
+        """Validate the chain, reusing the previous result while the tip is unchanged"""
+        chain = self.blockchain.chain
+        tip = (len(chain), chain[-1].hash if chain else None)
+        if self._last_valid_tip is not None and self._last_valid_tip[:2] == tip:
+            return self._last_valid_tip[2]
+        
+        is_valid, _ = self.blockchain.is_chain_valid()
+        self._last_valid_tip = tip + (is_valid,)
+        return is_valid
+    
+    def _check_health(self, sample: Dict = None):
         """Perform health checks"""
         current_time = time.time()
+        sample = sample or self._last_sample or self._sample_system()
         
         # Blockchain health
         blockchain_healthy = True
         try:
-            # Check if blockchain is valid
-            is_valid, _ = self.blockchain.is_chain_valid()
+            # Check if blockchain is valid (only revalidated when the tip changes)
+            is_valid = self._chain_valid()
             if not is_valid:
                 blockchain_healthy = False
                 logger.warning("Blockchain validation failed")
@@ -239,13 +298,13 @@ class MainnetMonitoring:
         system_healthy = True
         try:
             # Check memory usage
-            memory = psutil.virtual_memory()
+            memory = sample['memory']
             if memory.percent > self.thresholds['max_memory_usage']:
                 system_healthy = False
                 logger.warning(f"High memory usage: {memory.percent:.1f}%")
             
             # Check CPU usage
-            cpu_percent = psutil.cpu_percent()
+            cpu_percent = sample['cpu']
             if cpu_percent > self.thresholds['max_cpu_usage']:
                 system_healthy = False
                 logger.warning(f"High CPU usage: {cpu_percent:.1f}%")
@@ -285,6 +344,8 @@ class MainnetMonitoring:
     def get_metrics_summary(self) -> Dict:
         """Get summary of key metrics"""
         try:
+            sample = self._last_sample or self._sample_system()
+            disk = sample['disk']
             return {
                 'blockchain': {
                     'height': len(self.blockchain.chain),
@@ -299,9 +360,9 @@ class MainnetMonitoring:
                     'bytes_received': self.network.stats.get('bytes_received', 0)
                 },
                 'system': {
-                    'cpu_percent': psutil.cpu_percent(),
-                    'memory_percent': psutil.virtual_memory().percent,
-                    'disk_percent': (psutil.disk_usage('/').used / psutil.disk_usage('/').total) * 100
+                    'cpu_percent': sample['cpu'],
+                    'memory_percent': sample['memory'].percent,
+                    'disk_percent': (disk.used / disk.total) * 100
                 }
             }
         except Exception as e:
@@ -326,7 +387,8 @@ class AlertManager:
     def __init__(self, monitoring: MainnetMonitoring):
         self.monitoring = monitoring
         self.alerts = []
-        self.alert_history = []
+        self._alert_keys = set()  # (type, component) of active alerts
+        self.alert_history = deque(maxlen=1000)
         self.running = False
         self.alert_thread = None
     
@@ -384,12 +446,10 @@ class AlertManager:
     def _trigger_alert(self, alert: Dict):
         """Trigger an alert"""
         # Add to current alerts if not already present
-        existing = any(
-            a['type'] == alert['type'] and a['component'] == alert['component']
-            for a in self.alerts
-        )
+        key = (alert['type'], alert['component'])
         
-        if not existing:
+        if key not in self._alert_keys:
+            self._alert_keys.add(key)
             self.alerts.append(alert)
             self.alert_history.append(alert)
             
@@ -408,10 +468,11 @@ class AlertManager:
     
     def get_alert_history(self, limit: int = 100) -> List[Dict]:
         """Get alert history"""
-        return self.alert_history[-limit:]
+        return list(self.alert_history)[-limit:]
     
     def clear_alert(self, alert_type: str, component: str):
         """Clear a specific alert"""
+        self._alert_keys.discard((alert_type, component))
         self.alerts = [
             a for a in self.alerts 
             if not (a['type'] == alert_type and a['component'] == component)
@@ -9,6 +9,7 @@ import json
 import time
 import hashlib
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import pickle
 
 # Default seed nodes for one-click join (Production vs Testnet)
@@ -39,6 +40,8 @@ class GSCNetworkNode:
         self.node_id = self.generate_node_id()
         self.known_nodes = set()
         self.sync_lock = threading.Lock()
+        
+        self._create_pools()
 
         # Basic traffic counters (for GUI + production monitoring)
         self._traffic_lock = threading.Lock()
@@ -59,8 +62,19 @@ class GSCNetworkNode:
         """Generate unique node ID"""
         return hashlib.sha256(f"{socket.gethostname()}{time.time()}".encode()).hexdigest()[:16]
     
+    def _create_pools(self):
+        """Create the fanout and dial workers (again after stop())"""
+        # Shared workers for broadcast fanout, bounded to keep fd usage in check
+        self.broadcast_pool = ThreadPoolExecutor(max_workers=32, thread_name_prefix="bcast")
+        # Separate workers for blocking outbound handshakes, so a dial never waits on bcast
+        self.dial_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="dial")
+        self._pools_stopped = False
+    
     def start_server(self):
         """Start P2P server to accept incoming connections"""
+        if self._pools_stopped:
+            self._create_pools()
+        
         try:
             self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
@@ -441,31 +455,6 @@ class GSCNetworkNode:
         except socket.timeout:
             print(f"❌ Connection timeout to {host}:{port}")
             return False
-<<<<<<< Updated upstream
-    
-    def discover_peers(self):
-        """Discover and connect to other GSC nodes"""
-        # Enhanced peer discovery with better connectivity
-        potential_peers = [
-            ('127.0.0.1', 8334),
-            ('127.0.0.1', 8335),
-            ('127.0.0.1', 8336),
-            ('localhost', 8334),
-            ('localhost', 8335)
-        ]
-        
-        while self.running:
-            for host, port in potential_peers:
-                peer_addr = f"{host}:{port}"
-                if peer_addr not in self.peers and port != self.port:
-                    try:
-                        self.connect_to_peer(host, port)
-                        time.sleep(1)  # Small delay between connections
-                    except:
-                        pass
-            
-            time.sleep(15)  # Check for new peers more frequently
-=======
         except ConnectionRefusedError:
             print(f"❌ Connection refused by {host}:{port} - Make sure the other device is running GSC Coin")
             return False
@@ -554,25 +543,19 @@ class GSCNetworkNode:
         
         while self.running and discovery_attempts < max_attempts:
             try:
-                # Try to connect to seed nodes
-                for seed_node in SEED_NODES:
-                    if seed_node not in self.peers:
-                        try:
-                            self.connect_to_peer(seed_node, 8333)
-                            if len(self.peers) > 0:
-                                print(f"Connected to seed node: {seed_node}")
-                        except Exception as e:
-                            pass  # Silently fail for seed nodes
+                # Dial seed nodes concurrently (peers are keyed by host:port)
+                seeds = [f"{seed_node}:8333" for seed_node in SEED_NODES
+                         if f"{seed_node}:8333" not in self.peers]
+                for seed_node, connected in self._dial_all(seeds):
+                    if connected:
+                        print(f"Connected to seed node: {seed_node}")
                 
-                # Try to connect to known nodes
-                for node in list(self.known_nodes):
-                    if node not in self.peers and len(self.peers) < 8:
-                        try:
-                            host, port = node.split(':')
-                            self.connect_to_peer(host, int(port))
-                            print(f"Connected to known node: {node}")
-                        except Exception as e:
-                            pass
+                # Dial known nodes concurrently, up to the outbound limit
+                slots = 8 - len(self.peers)
+                nodes = [node for node in list(self.known_nodes) if node not in self.peers]
+                for node, connected in self._dial_all(nodes[:max(slots, 0)]):
+                    if connected:
+                        print(f"Connected to known node: {node}")
                 
                 # Request peer lists from connected peers
                 for peer in list(self.peers):
@@ -620,7 +603,6 @@ class GSCNetworkNode:
         except Exception as e:
             pass  # Silently fail
 
->>>>>>> Stashed changes
     def try_connect_peer(self, ip, port):
         """Try to connect to a potential peer"""
         try:
@@ -662,19 +644,14 @@ class GSCNetworkNode:
         
         print(f"🚀 Broadcasting transaction {transaction.tx_id[:16]}... to {len(self.peers)} peers")
         
-        for peer in list(self.peers):
-            try:
-                host, port = peer.split(':')
-                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                sock.settimeout(3)
-                sock.connect((host, int(port)))
-                sock.send(json.dumps(message).encode())
-                sock.close()
+        data = json.dumps(message).encode()
+        for peer, error in self._fanout(list(self.peers), data, timeout=3):
+            if error is None:
                 broadcast_count += 1
                 print(f"✅ Transaction sent to {peer}")
-            except Exception as e:
+            else:
                 failed_peers.append(peer)
-                print(f"❌ Failed to send to {peer}: {str(e)[:50]}...")
+                print(f"❌ Failed to send to {peer}: {str(error)[:50]}...")
         
         # Remove failed peers from active list
         for failed_peer in failed_peers:
@@ -697,46 +674,76 @@ class GSCNetworkNode:
         
         print(f"🔄 Propagating transaction {transaction.tx_id[:16]}... to {len(peers_to_propagate)} other peers")
         
-        for peer in peers_to_propagate:
-            try:
-                host, port = peer.split(':')
-                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                sock.settimeout(2)
-                sock.connect((host, int(port)))
-                sock.send(json.dumps(message).encode())
-                sock.close()
+        data = json.dumps(message).encode()
+        for peer, error in self._fanout(peers_to_propagate, data, timeout=2):
+            if error is None:
                 propagated_count += 1
                 print(f"🔄 Propagated to {peer}")
-            except Exception as e:
-                print(f"⚠️ Failed to propagate to {peer}: {str(e)[:30]}...")
+            else:
+                print(f"⚠️ Failed to propagate to {peer}: {str(error)[:30]}...")
         
         return propagated_count
     
     def broadcast_message(self, message, exclude_peer=None):
         """Broadcast message to all connected peers"""
         data = json.dumps(message).encode()
+        peers = [p for p in list(self.peers) if not (exclude_peer and p == exclude_peer)]
         
-        for peer_address in list(self.peers):
-            if exclude_peer and peer_address == exclude_peer:
-                continue
-                
+        for peer_address, error in self._fanout(peers, data, timeout=5):
+            if error is not None:
+                print(f"Failed to broadcast to {peer_address}: {error}")
+                self.peers.discard(peer_address)
+    
+    def _send_to_peer(self, peer_address, data, timeout=5):
+        """Deliver one encoded message over a short-lived connection"""
+        host, port = peer_address.split(':')
+        peer_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            peer_socket.settimeout(timeout)
+            peer_socket.connect((host, int(port)))
+            peer_socket.sendall(data)
+        finally:
+            peer_socket.close()
+        
+        with self._traffic_lock:
+            self._bytes_sent += len(data)
+            self._messages_sent += 1
+            self._last_message_time = time.time()
+    
+    def _dial(self, peer_address):
+        """Connect to a host:port peer, swallowing errors"""
+        try:
+            host, port = peer_address.rsplit(':', 1)
+            return bool(self.connect_to_peer(host, int(port)))
+        except Exception:
+            return False
+    
+    def _dial_all(self, peers):
+        """Connect to peers concurrently; returns (peer, connected) pairs"""
+        try:
+            return list(zip(peers, self.dial_pool.map(self._dial, peers)))
+        except RuntimeError:
+            return []  # Node stopped; pool already shut down
+    
+    def _fanout(self, peers, data, timeout=5):
+        """Send data to all peers concurrently; returns (peer, error or None) pairs"""
+        futures = []
+        for peer in peers:
             try:
-                # This is simplified - in practice you'd maintain persistent connections
-                host, port = peer_address.split(':')
-                peer_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                peer_socket.settimeout(5)
-                peer_socket.connect((host, int(port)))
-                peer_socket.send(data)
-                peer_socket.close()
-
-                with self._traffic_lock:
-                    self._bytes_sent += len(data)
-                    self._messages_sent += 1
-                    self._last_message_time = time.time()
-                
+                futures.append((peer, self.broadcast_pool.submit(self._send_to_peer, peer, data, timeout)))
+            except RuntimeError:
+                # Node stopped; report only what was already handed off, so callers
+                # don't drop peers as dead
+                break
+        
+        results = []
+        for peer, future in futures:
+            try:
+                future.result()
+                results.append((peer, None))
             except Exception as e:
-                print(f"Failed to broadcast to {peer_address}: {e}")
-                self.peers.discard(peer_address)
+                results.append((peer, e))
+        return results
 
     def get_network_traffic(self):
         """Traffic counters for GUI"""
@@ -874,7 +881,6 @@ class GSCNetworkNode:
             except:
                 return "127.0.0.1"
     
-<<<<<<< Updated upstream
     def broadcast_blockchain(self):
         """Broadcast entire blockchain to all connected peers"""
         if not self.peers:
@@ -890,22 +896,16 @@ class GSCNetworkNode:
                 'chain_length': len(self.blockchain.chain)
             }
             
+            # Serialize the chain once, not once per peer
+            data = json.dumps(blockchain_data).encode()
+            
             broadcast_count = 0
-            for peer_address in list(self.peers):
-                try:
-                    host, port = peer_address.split(':')
-                    peer_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                    peer_socket.settimeout(10)
-                    peer_socket.connect((host, int(port)))
-                    
-                    data = json.dumps(blockchain_data).encode()
-                    peer_socket.send(data)
-                    peer_socket.close()
+            for peer_address, error in self._fanout(list(self.peers), data, timeout=10):
+                if error is None:
                     broadcast_count += 1
                     print(f"Blockchain broadcasted to {peer_address}")
-                    
-                except Exception as e:
-                    print(f"Failed to broadcast blockchain to {peer_address}: {e}")
+                else:
+                    print(f"Failed to broadcast blockchain to {peer_address}: {error}")
                     self.peers.discard(peer_address)
             
             print(f"Blockchain broadcast completed to {broadcast_count} peers")
@@ -927,34 +927,23 @@ class GSCNetworkNode:
             'timestamp': datetime.now().isoformat()
         }
         
+        data = json.dumps(request_message).encode()
+        
         request_count = 0
-        for peer_address in list(self.peers):
-            try:
-                host, port = peer_address.split(':')
-                peer_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                peer_socket.settimeout(5)
-                peer_socket.connect((host, int(port)))
-                
-                data = json.dumps(request_message).encode()
-                peer_socket.send(data)
-                peer_socket.close()
+        for peer_address, error in self._fanout(list(self.peers), data, timeout=5):
+            if error is None:
                 request_count += 1
                 print(f"Blockchain requested from {peer_address}")
-                
-            except Exception as e:
-                print(f"Failed to request blockchain from {peer_address}: {e}")
+            else:
+                print(f"Failed to request blockchain from {peer_address}: {error}")
                 self.peers.discard(peer_address)
         
         print(f"Blockchain requested from {request_count} peers")
         return request_count > 0
 
-    def get_network_stats(self):
-        """Get network statistics"""
-=======
     def get_network_addresses(self):
         """Get all network connection information for display"""
         local_ip = self.get_local_ip()
->>>>>>> Stashed changes
         return {
             'local_ip': local_ip,
             'p2p_address': f"{local_ip}:{self.port}",
@@ -1193,6 +1182,9 @@ class GSCNetworkNode:
         self.running = False
         if self.server_socket:
             self.server_socket.close()
+        self.broadcast_pool.shutdown(wait=False)
+        self.dial_pool.shutdown(wait=False)
+        self._pools_stopped = True
         print("GSC Network node stopped")
     
     def get_network_stats(self) -> dict:
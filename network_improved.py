@@ -10,13 +10,40 @@ import time
 import hashlib
 import ssl
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Set, Any, Callable
+from typing import Dict, List, Optional, Set, Any, Callable, Union
 from dataclasses import dataclass
-import pickle
 import os
+import struct
+import select
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 from gsc_logger import network_logger
-from thread_safety import ThreadSafeSet, ThreadSafeDict, RateLimiter, AtomicCounter
+from blockchain_improved import Transaction, Block
+from thread_safety import (ThreadSafeSet, ThreadSafeDict, ShardedDict, TokenBucket, AtomicCounter,
+                           SlidingWindowCounter)
+
+# 4-byte big-endian length prefix on every frame
+FRAME_HEADER = struct.Struct('>I')
+
+# Gathered writes need sendmsg (not available on Windows); cap buffers per call at IOV_MAX
+SENDMSG_AVAILABLE = hasattr(socket.socket, 'sendmsg')
+MAX_IOV = 1024
+
+# Longest a queued broadcast may wait on one peer's full send buffer
+SEND_TIMEOUT = 5.0
 
 @dataclass
 class PeerInfo:
@@ -67,6 +94,41 @@ class MessageValidator:
     MAX_HEADERS_COUNT = 2000
     MAX_INV_ITEMS = 50000
     
+    # message type -> (list field, max length, label for the error)
+    SIZE_LIMITS = {
+        'headers': ('headers', MAX_HEADERS_COUNT, 'headers'),
+        'inv': ('items', MAX_INV_ITEMS, 'inv items'),
+        'peer_list': ('peers', MAX_PEER_LIST_SIZE, 'peers')
+    }
+    
+    _validators: Dict[str, Callable[[Dict[str, Any]], Optional[str]]] = {}
+    
+    @staticmethod
+    def _make_validator(message_type: str, required: List[str], limit: Optional[tuple]) -> Callable:
+        """Build the field and size checks for one message type"""
+        required_set = frozenset(required)
+        
+        def validate(message: Dict[str, Any]) -> Optional[str]:
+            if not required_set <= message.keys():
+                field = next(f for f in required if f not in message)
+                return f"Message type '{message_type}' missing required field: {field}"
+            if limit:
+                field, maximum, label = limit
+                count = len(message[field])
+                if count > maximum:
+                    return f"Too many {label}: {count} > {maximum}"
+            return None
+        
+        return validate
+    
+    @classmethod
+    def build_validators(cls) -> None:
+        """Precompile a validator per known message type"""
+        cls._validators = {
+            message_type: cls._make_validator(message_type, required, cls.SIZE_LIMITS.get(message_type))
+            for message_type, required in cls.REQUIRED_FIELDS.items()
+        }
+    
     @classmethod
     def validate_message(cls, message: Dict[str, Any]) -> Optional[str]:
         """Validate message format and return error if invalid"""
@@ -80,66 +142,103 @@ class MessageValidator:
         if not isinstance(message_type, str):
             return "Message type must be a string"
         
-        # Check required fields
-        required = cls.REQUIRED_FIELDS.get(message_type, [])
-        for field in required:
-            if field not in message:
-                return f"Message type '{message_type}' missing required field: {field}"
-        
-        # Size validations
-        if message_type == 'headers':
-            headers = message.get('headers', [])
-            if len(headers) > cls.MAX_HEADERS_COUNT:
-                return f"Too many headers: {len(headers)} > {cls.MAX_HEADERS_COUNT}"
-        
-        elif message_type == 'inv':
-            items = message.get('items', [])
-            if len(items) > cls.MAX_INV_ITEMS:
-                return f"Too many inv items: {len(items)} > {cls.MAX_INV_ITEMS}"
+        # Required fields and size limits for this type
+        validator = cls._validators.get(message_type)
+        if validator:
+            return validator(message)
         
-        elif message_type == 'peer_list':
-            peers = message.get('peers', [])
-            if len(peers) > cls.MAX_PEER_LIST_SIZE:
-                return f"Too many peers: {len(peers)} > {cls.MAX_PEER_LIST_SIZE}"
-        
-        return None  # Valid
+        return None  # Unknown types are reported at dispatch
+
+MessageValidator.build_validators()
+
+class MessageCodec:
+    """Encode and decode message bodies (msgpack with peers that support it, JSON otherwise)"""
+    
+    JSON = 'json'
+    MSGPACK = 'msgpack'
+    
+    # Advertised in our version message, preferred first
+    SUPPORTED = [MSGPACK, JSON] if MSGPACK_AVAILABLE else [JSON]
+    
+    @classmethod
+    def negotiate(cls, peer_codecs: List[str]) -> str:
+        """Pick the codec to use when sending to a peer"""
+        for codec in cls.SUPPORTED:
+            if codec in peer_codecs:
+                return codec
+        return cls.JSON
+    
+    @classmethod
+    def encode(cls, message: Dict[str, Any], codec: str = JSON) -> bytes:
+        """Serialize a message body"""
+        if codec == cls.MSGPACK:
+            return msgpack.packb(message, use_bin_type=True)
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(message)
+        return json.dumps(message, separators=(',', ':')).encode()
+    
+    @classmethod
+    def decode(cls, data: bytes) -> Dict[str, Any]:
+        """Deserialize a message body; JSON bodies always start with '{', anything else is msgpack"""
+        if data[:1] == b'{' or not MSGPACK_AVAILABLE:
+            # Both parsers take the raw bytes; orjson skips the str round-trip
+            return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+        return msgpack.unpackb(data, raw=False, strict_map_key=False,
+                               max_bin_len=MessageValidator.MAX_MESSAGE_SIZE)
 
 class BanscoreManager:
     """Manage peer banning with persistence"""
     
     def __init__(self, max_banscore: int = 100):
         self.max_banscore = max_banscore
-        self.banned_peers = ThreadSafeDict[str, Dict[str, Any]]()
-        self.peer_scores = ThreadSafeDict[str, int]()
-        self.bans_file = "banned_peers.json"
+        self.banned_peers: ShardedDict = ShardedDict()  # address -> ban info
+        self.peer_scores: ShardedDict = ShardedDict()  # address -> AtomicCounter banscore
+        self.bans_file = "banned_peers.log"  # append-only, one JSON record per line
+        self.legacy_bans_file = "banned_peers.json"
+        self.compact_interval = 3600.0  # seconds
+        self._last_compact = time.monotonic()
+        self._log_lock = threading.Lock()
+        self._log_records = 0  # Records in the log file, live or superseded
+        self._ban_log = None  # Opened on first append
         self.load_bans()
     
+    def _score_counter(self, peer_address: str) -> AtomicCounter:
+        """Get or create the banscore counter for a peer"""
+        counter = self.peer_scores.get(peer_address)
+        if counter is None:
+            counter = self.peer_scores.setdefault(peer_address, AtomicCounter(0))
+        return counter
+    
     def add_score(self, peer_address: str, score: int, reason: str = "") -> None:
         """Add to peer's banscore"""
-        current_score = self.peer_scores.get(peer_address, 0)
-        new_score = current_score + score
-        self.peer_scores.set(peer_address, new_score)
+        if self.is_banned(peer_address):
+            return  # Already banned; don't re-ban or log again
+        
+        new_score = self._score_counter(peer_address).increment(score)
+        current_score = new_score - score
         
         network_logger.debug(f"Peer {peer_address} score: {current_score} -> {new_score} ({reason})")
         
-        if new_score >= self.max_banscore:
+        # Only the increment that crosses the threshold bans, so racing scorers ban once
+        if current_score < self.max_banscore <= new_score:
             self.ban_peer(peer_address, f"Score reached {new_score}")
     
     def ban_peer(self, peer_address: str, reason: str = "") -> None:
         """Ban a peer"""
+        counter = self.peer_scores.get(peer_address)
         ban_info = {
             'address': peer_address,
             'banned_at': time.time(),
             'reason': reason,
-            'score': self.peer_scores.get(peer_address, self.max_banscore)
+            'score': counter.get() if counter else self.max_banscore
         }
         
         self.banned_peers.set(peer_address, ban_info)
         network_logger.warning(f"Peer banned: {peer_address} - {reason}")
-        self.save_bans()
+        self._append_log(ban_info, sync=True)
     
     def is_banned(self, peer_address: str) -> bool:
-        """Check if peer is banned"""
+        """Check if peer is banned (lock-free shard lookup)"""
         return peer_address in self.banned_peers
     
     def unban_peer(self, peer_address: str) -> None:
@@ -147,27 +246,80 @@ class BanscoreManager:
         self.banned_peers.remove(peer_address)
         self.peer_scores.remove(peer_address)
         network_logger.info(f"Peer unbanned: {peer_address}")
-        self.save_bans()
+        self._append_log({'address': peer_address, 'unbanned': True})
+    
+    def _append_log(self, record: Dict[str, Any], sync: bool = False) -> None:
+        """Append one record to the ban log"""
+        line = json.dumps(record, separators=(',', ':')) + '\n'
+        try:
+            with self._log_lock:
+                if self._ban_log is None:
+                    self._ban_log = open(self.bans_file, 'a')
+                self._ban_log.write(line)
+                self._ban_log.flush()
+                if sync:
+                    os.fsync(self._ban_log.fileno())
+                self._log_records += 1
+        except Exception as e:
+            network_logger.error(f"Failed to log ban change for {record.get('address')}: {e}")
+    
+    def _apply_record(self, record: Dict[str, Any]) -> None:
+        """Fold one ban log record into the in-memory ban list"""
+        addr = record['address']
+        if record.get('unbanned'):
+            self.banned_peers.remove(addr)
+            self.peer_scores.remove(addr)
+        else:
+            self.banned_peers.set(addr, record)
+            self.peer_scores.set(addr, AtomicCounter(record.get('score', self.max_banscore)))
     
     def save_bans(self) -> None:
-        """Save banned peers to file"""
+        """Compact the ban log down to the current ban list"""
+        tmp_file = f"{self.bans_file}.tmp"
         try:
-            with open(self.bans_file, 'w') as f:
-                json.dump(self.banned_peers.copy(), f, indent=2)
+            with self._log_lock:
+                bans = self.banned_peers.copy()
+                with open(tmp_file, 'w') as f:
+                    for info in bans.values():
+                        f.write(json.dumps(info, separators=(',', ':')) + '\n')
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_file, self.bans_file)
+                
+                if self._ban_log:
+                    self._ban_log.close()
+                self._ban_log = open(self.bans_file, 'a')
+                self._log_records = len(bans)
+                self._last_compact = time.monotonic()
         except Exception as e:
             network_logger.error(f"Failed to save bans: {e}")
     
+    def compact(self, force: bool = False) -> None:
+        """Drop superseded records from the ban log, at most once per compact_interval unless forced"""
+        if self._log_records <= len(self.banned_peers):
+            return
+        if force or time.monotonic() - self._last_compact >= self.compact_interval:
+            self.save_bans()
+    
     def load_bans(self) -> None:
-        """Load banned peers from file"""
+        """Load banned peers from the ban log, or the legacy JSON file"""
         try:
             if os.path.exists(self.bans_file):
                 with open(self.bans_file, 'r') as f:
-                    bans = json.load(f)
-                    for addr, info in bans.items():
-                        self.banned_peers.set(addr, info)
-                        self.peer_scores.set(addr, info.get('score', self.max_banscore))
-                
-                network_logger.info(f"Loaded {len(self.banned_peers)} banned peers")
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            continue  # Torn write at the end of the log
+                        self._apply_record(record)
+                        self._log_records += 1
+            
+            elif os.path.exists(self.legacy_bans_file):
+                with open(self.legacy_bans_file, 'r') as f:
+                    for info in json.load(f).values():
+                        self._apply_record(info)
+            
+            network_logger.info(f"Loaded {len(self.banned_peers)} banned peers")
         except Exception as e:
             network_logger.error(f"Failed to load bans: {e}")
 
@@ -176,12 +328,12 @@ class ConnectionManager:
     
     def __init__(self, max_connections: int = 50):
         self.max_connections = max_connections
-        self.active_connections = ThreadSafeSet[str]()
-        self.connection_attempts = ThreadSafeDict[str, List[float]]()
-        self.rate_limiters = ThreadSafeDict[str, RateLimiter]()
+        self.active_connections = ThreadSafeSet()  # peer addresses
+        self.connect_buckets: ShardedDict = ShardedDict()  # address -> TokenBucket
         self.connection_timeout = 30.0
         self.read_timeout = 60.0
-        self.max_retry_attempts = 3
+        self.max_retry_attempts = 3  # per retry_window
+        self.retry_window = 300.0  # seconds
         self.retry_backoff = 5.0  # seconds
     
     def can_connect(self, peer_address: str) -> bool:
@@ -194,34 +346,28 @@ class ConnectionManager:
         if peer_address in self.active_connections:
             return False
         
-        # Check rate limiting
-        rate_limiter = self.rate_limiters.get(peer_address)
-        if not rate_limiter:
-            rate_limiter = RateLimiter(max_calls=3, time_window=60.0)
-            self.rate_limiters.set(peer_address, rate_limiter)
-        
-        if not rate_limiter.is_allowed():
-            wait_time = rate_limiter.wait_time()
-            network_logger.debug(f"Rate limited for {peer_address}, wait {wait_time:.1f}s")
-            return False
-        
-        # Check retry attempts
-        attempts = self.connection_attempts.get(peer_address, [])
-        recent_attempts = [t for t in attempts if time.time() - t < 300]  # Last 5 minutes
+        # Check rate limiting (each allowed connection spends one token)
+        bucket = self.connect_buckets.get(peer_address)
+        if bucket is None:
+            bucket = self.connect_buckets.setdefault(
+                peer_address,
+                TokenBucket(self.max_retry_attempts, self.max_retry_attempts / self.retry_window)
+            )
         
-        if len(recent_attempts) >= self.max_retry_attempts:
-            network_logger.debug(f"Too many connection attempts to {peer_address}")
+        if not bucket.try_acquire():
+            network_logger.debug(f"Rate limited for {peer_address}, wait {bucket.wait_time():.1f}s")
             return False
         
         return True
     
-    def record_connection_attempt(self, peer_address: str) -> None:
-        """Record a connection attempt"""
-        attempts = self.connection_attempts.get(peer_address, [])
-        attempts.append(time.time())
-        # Keep only recent attempts
-        attempts = [t for t in attempts if time.time() - t < 300]
-        self.connection_attempts.set(peer_address, attempts)
+    def prune_buckets(self) -> int:
+        """Drop rate-limit buckets that have fully refilled (same as having none)"""
+        pruned = 0
+        for peer_address, bucket in self.connect_buckets.items():
+            if bucket.wait_time(bucket.capacity) == 0:
+                self.connect_buckets.remove(peer_address)
+                pruned += 1
+        return pruned
     
     def add_connection(self, peer_address: str) -> None:
         """Add an active connection"""
@@ -245,7 +391,7 @@ class DNSSeeder:
     ]
     
     def __init__(self):
-        self.dns_cache = ThreadSafeDict[str, List[str]]()
+        self.dns_cache = ThreadSafeDict()  # seed -> (expiry, peers)
         self.cache_timeout = 3600  # 1 hour
     
     def get_peers_from_dns(self, dns_seed: str = None) -> List[str]:
@@ -254,18 +400,23 @@ class DNSSeeder:
             dns_seed = self.DEFAULT_DNS_SEEDS[0]
         
         # Check cache
+        now = time.monotonic()
         cached = self.dns_cache.get(dns_seed)
-        if cached and time.time() - cached[0] < self.cache_timeout:
+        if cached and cached[0] > now:
             return cached[1]
         
         try:
-            import socket
-            # Get DNS records
-            answers = socket.getaddrinfo(dns_seed, 8333, socket.AF_INET)
-            peers = [addr[4][0] for addr in answers]
+            # Get DNS records; numeric port and stream type avoid a services
+            # lookup and the per-socktype duplicates
+            answers = socket.getaddrinfo(dns_seed, 8333, socket.AF_INET, socket.SOCK_STREAM,
+                                         0, socket.AI_NUMERICSERV)
+            peers = list(dict.fromkeys(addr[4][0] for addr in answers))
             
-            # Cache result
-            self.dns_cache.set(dns_seed, [time.time(), peers])
+            # Cache result and drop expired seeds
+            for seed, (expiry, _) in self.dns_cache.items():
+                if expiry <= now:
+                    self.dns_cache.pop(seed, None)  # Another lookup may have pruned it first
+            self.dns_cache.set(dns_seed, (now + self.cache_timeout, peers))
             
             network_logger.info(f"DNS seed {dns_seed} returned {len(peers)} peers")
             return peers
@@ -277,15 +428,80 @@ class DNSSeeder:
 class GSCNetworkNode:
     """Improved GSC Coin P2P Network Node"""
     
+    # Per-peer messages per second allowed for types that cost us work to answer
+    MESSAGE_RATE_LIMITS = {
+        'inv': 50,
+        'getdata': 20,
+        'getheaders': 5,
+        'getaddr': 2,
+        'ping': 2
+    }
+    FLOOD_SCORE = 10  # banscore per second in which a peer exceeds a rate (excess is dropped)
+    
     def __init__(self, blockchain, port: int = 8333):
         self.blockchain = blockchain
         self.port = port
         self.node_id = self.generate_node_id()
         
+        # JSON body of a single-block inv with only the hash left to fill in
+        self._inv_block_template = (
+            '{"type":"inv","items":[{"type":"block","hash":"%s"}],"sender":"' + self.node_id + '"}'
+        )
+        
         # Thread-safe data structures
-        self.peers = ThreadSafeSet[str]()
-        self.peer_info = ThreadSafeDict[str, PeerInfo]()
-        self.known_nodes = ThreadSafeSet[str]()
+        self.peers = ThreadSafeSet()  # host:port
+        self.peer_info: ShardedDict = ShardedDict()  # address -> PeerInfo
+        self.message_windows: ShardedDict = ShardedDict()  # (address, type) -> SlidingWindowCounter
+        self.known_nodes = ThreadSafeSet()  # host:port
+        
+        # Peers we have dialled successfully, persisted so restarts can skip DNS
+        self.peers_file = "peers.json"
+        self.max_saved_peers = 1000
+        self.saved_peers: OrderedDict = OrderedDict()  # host:port -> last connected, oldest first
+        self._saved_peers_lock = threading.Lock()
+        self._saved_peers_dirty = False
+        self.load_saved_peers()
+        self.peer_codecs: Dict[socket.socket, str] = {}  # Negotiated send codec per connection
+        self.peer_sockets: Dict[str, socket.socket] = {}  # address -> live connection
+        self.peer_write_locks: Dict[socket.socket, threading.Lock] = {}  # keeps frames whole across writers
+        
+        # Broadcast frames waiting for the send loop, flushed as one write per peer
+        self._outbox: Dict[socket.socket, List[bytes]] = {}
+        self._outbox_lock = threading.Lock()
+        self._send_event = threading.Event()
+        self.peers_version = AtomicCounter(0)  # Bumped whenever the peer set changes
+        
+        # Framed responses reused across requests: key -> (expiry, frame)
+        self._response_cache: Dict[tuple, tuple] = {}
+        self._response_cache_lock = threading.Lock()
+        self.response_cache_ttl = 10.0  # seconds
+        
+        # Framed block messages by (hash, codec); block contents never change for a hash
+        self._block_frames: OrderedDict = OrderedDict()
+        self.block_frame_cache_size = 256
+        
+        # Hashes already confirmed on our chain, so gossip repeats skip the chain scan.
+        # Valid only for the tip it was filled under (a reorg can drop blocks).
+        self.known_blocks = ThreadSafeSet()
+        self._known_blocks_tip = None
+        self.max_known_blocks = 4096
+        
+        # Message dispatch table, built once rather than per message
+        self._handlers: Dict[str, Callable] = {
+            'version': self.handle_version,
+            'verack': self.handle_verack,
+            'getheaders': self.handle_getheaders,
+            'headers': self.handle_headers,
+            'getdata': self.handle_getdata,
+            'block': self.handle_block,
+            'inv': self.handle_inv,
+            'new_transaction': self.handle_new_transaction,
+            'peer_list': self.handle_peer_list,
+            'ping': self.handle_ping,
+            'pong': self.handle_pong,
+            'getaddr': self.handle_getaddr,
+            'addr': self.handle_addr
+        }
         
         # Management components
         self.banscore_manager = BanscoreManager()
@@ -296,6 +512,11 @@ class GSCNetworkNode:
         self.server_socket = None
         self.running = False
         self.sync_lock = threading.RLock()
+        self.max_pending_connects = 8
+        self._pending_connects: Set[str] = set()  # host:port dials queued or in flight
+        self._pending_lock = threading.Lock()
+        self.max_peer_backlog = 32  # queued peer sessions before new ones are shed
+        self._create_executors()
         
         # Statistics
         self.messages_sent = AtomicCounter(0)
@@ -314,15 +535,26 @@ class GSCNetworkNode:
         """Generate unique node ID"""
         return hashlib.sha256(f"{socket.gethostname()}{time.time()}".encode()).hexdigest()[:16]
     
+    def _create_executors(self) -> None:
+        """Create the connect and peer session pools (again after stop_server)"""
+        self.connect_pool = ThreadPoolExecutor(max_workers=self.max_pending_connects,
+                                               thread_name_prefix="gsc-connect")
+        self._peer_pool = ThreadPoolExecutor(max_workers=self.connection_manager.max_connections * 2,
+                                             thread_name_prefix="gsc-peer")
+        self._executors_stopped = False
+    
     def start_server(self) -> bool:
         """Start P2P server"""
+        if self._executors_stopped:
+            self._create_executors()
+        
         try:
             self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            self.server_socket.settimeout(1.0)  # Non-blocking accept
             self.server_socket.bind(('0.0.0.0', self.port))
             self.server_socket.listen(10)
             self.running = True
+            self.banscore_manager.compact(force=True)  # Start from a compacted log
             
             network_logger.info(f"GSC Node started on port {self.port}")
             network_logger.info(f"Node ID: {self.node_id}")
@@ -339,6 +571,10 @@ class GSCNetworkNode:
             stats_thread = threading.Thread(target=self.report_stats, daemon=True)
             stats_thread.start()
             
+            # Start batched broadcast writer
+            send_thread = threading.Thread(target=self._send_loop, daemon=True)
+            send_thread.start()
+            
             return True
             
         except Exception as e:
@@ -350,8 +586,19 @@ class GSCNetworkNode:
         self.running = False
         
         if self.server_socket:
+            # Shutdown wakes the blocked accept(); close alone does not on Linux
+            try:
+                self.server_socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
             self.server_socket.close()
         
+        self._send_event.set()  # Let the send loop see running=False
+        self.connect_pool.shutdown(wait=False)
+        self._peer_pool.shutdown(wait=False)
+        self._executors_stopped = True
+        self.banscore_manager.compact(force=True)
+        self.save_peers()
         network_logger.info("P2P server stopped")
     
     def accept_connections(self) -> None:
@@ -375,20 +622,26 @@ class GSCNetworkNode:
                 
                 network_logger.info(f"New peer connected: {peer_address}")
                 
-                # Handle peer in separate thread
-                peer_thread = threading.Thread(
-                    target=self.handle_peer,
-                    args=(client_socket, address),
-                    daemon=True
-                )
-                peer_thread.start()
+                self.spawn_peer_handler(client_socket, address)
                 
-            except socket.timeout:
-                continue
             except Exception as e:
                 if self.running:
                     network_logger.error(f"Error accepting connection: {e}")
     
+    def spawn_peer_handler(self, sock: socket.socket, address: tuple) -> bool:
+        """Run handle_peer on the peer pool, shedding the connection if it is backed up"""
+        if self._peer_pool._work_queue.qsize() >= self.max_peer_backlog:
+            network_logger.warning(f"Peer pool saturated, dropping {address[0]}:{address[1]}")
+            sock.close()
+            return False
+        
+        try:
+            self._peer_pool.submit(self.handle_peer, sock, address)
+            return True
+        except RuntimeError:
+            sock.close()  # Pool shut down
+            return False
+    
     def handle_peer(self, client_socket: socket.socket, address: tuple) -> None:
         """Handle communication with a peer"""
         peer_address = f"{address[0]}:{address[1]}"
@@ -396,9 +649,18 @@ class GSCNetworkNode:
         # Set socket timeouts
         client_socket.settimeout(self.connection_manager.read_timeout)
         
+        # Don't let Nagle hold back small messages like the handshake
+        self.set_nodelay(client_socket)
+        
         # Track connection
         self.connection_manager.add_connection(peer_address)
         self.peers.add(peer_address)
+        self.peer_write_locks[client_socket] = threading.Lock()
+        self.peer_sockets[peer_address] = client_socket
+        self.peers_version.increment()
+        
+        # Message type -> when this session was last scored for flooding it
+        flood_scored: Dict[str, float] = {}
         
         try:
             # Send version message
@@ -406,13 +668,17 @@ class GSCNetworkNode:
             
             # Handle messages
             while self.running:
+                if self.banscore_manager.is_banned(address[0]):
+                    network_logger.warning(f"Closing session with banned peer {peer_address}")
+                    break
+                
                 try:
                     # Read message length first (4 bytes)
-                    length_data = self.recv_exact(client_socket, 4)
+                    length_data = self.recv_exact(client_socket, FRAME_HEADER.size)
                     if not length_data:
                         break
                     
-                    message_length = int.from_bytes(length_data, byteorder='big')
+                    (message_length,) = FRAME_HEADER.unpack(length_data)
                     if message_length > MessageValidator.MAX_MESSAGE_SIZE:
                         network_logger.warning(f"Message too large from {peer_address}: {message_length}")
                         self.banscore_manager.add_score(address[0], 50, "Oversized message")
@@ -425,7 +691,7 @@ class GSCNetworkNode:
                     
                     # Parse and validate message
                     try:
-                        message = json.loads(message_data.decode())
+                        message = MessageCodec.decode(message_data)
                         validation_error = MessageValidator.validate_message(message)
                         
                         if validation_error:
@@ -433,14 +699,23 @@ class GSCNetworkNode:
                             self.banscore_manager.add_score(address[0], 10, f"Invalid message: {validation_error}")
                             continue
                         
+                        if self.is_flooding(peer_address, message['type']):
+                            # Score a burst once per second, not once per dropped message
+                            now = time.monotonic()
+                            if now - flood_scored.get(message['type'], float('-inf')) >= 1.0:
+                                flood_scored[message['type']] = now
+                                self.banscore_manager.add_score(address[0], self.FLOOD_SCORE,
+                                                                f"{message['type']} flood")
+                            continue
+                        
                         # Process message
                         self.process_message(message, client_socket, peer_address)
                         self.messages_received.increment()
                         self.bytes_received.increment(len(message_data))
                         
-                    except json.JSONDecodeError as e:
-                        network_logger.warning(f"JSON decode error from {peer_address}: {e}")
-                        self.banscore_manager.add_score(address[0], 20, "JSON decode error")
+                    except ValueError as e:
+                        network_logger.warning(f"Message decode error from {peer_address}: {e}")
+                        self.banscore_manager.add_score(address[0], 20, "Message decode error")
                         continue
                 
                 except socket.timeout:
@@ -453,34 +728,86 @@ class GSCNetworkNode:
         
         finally:
             client_socket.close()
+            self.peer_codecs.pop(client_socket, None)
+            self.peer_write_locks.pop(client_socket, None)
+            with self._outbox_lock:
+                self._outbox.pop(client_socket, None)
+            if self.peer_sockets.get(peer_address) is client_socket:
+                del self.peer_sockets[peer_address]
+            self.peer_info.remove(peer_address)
+            for msg_type in self.MESSAGE_RATE_LIMITS:
+                self.message_windows.remove((peer_address, msg_type))
             self.connection_manager.remove_connection(peer_address)
             self.peers.discard(peer_address)
+            self.peers_version.increment()
             network_logger.debug(f"Peer disconnected: {peer_address}")
     
-    def recv_exact(self, sock: socket.socket, length: int) -> Optional[bytes]:
-        """Receive exact number of bytes"""
-        data = b''
-        while len(data) < length:
-            chunk = sock.recv(length - len(data))
-            if not chunk:
+    def is_flooding(self, peer_address: str, msg_type: str) -> bool:
+        """Count a message against its per-peer rate limit"""
+        limit = self.MESSAGE_RATE_LIMITS.get(msg_type)
+        if limit is None:
+            return False
+        
+        key = (peer_address, msg_type)
+        window = self.message_windows.get(key)
+        if window is None:
+            window = self.message_windows.setdefault(key, SlidingWindowCounter(1.0))
+        return window.hit() > limit
+    
+    @staticmethod
+    def set_nodelay(sock: socket.socket) -> None:
+        """Disable Nagle so small protocol messages go out immediately"""
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except OSError:
+            pass
+    
+    def new_tcp_socket(self, timeout: float) -> socket.socket:
+        """Create an outbound peer socket with TCP_NODELAY set before connecting"""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        self.set_nodelay(sock)
+        return sock
+    
+    def recv_exact(self, sock: socket.socket, length: int) -> Optional[bytearray]:
+        """Receive exact number of bytes into a single preallocated buffer"""
+        buf = bytearray(length)
+        view = memoryview(buf)
+        received = 0
+        while received < length:
+            n = sock.recv_into(view[received:], length - received)
+            if not n:
                 return None
-            data += chunk
-        return data
+            received += n
+        return buf
+    
+    def encode_frame(self, message: Dict[str, Any], codec: str) -> bytes:
+        """Encode a message and prepend its length prefix"""
+        message_data = MessageCodec.encode(message, codec)
+        return FRAME_HEADER.pack(len(message_data)) + message_data
     
     def send_message(self, sock: socket.socket, message: Dict[str, Any]) -> bool:
         """Send a message with length prefix"""
         try:
-            message_data = json.dumps(message).encode()
-            message_length = len(message_data)
-            
-            # Send length prefix
-            sock.send(message_length.to_bytes(4, byteorder='big'))
-            
-            # Send message data
-            sock.send(message_data)
+            frame = self.encode_frame(message, self.peer_codecs.get(sock, MessageCodec.JSON))
+        except Exception as e:
+            network_logger.error(f"Failed to encode message: {e}")
+            return False
+        return self.send_frame(sock, frame)
+    
+    def send_frame(self, sock: socket.socket, frame: bytes, count: int = 1) -> bool:
+        """Send an already framed message (or count concatenated frames)"""
+        try:
+            # Prefix and payload in one write; sendall retries short writes
+            lock = self.peer_write_locks.get(sock)
+            if lock:
+                with lock:
+                    sock.sendall(frame)
+            else:
+                sock.sendall(frame)
             
-            self.messages_sent.increment()
-            self.bytes_sent.increment(message_length)
+            self.messages_sent.increment(count)
+            self.bytes_sent.increment(len(frame) - FRAME_HEADER.size * count)
             
             return True
             
@@ -488,6 +815,116 @@ class GSCNetworkNode:
             network_logger.error(f"Failed to send message: {e}")
             return False
     
+    def _flush_outbox(self, outbox: Dict[socket.socket, List[bytes]],
+                      timeout: float = SEND_TIMEOUT) -> None:
+        """Write queued frames to all peers as each socket has room, for up to timeout seconds
+        
+        Peer sockets carry a read timeout, which makes them non-blocking underneath, so
+        a write after select reports the socket writable returns at once with what fit.
+        A slow peer therefore never holds up the others.
+        """
+        deadline = time.monotonic() + timeout
+        pending = {}  # sock -> [buffers, index of first unsent buffer, write lock, total bytes]
+        for sock, frames in outbox.items():
+            lock = self.peer_write_locks.get(sock)
+            if lock and not lock.acquire(timeout=max(0.0, deadline - time.monotonic())):
+                network_logger.warning(f"Peer writer busy for {timeout}s, dropping {len(frames)} queued messages")
+                continue
+            pending[sock] = [[memoryview(frame) for frame in frames], 0, lock, sum(map(len, frames))]
+        
+        try:
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    writable = select.select([], list(pending), [], remaining)[1]
+                except (OSError, ValueError):
+                    # A peer socket was closed under us; forget it and carry on
+                    for sock in [s for s in pending if s.fileno() < 0]:
+                        self._finish_send(sock, pending.pop(sock), OSError("socket closed"))
+                    continue
+                
+                for sock in writable:
+                    state = pending[sock]
+                    views, start = state[0], state[1]
+                    try:
+                        if SENDMSG_AVAILABLE:
+                            sent = sock.sendmsg(views[start:start + MAX_IOV])
+                        else:
+                            sent = sock.send(views[start])
+                    except OSError as e:
+                        self._finish_send(sock, pending.pop(sock), e)
+                        continue
+                    
+                    # Skip what was written, including empty buffers
+                    while start < len(views) and sent >= len(views[start]):
+                        sent -= len(views[start])
+                        start += 1
+                    if sent:
+                        views[start] = views[start][sent:]
+                    state[1] = start
+                    
+                    if start == len(views):
+                        self._finish_send(sock, pending.pop(sock), None)
+        finally:
+            for sock, state in pending.items():
+                self._finish_send(sock, state, socket.timeout(f"send stalled for {timeout}s"))
+    
+    def _finish_send(self, sock: socket.socket, state: list, error: Optional[Exception]) -> None:
+        """Record a completed peer write, or drop a peer whose write failed part way"""
+        views, _, lock, total = state
+        try:
+            if error is None:
+                self.messages_sent.increment(len(views))
+                self.bytes_sent.increment(total - FRAME_HEADER.size * len(views))
+            else:
+                network_logger.warning(f"Failed to send queued messages, closing connection: {error}")
+                # A frame may be half written, so the stream cannot be resumed
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+        finally:
+            if lock:
+                lock.release()
+    
+    def cached_frame(self, key: tuple, build: Callable[[], bytes]) -> bytes:
+        """Return a framed response from the cache, building it if missing or expired"""
+        now = time.monotonic()
+        with self._response_cache_lock:
+            entry = self._response_cache.get(key)
+            if entry and entry[0] > now:
+                return entry[1]
+        
+        frame = build()
+        with self._response_cache_lock:
+            if len(self._response_cache) >= 256:
+                # Drop expired entries (stale peer set versions, old chain heights)
+                self._response_cache = {k: v for k, v in self._response_cache.items() if v[0] > now}
+            self._response_cache[key] = (now + self.response_cache_ttl, frame)
+        return frame
+    
+    def block_frame(self, block_hash: str, codec: str) -> Optional[bytes]:
+        """Return the framed block message for a hash, encoding it once per codec"""
+        key = (block_hash, codec)
+        with self._response_cache_lock:
+            frame = self._block_frames.get(key)
+            if frame:
+                self._block_frames.move_to_end(key)
+                return frame
+        
+        block = self.blockchain.get_block_by_hash(block_hash)
+        if not block:
+            return None
+        
+        frame = self.encode_frame({'type': 'block', 'block': block.to_dict()}, codec)
+        with self._response_cache_lock:
+            self._block_frames[key] = frame
+            if len(self._block_frames) > self.block_frame_cache_size:
+                self._block_frames.popitem(last=False)
+        return frame
+    
     def send_version(self, sock: socket.socket, peer_address: str) -> None:
         """Send version message"""
         version_msg = {
@@ -498,7 +935,8 @@ class GSCNetworkNode:
             'user_agent': 'GSCCoin/1.0',
             'services': 0,
             'height': len(self.blockchain.chain),
-            'port': self.port
+            'port': self.port,
+            'codecs': MessageCodec.SUPPORTED
         }
         
         self.send_message(sock, version_msg)
@@ -516,23 +954,7 @@ class GSCNetworkNode:
         """Process incoming message"""
         msg_type = message.get('type')
         
-        handlers = {
-            'version': self.handle_version,
-            'verack': self.handle_verack,
-            'getheaders': self.handle_getheaders,
-            'headers': self.handle_headers,
-            'getdata': self.handle_getdata,
-            'block': self.handle_block,
-            'inv': self.handle_inv,
-            'new_transaction': self.handle_new_transaction,
-            'peer_list': self.handle_peer_list,
-            'ping': self.handle_ping,
-            'pong': self.handle_pong,
-            'getaddr': self.handle_getaddr,
-            'addr': self.handle_addr
-        }
-        
-        handler = handlers.get(msg_type)
+        handler = self._handlers.get(msg_type)
         if handler:
             try:
                 handler(message, client_socket, peer_address)
@@ -560,6 +982,9 @@ class GSCNetworkNode:
         
         self.peer_info.set(peer_address, peer_info)
         
+        # Switch to the best codec both sides understand (version itself is always JSON)
+        self.peer_codecs[client_socket] = MessageCodec.negotiate(message.get('codecs', []))
+        
         # Send verack
         verack_msg = {'type': 'verack'}
         self.send_message(client_socket, verack_msg)
@@ -584,13 +1009,19 @@ class GSCNetworkNode:
     
     def handle_getaddr(self, message: Dict[str, Any], client_socket: socket.socket, peer_address: str) -> None:
         """Handle getaddr request"""
-        # Send list of known peers
-        peer_list = list(self.peers)[:50]  # Limit to 50 peers
-        addr_msg = {
-            'type': 'addr',
-            'addresses': peer_list
-        }
-        self.send_message(client_socket, addr_msg)
+        # Send list of known peers, reusing the encoded list while the peer set is unchanged
+        codec = self.peer_codecs.get(client_socket, MessageCodec.JSON)
+        
+        def build() -> bytes:
+            peer_list = list(self.peers)[:50]  # Limit to 50 peers
+            addr_msg = {
+                'type': 'addr',
+                'addresses': peer_list
+            }
+            return self.encode_frame(addr_msg, codec)
+        
+        frame = self.cached_frame(('addr', codec, self.peers_version.get()), build)
+        self.send_frame(client_socket, frame)
     
     def handle_addr(self, message: Dict[str, Any], client_socket: socket.socket, peer_address: str) -> None:
         """Handle addr response"""
@@ -599,12 +1030,13 @@ class GSCNetworkNode:
         
         # Try to connect to new peers
         for addr in addresses:
-            if addr not in self.peers and not self.banscore_manager.is_banned(addr):
-                threading.Thread(
-                    target=self.connect_to_peer,
-                    args=(addr.split(':')[0], int(addr.split(':')[1])),
-                    daemon=True
-                ).start()
+            host, _, port = addr.rpartition(':')
+            # Bans are keyed by host, so check that rather than host:port
+            if addr not in self.peers and not self.banscore_manager.is_banned(host):
+                try:
+                    self.schedule_connect(host, int(port))
+                except ValueError:
+                    continue
     
     def handle_getheaders(self, message: Dict[str, Any], client_socket: socket.socket, peer_address: str) -> None:
         """Handle getheaders request"""
@@ -612,14 +1044,20 @@ class GSCNetworkNode:
             locator_hash = message.get('locator_hash', '0' * 64)
             stop_hash = message.get('stop_hash', '0' * 64)
             
-            headers = self.blockchain.get_block_headers(locator_hash, 2000)
+            codec = self.peer_codecs.get(client_socket, MessageCodec.JSON)
             
-            response = {
-                'type': 'headers',
-                'count': len(headers),
-                'headers': headers
-            }
-            self.send_message(client_socket, response)
+            def build() -> bytes:
+                headers = self.blockchain.get_block_headers(locator_hash, 2000)
+                response = {
+                    'type': 'headers',
+                    'count': len(headers),
+                    'headers': headers
+                }
+                return self.encode_frame(response, codec)
+            
+            # Same locator at the same height always yields the same headers
+            key = ('headers', codec, locator_hash, len(self.blockchain.chain))
+            self.send_frame(client_socket, self.cached_frame(key, build))
             
         except Exception as e:
             network_logger.error(f"Error handling getheaders: {e}")
@@ -629,9 +1067,9 @@ class GSCNetworkNode:
         headers = message.get('headers', [])
         network_logger.info(f"Received {len(headers)} headers from {peer_address}")
         
-        if headers:
-            # Request blocks for these headers
-            block_hashes = [h['hash'] for h in headers]
+        # Request only the blocks we don't already have
+        block_hashes = [h['hash'] for h in headers if not self.has_block(h['hash'])]
+        if block_hashes:
             self.request_blocks(peer_address, block_hashes)
     
     def handle_getdata(self, message: Dict[str, Any], client_socket: socket.socket, peer_address: str) -> None:
@@ -640,13 +1078,10 @@ class GSCNetworkNode:
         
         for item in items:
             if item['type'] == 'block':
-                block = self.blockchain.get_block_by_hash(item['hash'])
-                if block:
-                    response = {
-                        'type': 'block',
-                        'block': block.to_dict()
-                    }
-                    self.send_message(client_socket, response)
+                codec = self.peer_codecs.get(client_socket, MessageCodec.JSON)
+                frame = self.block_frame(item['hash'], codec)
+                if frame:
+                    self.send_frame(client_socket, frame)
     
     def handle_block(self, message: Dict[str, Any], client_socket: socket.socket, peer_address: str) -> None:
         """Handle block message"""
@@ -687,15 +1122,32 @@ class GSCNetworkNode:
         """Handle inventory message"""
         items = message.get('items', [])
         blocks_to_request = []
+        seen = set()
         
         for item in items:
-            if item['type'] == 'block':
-                if not self.blockchain.get_block_by_hash(item['hash']):
+            if item['type'] == 'block' and item['hash'] not in seen:
+                seen.add(item['hash'])
+                if not self.has_block(item['hash']):
                     blocks_to_request.append(item['hash'])
         
         if blocks_to_request:
             self.request_blocks(peer_address, blocks_to_request)
     
+    def has_block(self, block_hash: str) -> bool:
+        """Check whether a block is on our chain, remembering positive hits"""
+        latest = self.blockchain.get_latest_block()
+        tip = latest.hash if latest else None
+        if tip != self._known_blocks_tip or len(self.known_blocks) >= self.max_known_blocks:
+            self.known_blocks.clear()
+            self._known_blocks_tip = tip
+        
+        if block_hash in self.known_blocks:
+            return True
+        if self.blockchain.get_block_by_hash(block_hash):
+            self.known_blocks.add(block_hash)
+            return True
+        return False
+    
     def handle_new_transaction(self, message: Dict[str, Any], client_socket: socket.socket, peer_address: str) -> None:
         """Handle new transaction"""
         try:
@@ -716,30 +1168,30 @@ class GSCNetworkNode:
         network_logger.debug(f"Received {len(peers)} peers from {peer_address}")
         
         for peer in peers:
-            if peer not in self.peers and not self.banscore_manager.is_banned(peer):
+            host, _, port = peer.rpartition(':')
+            if peer not in self.peers and not self.banscore_manager.is_banned(host):
                 try:
-                    host, port = peer.split(':')
-                    threading.Thread(
-                        target=self.connect_to_peer,
-                        args=(host, int(port)),
-                        daemon=True
-                    ).start()
-                except:
-                    pass
+                    self.schedule_connect(host, int(port))
+                except ValueError:
+                    continue
     
     def request_blocks(self, peer_address: str, block_hashes: List[str]) -> None:
         """Request blocks from peer"""
+        request = {
+            'type': 'getdata',
+            'items': [{'type': 'block', 'hash': h} for h in block_hashes]
+        }
+        
+        # Reuse the live connection so the blocks come back on it
+        sock = self.peer_sockets.get(peer_address)
+        if sock and self.send_message(sock, request):
+            return
+        
         try:
             host, port = peer_address.split(':')
-            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            s.settimeout(10.0)
+            s = self.new_tcp_socket(10.0)
             s.connect((host, int(port)))
             
-            request = {
-                'type': 'getdata',
-                'items': [{'type': 'block', 'hash': h} for h in block_hashes]
-            }
-            
             self.send_message(s, request)
             s.close()
             
@@ -753,23 +1205,15 @@ class GSCNetworkNode:
         if not self.connection_manager.can_connect(peer_address):
             return False
         
-        self.connection_manager.record_connection_attempt(peer_address)
-        
         try:
-            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            s.settimeout(self.connection_manager.connection_timeout)
+            s = self.new_tcp_socket(self.connection_manager.connection_timeout)
             s.connect((host, port))
             
-            # Send version
-            self.send_version(s, peer_address)
-            
-            # Handle responses in separate thread
-            threading.Thread(
-                target=self.handle_peer,
-                args=(s, (host, port)),
-                daemon=True
-            ).start()
+            # handle_peer opens with our version message
+            if not self.spawn_peer_handler(s, (host, port)):
+                return False
             
+            self.remember_peer(peer_address)
             network_logger.info(f"Connected to peer: {peer_address}")
             return True
             
@@ -777,22 +1221,108 @@ class GSCNetworkNode:
             network_logger.debug(f"Failed to connect to {peer_address}: {e}")
             return False
     
+    def schedule_connect(self, host: str, port: int):
+        """Queue an outbound connect on the bounded connect pool, once per address"""
+        peer_address = f"{host}:{port}"
+        with self._pending_lock:
+            if peer_address in self._pending_connects:
+                return None
+            self._pending_connects.add(peer_address)
+        
+        try:
+            return self.connect_pool.submit(self._connect_and_release, host, port)
+        except RuntimeError:
+            self._release_connect(peer_address)
+            return None  # Pool already shut down
+    
+    def _connect_and_release(self, host: str, port: int) -> bool:
+        """Run a queued connect and clear its pending entry"""
+        try:
+            return self.connect_to_peer(host, port)
+        finally:
+            self._release_connect(f"{host}:{port}")
+    
+    def _release_connect(self, peer_address: str) -> None:
+        """Forget a pending connect"""
+        with self._pending_lock:
+            self._pending_connects.discard(peer_address)
+    
+    def dial_batch(self, addresses: List[str]) -> None:
+        """Dial host:port addresses in parallel on the connect pool and wait for them"""
+        pending = []
+        for addr in addresses:
+            host, _, port = addr.rpartition(':')
+            pending.append(self.schedule_connect(host, int(port)))
+        
+        for future in filter(None, pending):
+            future.result()
+    
+    def remember_peer(self, peer_address: str) -> None:
+        """Record a successful outbound connection for future startups"""
+        with self._saved_peers_lock:
+            self.saved_peers.pop(peer_address, None)
+            self.saved_peers[peer_address] = time.time()
+            while len(self.saved_peers) > self.max_saved_peers:
+                self.saved_peers.popitem(last=False)
+            self._saved_peers_dirty = True
+    
+    def recent_saved_peers(self, limit: int) -> List[str]:
+        """Most recently connected saved peers, newest first"""
+        with self._saved_peers_lock:
+            return list(reversed(self.saved_peers))[:limit]
+    
+    def load_saved_peers(self) -> None:
+        """Load peers remembered by earlier runs"""
+        try:
+            if os.path.exists(self.peers_file):
+                with open(self.peers_file, 'r') as f:
+                    saved = json.load(f)
+                for addr, last_seen in sorted(saved.items(), key=lambda item: item[1])[-self.max_saved_peers:]:
+                    self.saved_peers[addr] = last_seen
+                network_logger.info(f"Loaded {len(self.saved_peers)} saved peers")
+        except Exception as e:
+            network_logger.error(f"Failed to load saved peers: {e}")
+    
+    def save_peers(self) -> None:
+        """Write remembered peers to disk if they changed"""
+        with self._saved_peers_lock:
+            if not self._saved_peers_dirty:
+                return
+            snapshot = dict(self.saved_peers)
+            self._saved_peers_dirty = False
+        
+        tmp_file = f"{self.peers_file}.tmp"
+        try:
+            with open(tmp_file, 'w') as f:
+                json.dump(snapshot, f, separators=(',', ':'))
+            os.replace(tmp_file, self.peers_file)
+        except Exception as e:
+            network_logger.error(f"Failed to save peers: {e}")
+    
     def discover_peers(self) -> None:
         """Discover and connect to peers"""
         while self.running:
             try:
+                # Peers are tracked as host:port, so candidates use that form too.
+                # Try peers from earlier runs first; seeds and DNS only if still short
+                connected = self.peers.copy()
+                if len(connected) < 3:
+                    self.dial_batch([addr for addr in self.recent_saved_peers(16) if addr not in connected])
+                
                 # Connect to seed nodes if we have few peers
-                if len(self.peers) < 3:
-                    for seed in self.seed_nodes:
-                        if seed not in self.peers:
-                            self.connect_to_peer(seed, 8333)
+                connected = self.peers.copy()
+                if len(connected) < 3:
+                    self.dial_batch([f"{seed}:8333" for seed in self.seed_nodes
+                                     if f"{seed}:8333" not in connected])
                 
                 # Try DNS seeds if still few peers
-                if len(self.peers) < 5:
+                connected = self.peers.copy()
+                if len(connected) < 5:
                     dns_peers = self.dns_seeder.get_peers_from_dns()
-                    for peer in dns_peers[:10]:  # Try first 10
-                        if peer not in self.peers:
-                            self.connect_to_peer(peer, 8333)
+                    self.dial_batch([f"{peer}:8333" for peer in dns_peers[:10]  # Try first 10
+                                     if f"{peer}:8333" not in connected])
+                
+                self.save_peers()
                 
                 # Sleep before next discovery cycle
                 time.sleep(60)
@@ -809,38 +1339,62 @@ class GSCNetworkNode:
             'sender': self.node_id
         }
         
-        for peer_address in self.peers:
-            if exclude_peer and peer_address == exclude_peer:
-                continue
-            
-            try:
-                host, port = peer_address.split(':')
-                s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                s.settimeout(5.0)
-                s.connect((host, int(port)))
-                self.send_message(s, message)
-                s.close()
-            except:
-                pass
+        targets = [sock for peer_address, sock in list(self.peer_sockets.items())
+                   if not (exclude_peer and peer_address == exclude_peer)]
+        self.broadcast_message(message, targets)
     
     def broadcast_block(self, block: Block) -> None:
         """Broadcast block to all peers"""
-        message = {
-            'type': 'inv',
-            'items': [{'type': 'block', 'hash': block.hash}],
-            'sender': self.node_id
-        }
+        def message() -> Dict[str, Any]:
+            return {
+                'type': 'inv',
+                'items': [{'type': 'block', 'hash': block.hash}],
+                'sender': self.node_id
+            }
         
-        for peer_address in self.peers:
-            try:
-                host, port = peer_address.split(':')
-                s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                s.settimeout(5.0)
-                s.connect((host, int(port)))
-                self.send_message(s, message)
-                s.close()
-            except:
-                pass
+        # JSON peers get the frame straight from the template; the dict is only
+        # built if some peer uses another codec
+        body = (self._inv_block_template % block.hash).encode('ascii')
+        frames = {MessageCodec.JSON: FRAME_HEADER.pack(len(body)) + body}
+        self.broadcast_message(message, list(self.peer_sockets.values()), frames)
+    
+    def broadcast_message(self, message: Union[Dict[str, Any], Callable[[], Dict[str, Any]]],
+                          socks: List[socket.socket],
+                          frames: Optional[Dict[str, bytes]] = None) -> int:
+        """Queue a message (or a builder for it) for many peers and wake the send loop once"""
+        # Encode once per codec; every peer on that codec shares the same frame
+        frames = dict(frames or {})
+        targets = []
+        for sock in socks:
+            codec = self.peer_codecs.get(sock, MessageCodec.JSON)
+            frame = frames.get(codec)
+            if frame is None:
+                if callable(message):
+                    message = message()  # Only needed for codecs without a prebuilt frame
+                frame = frames[codec] = self.encode_frame(message, codec)
+            targets.append((sock, frame))
+        
+        if not self.running:
+            # No send loop to drain the outbox; write directly
+            return sum(1 for sock, frame in targets if self.send_frame(sock, frame))
+        
+        with self._outbox_lock:
+            for sock, frame in targets:
+                self._outbox.setdefault(sock, []).append(frame)
+        self._send_event.set()
+        return len(targets)
+    
+    def _send_loop(self) -> None:
+        """Drain queued broadcast frames, writing to all peers concurrently per wakeup"""
+        while self.running:
+            self._send_event.wait()
+            self._send_event.clear()
+            
+            with self._outbox_lock:
+                outbox, self._outbox = self._outbox, {}
+            
+            if outbox:
+                self._flush_outbox(outbox)
     
     def report_stats(self) -> None:
         """Report network statistics"""
@@ -854,12 +1408,9 @@ class GSCNetworkNode:
                     f"Bytes received: {self.bytes_received.get()}"
                 )
                 
-                # Clean up old connection attempts
-                current_time = time.time()
-                for peer, attempts in self.connection_attempts.connection_attempts._dict.items():
-                    self.connection_attempts.connection_attempts._dict[peer] = [
-                        t for t in attempts if current_time - t < 300
-                    ]
+                # Forget rate-limit state for peers that have gone quiet
+                self.connection_manager.prune_buckets()
+                self.banscore_manager.compact()
                 
                 time.sleep(300)  # Report every 5 minutes
                 
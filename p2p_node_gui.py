@@ -9,8 +9,21 @@ import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
 import threading
 import time
+from collections import deque
 from bitcoin_p2p_node import BitcoinP2PNode
 
+LOG_FLUSH_INTERVAL_MS = 100  # How often buffered log lines reach the widget
+
+_last_ts = [0, ""]  # [epoch second, formatted HH:MM:SS] of the last log line
+
+def _hms():
+    """Current time as HH:MM:SS, formatted at most once per second"""
+    now = int(time.time())
+    if now != _last_ts[0]:
+        _last_ts[0] = now
+        _last_ts[1] = time.strftime("%H:%M:%S", time.localtime(now))
+    return _last_ts[1]
+
 class P2PNodeGUI:
     def __init__(self):
         self.root = tk.Tk()
@@ -20,6 +33,7 @@ class P2PNodeGUI:
         self.node = None
         self.update_thread = None
         self.running = False
+        self._shown_peers = []  # Peers currently in the listbox, in display order
         
         self.setup_gui()
     
@@ -111,9 +125,11 @@ class P2PNodeGUI:
         self.log_text = scrolledtext.ScrolledText(log_frame, height=10, wrap=tk.WORD)
         self.log_text.pack(fill=tk.BOTH, expand=True)
         
-        # Redirect print to log
+        # Redirect print to log; lines are buffered and flushed on the Tk thread
         import sys
-        sys.stdout = LogRedirector(self.log_text)
+        self.log_redirector = LogRedirector(self.log_text)
+        sys.stdout = self.log_redirector
+        self.root.after(LOG_FLUSH_INTERVAL_MS, self._drain_log)
     
     def start_node(self):
         try:
@@ -156,6 +172,7 @@ class P2PNodeGUI:
         self.known_count_label.config(text="0")
         
         self.peer_listbox.delete(0, tk.END)
+        self._shown_peers = []
         
         self.log("Node stopped")
     
@@ -181,17 +198,9 @@ class P2PNodeGUI:
             try:
                 status = self.node.get_status()
                 
-                # Update peer counts
-                self.root.after(0, lambda: self.peer_count_label.config(text=str(status['connected_peers'])))
-                self.root.after(0, lambda: self.known_count_label.config(text=str(status['known_peers'])))
-                
-                # Update peer list
-                def update_peer_list():
-                    self.peer_listbox.delete(0, tk.END)
-                    for peer in status['peer_list']:
-                        self.peer_listbox.insert(tk.END, f"🔗 {peer}")
-                
-                self.root.after(0, update_peer_list)
+                # One Tk callback per tick; args are bound now, not when it runs
+                self.root.after(0, self._apply_status, status['connected_peers'],
+                                status['known_peers'], list(status['peer_list']))
                 
                 time.sleep(2)  # Update every 2 seconds
                 
@@ -199,11 +208,38 @@ class P2PNodeGUI:
                 self.log(f"Update error: {e}")
                 break
     
+    def _apply_status(self, connected, known, peers):
+        """Show a node status snapshot (runs on the Tk thread)"""
+        self.peer_count_label.config(text=str(connected))
+        self.known_count_label.config(text=str(known))
+        self._render_peer_list(peers)
+    
+    def _render_peer_list(self, peers):
+        """Apply peer list changes to the listbox instead of rebuilding it"""
+        if peers == self._shown_peers:
+            return
+        
+        # Delete departed peers bottom-up so earlier indices stay valid
+        current = set(peers)
+        for index in range(len(self._shown_peers) - 1, -1, -1):
+            if self._shown_peers[index] not in current:
+                self.peer_listbox.delete(index)
+                del self._shown_peers[index]
+        
+        shown = set(self._shown_peers)
+        for peer in peers:
+            if peer not in shown:
+                self.peer_listbox.insert(tk.END, f"🔗 {peer}")
+                self._shown_peers.append(peer)
+    
     def log(self, message):
         """Add message to log"""
-        timestamp = time.strftime("%H:%M:%S")
-        self.log_text.insert(tk.END, f"[{timestamp}] {message}\n")
-        self.log_text.see(tk.END)
+        self.log_redirector.write(f"{message}\n")
+    
+    def _drain_log(self):
+        """Flush buffered log lines into the widget and reschedule"""
+        self.log_redirector.drain()
+        self.root.after(LOG_FLUSH_INTERVAL_MS, self._drain_log)
     
     def run(self):
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
@@ -219,12 +255,22 @@ class LogRedirector:
     """Redirect print statements to GUI log"""
     def __init__(self, text_widget):
         self.text_widget = text_widget
+        self.pending = deque()  # Written from any thread, drained on the Tk thread
     
     def write(self, message):
         if message.strip():  # Only log non-empty messages
-            timestamp = time.strftime("%H:%M:%S")
-            self.text_widget.insert(tk.END, f"[{timestamp}] {message}")
-            self.text_widget.see(tk.END)
+            self.pending.append(f"[{_hms()}] {message}")
+    
+    def drain(self):
+        """Insert everything written since the last drain in one widget update"""
+        if not self.pending:
+            return
+        
+        lines = []
+        while self.pending:
+            lines.append(self.pending.popleft())
+        self.text_widget.insert(tk.END, "".join(lines))
+        self.text_widget.see(tk.END)
     
     def flush(self):
         pass
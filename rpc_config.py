@@ -6,6 +6,21 @@ Network configuration for external IP connectivity
 import socket
 import json
 import os
+import time
+import errno
+import threading
+import http.client
+import selectors
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+LOCAL_IP_TTL = 60  # seconds
+PUBLIC_IP_TTL = 900  # seconds
+PUBLIC_IP_TIMEOUT = 3  # seconds
 
 class RPCConfig:
     """RPC Server Configuration Manager"""
@@ -27,18 +42,34 @@ class RPCConfig:
             "rate_limit_requests": 30,
             "rate_limit_window": 60
         }
+        self.config = None
+        self._config_mtime = None  # mtime of the file self.config was parsed from
         self.config = self.load_config()
+        self._refresh_allowed_ips()
+        
+        # (value, expiry) pairs so repeated lookups skip the socket/HTTPS round-trip
+        self._local_ip_cache = (None, 0.0)
+        self._cached_public_ip = "Unknown"
+        self._public_ip_lock = threading.Lock()
+        self._public_ip_thread = None
     
     def load_config(self):
         """Load configuration from file or create default"""
         try:
             if os.path.exists(self.config_file):
-                with open(self.config_file, 'r') as f:
-                    config = json.load(f)
+                # Unchanged since the last parse: keep what we have
+                mtime = os.stat(self.config_file).st_mtime
+                if self.config is not None and mtime == self._config_mtime:
+                    return self.config
+                
+                with open(self.config_file, 'rb') as f:
+                    raw = f.read()
+                config = orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
                 # Merge with defaults for any missing keys
                 for key, value in self.default_config.items():
                     if key not in config:
                         config[key] = value
+                self._config_mtime = mtime
                 return config
             else:
                 self.save_config(self.default_config)
@@ -51,87 +82,145 @@ class RPCConfig:
         """Save configuration to file"""
         try:
             config_to_save = config or self.config
-            with open(self.config_file, 'w') as f:
-                json.dump(config_to_save, f, indent=2)
+            if ORJSON_AVAILABLE:
+                data = orjson.dumps(config_to_save, option=orjson.OPT_INDENT_2)
+            else:
+                data = json.dumps(config_to_save, indent=2).encode()
+            with open(self.config_file, 'wb') as f:
+                f.write(data)
             return True
         except Exception as e:
             print(f"Error saving RPC config: {e}")
             return False
     
     def get_local_ip(self):
-        """Get local network IP address"""
+        """Get local network IP address (cached for LOCAL_IP_TTL)"""
+        ip, expiry = self._local_ip_cache
+        if time.monotonic() < expiry:
+            return ip
+        
         try:
             s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
             s.connect(("8.8.8.8", 80))
             ip = s.getsockname()[0]
             s.close()
-            return ip
         except:
-            return "127.0.0.1"
+            ip = "127.0.0.1"
+        
+        self._local_ip_cache = (ip, time.monotonic() + LOCAL_IP_TTL)
+        return ip
     
     def get_public_ip(self):
-        """Get public IP address (requires internet)"""
+        """Get public IP address from the background refresher (never blocks)"""
+        if self._public_ip_thread is None:
+            with self._public_ip_lock:
+                if self._public_ip_thread is None:
+                    self._public_ip_thread = threading.Thread(
+                        target=self._refresh_public_ip_loop, daemon=True)
+                    self._public_ip_thread.start()
+        return self._cached_public_ip
+    
+    def _fetch_public_ip(self):
+        """Query api.ipify.org for the public IP address"""
+        conn = http.client.HTTPSConnection("api.ipify.org", timeout=PUBLIC_IP_TIMEOUT)
         try:
-            import urllib.request
-            response = urllib.request.urlopen('https://api.ipify.org', timeout=5)
-            return response.read().decode('utf-8')
-        except:
-            return "Unknown"
+            conn.request("GET", "/")
+            response = conn.getresponse()
+            if response.status != 200:
+                raise OSError(f"HTTP {response.status}")
+            return response.read().decode('utf-8').strip()
+        finally:
+            conn.close()
+    
+    def _refresh_public_ip_loop(self):
+        """Refresh the cached public IP every PUBLIC_IP_TTL seconds"""
+        while True:
+            try:
+                self._cached_public_ip = self._fetch_public_ip()
+            except Exception:
+                pass  # keep the last known value
+            time.sleep(PUBLIC_IP_TTL)
     
     def get_network_info(self):
         """Get comprehensive network information"""
+        local_ip = self.get_local_ip()
+        public_ip = self.get_public_ip()
         return {
-            "local_ip": self.get_local_ip(),
-            "public_ip": self.get_public_ip(),
+            "local_ip": local_ip,
+            "public_ip": public_ip,
             "rpc_host": self.config["rpc_host"],
             "rpc_port": self.config["rpc_port"],
             "local_url": f"http://127.0.0.1:{self.config['rpc_port']}",
-            "network_url": f"http://{self.get_local_ip()}:{self.config['rpc_port']}",
-            "external_url": f"http://{self.get_public_ip()}:{self.config['rpc_port']}"
+            "network_url": f"http://{local_ip}:{self.config['rpc_port']}",
+            "external_url": f"http://{public_ip}:{self.config['rpc_port']}"
         }
     
+    def _refresh_allowed_ips(self):
+        """Rebuild the allow-list lookup set from the config"""
+        self._allowed_ips = frozenset(self.config["rpc_allow_ip"])
+        self._allow_all = "*" in self._allowed_ips
+    
     def is_ip_allowed(self, ip):
         """Check if IP is allowed to connect"""
-        if "*" in self.config["rpc_allow_ip"]:
-            return True
-        return ip in self.config["rpc_allow_ip"]
+        return self._allow_all or ip in self._allowed_ips
     
     def add_allowed_ip(self, ip):
         """Add IP to allowed list"""
         if ip not in self.config["rpc_allow_ip"]:
             self.config["rpc_allow_ip"].append(ip)
+            self._refresh_allowed_ips()
             self.save_config()
     
     def remove_allowed_ip(self, ip):
         """Remove IP from allowed list"""
         if ip in self.config["rpc_allow_ip"]:
             self.config["rpc_allow_ip"].remove(ip)
+            self._refresh_allowed_ips()
             self.save_config()
     
     def test_connectivity(self):
         """Test network connectivity"""
-        results = {}
-        
-        # Test local connectivity
-        try:
-            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            s.settimeout(1)
-            result = s.connect_ex(('127.0.0.1', self.config["rpc_port"]))
-            s.close()
-            results["local"] = result == 0
-        except:
-            results["local"] = False
+        port = self.config["rpc_port"]
+        targets = {
+            "local": ('127.0.0.1', port),
+            "network": (self.get_local_ip(), port)
+        }
+        return self._probe_ports(targets, timeout=1.0)
+    
+    def _probe_ports(self, targets, timeout=1.0):
+        """Start non-blocking connects to all targets and wait for them together"""
+        results = {name: False for name in targets}
+        selector = selectors.DefaultSelector()
+        sockets = []
         
-        # Test network connectivity
         try:
-            local_ip = self.get_local_ip()
-            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            s.settimeout(1)
-            result = s.connect_ex((local_ip, self.config["rpc_port"]))
-            s.close()
-            results["network"] = result == 0
-        except:
-            results["network"] = False
+            for name, address in targets.items():
+                try:
+                    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                    sockets.append(s)
+                    s.setblocking(False)
+                    result = s.connect_ex(address)
+                except OSError:
+                    continue
+                
+                if result == 0:
+                    results[name] = True
+                elif result in (errno.EINPROGRESS, errno.EWOULDBLOCK):
+                    selector.register(s, selectors.EVENT_WRITE, name)
+            
+            deadline = time.monotonic() + timeout
+            while selector.get_map():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                for key, _ in selector.select(remaining):
+                    error = key.fileobj.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                    results[key.data] = error == 0
+                    selector.unregister(key.fileobj)
+        finally:
+            selector.close()
+            for s in sockets:
+                s.close()
         
         return results
     
@@ -14,10 +14,31 @@ from typing import Dict, List, Any, Optional, Callable
 import sys
 import os
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 from gsc_logger import rpc_logger
-from thread_safety import RateLimiter, ThreadSafeDict
+from thread_safety import RateLimiter, ShardedDict
 from rpc_config import rpc_config
 
+RATE_LIMITER_SWEEP_INTERVAL = 60  # seconds between idle-limiter sweeps
+RATE_LIMITER_MAX_IDLE = 3600  # drop a client's limiter after this long unseen
+
+def json_dumps(data: Any) -> bytes:
+    """Serialize a response body to compact UTF-8 JSON"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+def json_loads(data) -> Any:
+    """Parse JSON from bytes or str (raises json.JSONDecodeError on bad input)"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
 class JSONRPCError(Exception):
     """JSON-RPC 2.0 error"""
     
@@ -46,79 +67,71 @@ class RPCErrorCodes:
 class GSCRPCHandler(BaseHTTPRequestHandler):
     """JSON-RPC 2.0 request handler with security features"""
     
-    # Class-level rate limiter
-    rate_limiters = ThreadSafeDict[str, RateLimiter]()
+    # Class-level rate limiters, striped by client IP so clients don't contend on one lock
+    rate_limiters = ShardedDict(16)
+    
+    # RPC method names, each dispatched to the handler method of the same name.
+    # Built once at import; handlers are instantiated per connection.
+    RPC_METHOD_NAMES = (
+        # Blockchain methods
+        'getblockchaininfo',
+        'getblock',
+        'getblockhash',
+        'getblockcount',
+        'getbestblockhash',
+        'getchaintips',
+        'getdifficulty',
+        
+        # Transaction methods
+        'getrawtransaction',
+        'sendrawtransaction',
+        'decoderawtransaction',
+        'getmempoolinfo',
+        'getrawmempool',
+        
+        # Wallet methods
+        'getwalletinfo',
+        'getbalance',
+        'listaddressgroupings',
+        'sendtoaddress',
+        'getnewaddress',
+        'validateaddress',
+        
+        # Mining methods
+        'getmininginfo',
+        'generateblock',
+        'generatetoaddress',
+        
+        # Network methods
+        'getconnectioncount',
+        'getpeerinfo',
+        'getnetworkinfo',
+        
+        # Utility methods
+        'help',
+        'stop',
+        'uptime',
+    )
+    rpc_methods = frozenset(RPC_METHOD_NAMES)
+    sorted_rpc_methods = tuple(sorted(RPC_METHOD_NAMES))
+    
+    # (inputs, serialized body) of the last "/" landing response
+    _landing = (None, b'')
     
     def __init__(self, blockchain, wallet_manager, *args, **kwargs):
         self.blockchain = blockchain
         self.wallet_manager = wallet_manager
-        self.rpc_methods = self._register_methods()
         super().__init__(*args, **kwargs)
     
-    def _register_methods(self) -> Dict[str, Callable]:
-        """Register all RPC methods"""
-        return {
-            # Blockchain methods
-            'getblockchaininfo': self.getblockchaininfo,
-            'getblock': self.getblock,
-            'getblockhash': self.getblockhash,
-            'getblockcount': self.getblockcount,
-            'getbestblockhash': self.getbestblockhash,
-            'getchaintips': self.getchaintips,
-            'getdifficulty': self.getdifficulty,
-            
-            # Transaction methods
-            'getrawtransaction': self.getrawtransaction,
-            'sendrawtransaction': self.sendrawtransaction,
-            'decoderawtransaction': self.decoderawtransaction,
-            'getmempoolinfo': self.getmempoolinfo,
-            'getrawmempool': self.getrawmempool,
-            
-            # Wallet methods
-            'getwalletinfo': self.getwalletinfo,
-            'getbalance': self.getbalance,
-            'listaddressgroupings': self.listaddressgroupings,
-            'sendtoaddress': self.sendtoaddress,
-            'getnewaddress': self.getnewaddress,
-            'validateaddress': self.validateaddress,
-            
-            # Mining methods
-            'getmininginfo': self.getmininginfo,
-            'generateblock': self.generateblock,
-            'generatetoaddress': self.generatetoaddress,
-            
-            # Network methods
-            'getconnectioncount': self.getconnectioncount,
-            'getpeerinfo': self.getpeerinfo,
-            'getnetworkinfo': self.getnetworkinfo,
-            
-            # Utility methods
-            'help': self.help,
-            'stop': self.stop,
-            'uptime': self.uptime
-        }
-    
     def log_message(self, format, *args):
         """Override to use our logger"""
         pass  # Suppress default logging
     
     def do_GET(self):
         """Handle GET requests"""
-        # Add CORS headers for cross-origin requests
-        self._add_cors_headers()
-        
+        # CORS headers go out with the response (_send_body), after the status line
         if self.path == '/':
-            network_info = rpc_config.get_network_info()
-            self._send_response({
-                "name": "GSC Coin RPC Server",
-                "version": "1.0.0",
-                "protocol": "JSON-RPC 2.0",
-                "methods": list(self.rpc_methods.keys()),
-                "description": "Bitcoin-compatible RPC server for GSC Coin",
-                "network_info": network_info,
-                "external_access": "Enabled - Accepting connections from all IPs",
-                "security": "Rate limiting enabled" if rpc_config.config["rate_limit_enabled"] else "No rate limiting"
-            })
+            self._send_body(self._landing_body())
         elif self.path == '/status':
             connectivity = rpc_config.test_connectivity()
             self._send_response({
@@ -130,18 +143,38 @@ class GSCRPCHandler(BaseHTTPRequestHandler):
         else:
             self._send_error(404, "Not Found")
     
+    @classmethod
+    def _landing_body(cls) -> bytes:
+        """Serialized "/" response, rebuilt only when its inputs change"""
+        config = rpc_config.config
+        key = (rpc_config.get_local_ip(), rpc_config.get_public_ip(),
+               config["rpc_host"], config["rpc_port"], config["rate_limit_enabled"])
+        cached_key, body = cls._landing
+        if key == cached_key:
+            return body
+        
+        body = json_dumps({
+            "name": "GSC Coin RPC Server",
+            "version": "1.0.0",
+            "protocol": "JSON-RPC 2.0",
+            "methods": list(cls.sorted_rpc_methods),
+            "description": "Bitcoin-compatible RPC server for GSC Coin",
+            "network_info": rpc_config.get_network_info(),
+            "external_access": "Enabled - Accepting connections from all IPs",
+            "security": "Rate limiting enabled" if config["rate_limit_enabled"] else "No rate limiting"
+        })
+        cls._landing = (key, body)
+        return body
+    
     def do_OPTIONS(self):
         """Handle OPTIONS requests for CORS preflight"""
-        self._add_cors_headers()
         self.send_response(200)
+        self._add_cors_headers()
         self.end_headers()
     
     def do_POST(self):
         """Handle POST requests for JSON-RPC calls"""
         try:
-            # Add CORS headers
-            self._add_cors_headers()
-            
             # Check IP allowlist
             client_ip = self.client_address[0]
             if not rpc_config.is_ip_allowed(client_ip):
@@ -166,7 +199,7 @@ class GSCRPCHandler(BaseHTTPRequestHandler):
             post_data = self.rfile.read(content_length)
             
             try:
-                request = json.loads(post_data.decode('utf-8'))
+                request = json_loads(post_data)
             except json.JSONDecodeError as e:
                 self._send_jsonrpc_error(RPCErrorCodes.PARSE_ERROR, f"Parse error: {str(e)}")
                 return
@@ -181,12 +214,24 @@ class GSCRPCHandler(BaseHTTPRequestHandler):
     
     def _check_rate_limit(self, client_ip: str) -> bool:
         """Check if client is rate limited"""
-        if client_ip not in self.rate_limiters:
+        limiter = self.rate_limiters.get(client_ip)
+        if limiter is None:
             max_calls = rpc_config.config["rate_limit_requests"]
             time_window = rpc_config.config["rate_limit_window"]
-            self.rate_limiters.set(client_ip, RateLimiter(max_calls=max_calls, time_window=time_window))
+            limiter = self.rate_limiters.setdefault(
+                client_ip, RateLimiter(max_calls=max_calls, time_window=time_window))
         
-        return self.rate_limiters.get(client_ip).is_allowed()
+        return limiter.is_allowed()
+    
+    @classmethod
+    def prune_rate_limiters(cls, max_idle: float = RATE_LIMITER_MAX_IDLE) -> int:
+        """Forget limiters for clients not seen within max_idle seconds"""
+        pruned = 0
+        for client_ip, limiter in cls.rate_limiters.items():
+            if limiter.idle_for() > max_idle:
+                cls.rate_limiters.remove(client_ip)
+                pruned += 1
+        return pruned
     
     def _process_jsonrpc_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
         """Process JSON-RPC 2.0 request"""
@@ -213,7 +258,7 @@ class GSCRPCHandler(BaseHTTPRequestHandler):
             raise JSONRPCError(RPCErrorCodes.METHOD_NOT_FOUND, f"Method '{method}' not found")
         
         try:
-            result = self.rpc_methods[method](params)
+            result = getattr(self, method)(params)
             
             return {
                 "jsonrpc": "2.0",
@@ -237,20 +282,22 @@ class GSCRPCHandler(BaseHTTPRequestHandler):
     
     def _send_response(self, data: Dict[str, Any]) -> None:
         """Send JSON response"""
-        response_json = json.dumps(data, indent=2)
-        
+        self._send_body(json_dumps(data))
+    
+    def _send_body(self, response_bytes: bytes) -> None:
+        """Send an already serialized JSON response"""
         self.send_response(200)
         self.send_header('Content-Type', 'application/json')
-        self.send_header('Content-Length', str(len(response_json)))
+        self.send_header('Content-Length', str(len(response_bytes)))
         self._add_cors_headers()
         self.end_headers()
         
-        self.wfile.write(response_json.encode('utf-8'))
+        self.wfile.write(response_bytes)
         
         # Log request if enabled
         if rpc_config.config["log_requests"]:
             client_ip = self.client_address[0]
-            rpc_logger.info(f"RPC response sent to {client_ip}: {len(response_json)} bytes")
+            rpc_logger.info(f"RPC response sent to {client_ip}: {len(response_bytes)} bytes")
     
     def _send_jsonrpc_error(self, code: int, message: str, data: Any = None) -> None:
         """Send JSON-RPC error response"""
@@ -440,7 +487,7 @@ class GSCRPCHandler(BaseHTTPRequestHandler):
             raise JSONRPCError(RPCErrorCodes.INVALID_PARAMS, "Transaction hex required")
         
         try:
-            tx_data = json.loads(params[0])
+            tx_data = json_loads(params[0])
             from blockchain_improved import Transaction
             
             tx = Transaction(**tx_data)
@@ -460,7 +507,7 @@ class GSCRPCHandler(BaseHTTPRequestHandler):
             raise JSONRPCError(RPCErrorCodes.INVALID_PARAMS, "Transaction hex required")
         
         try:
-            tx_data = json.loads(params[0])
+            tx_data = json_loads(params[0])
             return tx_data
         except Exception as e:
             raise JSONRPCError(RPCErrorCodes.INVALID_PARAMS, f"Invalid transaction: {str(e)}")
@@ -738,7 +785,7 @@ class GSCRPCHandler(BaseHTTPRequestHandler):
             else:
                 raise JSONRPCError(RPCErrorCodes.METHOD_NOT_FOUND, f"Method '{method}' not found")
         
-        return "Available methods: " + ", ".join(sorted(self.rpc_methods.keys()))
+        return "Available methods: " + ", ".join(self.sorted_rpc_methods)
     
     def stop(self, params: List[Any]) -> str:
         """Stop the RPC server"""
@@ -778,6 +825,9 @@ class GSCRPCServer:
             self.server_thread = threading.Thread(target=self._run_server, daemon=True)
             self.server_thread.start()
             
+            # Bound the limiter map under IP scans
+            threading.Thread(target=self._sweep_rate_limiters, daemon=True).start()
+            
             rpc_logger.info(f"RPC Server started on http://{self.host}:{self.port}")
             return True
             
@@ -793,6 +843,14 @@ class GSCRPCServer:
             if self.running:
                 rpc_logger.error(f"RPC server error: {e}")
     
+    def _sweep_rate_limiters(self) -> None:
+        """Periodically drop idle per-client rate limiters"""
+        while self.running:
+            time.sleep(RATE_LIMITER_SWEEP_INTERVAL)
+            pruned = GSCRPCHandler.prune_rate_limiters()
+            if pruned:
+                rpc_logger.info(f"Pruned {pruned} idle rate limiters")
+    
     def stop(self) -> None:
         """Stop RPC server"""
         self.running = False
@@ -10,6 +10,7 @@ import sys
 import time
 import threading
 import json
+import socket
 import requests
 from unittest.mock import Mock, patch, MagicMock
 
@@ -17,7 +18,8 @@ from unittest.mock import Mock, patch, MagicMock
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from blockchain_improved import GSCBlockchain, Transaction, Block
-from network_improved import GSCNetworkNode, MessageValidator, BanscoreManager
+from network_improved import (GSCNetworkNode, MessageValidator, BanscoreManager, MessageCodec,
+                              FRAME_HEADER, MSGPACK_AVAILABLE)
 from rpc_server_improved import GSCRPCServer, RPCErrorCodes
 from wallet_manager import WalletManager
 from gsc_logger import blockchain_logger, network_logger, rpc_logger
@@ -301,6 +303,861 @@ class TestNetwork(unittest.TestCase):
         self.assertEqual(peer_info.node_id, 'test123')
         self.assertEqual(peer_info.version, 1)
 
+class TestWireProtocol(unittest.TestCase):
+    """Test framing, codec negotiation and peer session handling"""
+    
+    def setUp(self):
+        """Run each test in a scratch directory (the node persists bans and peers)"""
+        self.old_cwd = os.getcwd()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        os.chdir(self.tmpdir.name)
+        self.blockchain = Mock()
+        self.blockchain.chain = []
+        self.node = GSCNetworkNode(self.blockchain, port=18445)
+    
+    def tearDown(self):
+        """Clean up after tests"""
+        self.node.running = False
+        os.chdir(self.old_cwd)
+        self.tmpdir.cleanup()
+    
+    def read_message(self, sock):
+        """Read one length-prefixed message from a socket"""
+        (length,) = FRAME_HEADER.unpack(self.node.recv_exact(sock, FRAME_HEADER.size))
+        return MessageCodec.decode(self.node.recv_exact(sock, length))
+    
+    def start_session(self, address=('10.1.1.1', 4000)):
+        """Run handle_peer on one end of a socketpair, returning the other end"""
+        ours, theirs = socket.socketpair()
+        self.addCleanup(ours.close)
+        self.node.running = True
+        thread = threading.Thread(target=self.node.handle_peer, args=(theirs, address), daemon=True)
+        thread.start()
+        return ours, thread
+    
+    def test_frame_round_trip_per_codec(self):
+        """Test every supported codec survives framing over a socket"""
+        message = {'type': 'addr', 'addresses': ['1.2.3.4:8333', '5.6.7.8:8333'], 'n': 3}
+        for codec in MessageCodec.SUPPORTED:
+            a, b = socket.socketpair()
+            try:
+                self.assertTrue(self.node.send_frame(a, self.node.encode_frame(message, codec)))
+                self.assertEqual(self.read_message(b), message)
+            finally:
+                a.close()
+                b.close()
+    
+    def test_codec_sniffing_and_negotiation(self):
+        """Test JSON bodies are detected by their first byte and codecs fall back to JSON"""
+        self.assertEqual(MessageCodec.decode(b'{"type":"ping"}'), {'type': 'ping'})
+        self.assertEqual(MessageCodec.negotiate([]), MessageCodec.JSON)
+        self.assertEqual(MessageCodec.negotiate(['zstd', 'json']), MessageCodec.JSON)
+        
+        if MSGPACK_AVAILABLE:
+            self.assertEqual(MessageCodec.negotiate(['json', 'msgpack']), MessageCodec.MSGPACK)
+            body = MessageCodec.encode({'type': 'ping'}, MessageCodec.MSGPACK)
+            self.assertNotEqual(body[:1], b'{')
+            self.assertEqual(MessageCodec.decode(body), {'type': 'ping'})
+    
+    def test_version_is_json_then_codec_switches(self):
+        """Test the version message is always JSON and replies follow the negotiated codec"""
+        sock, _ = self.start_session()
+        
+        # Nothing negotiated yet, so our version must be readable by any peer
+        (length,) = FRAME_HEADER.unpack(self.node.recv_exact(sock, FRAME_HEADER.size))
+        body = self.node.recv_exact(sock, length)
+        self.assertEqual(body[:1], b'{')
+        self.assertEqual(json.loads(body)['type'], 'version')
+        
+        version = {'type': 'version', 'version': 1, 'node_id': 'peer', 'timestamp': time.time(),
+                   'codecs': MessageCodec.SUPPORTED}
+        sock.sendall(self.node.encode_frame(version, MessageCodec.JSON))
+        
+        (length,) = FRAME_HEADER.unpack(self.node.recv_exact(sock, FRAME_HEADER.size))
+        body = self.node.recv_exact(sock, length)
+        self.assertEqual(MessageCodec.decode(body), {'type': 'verack'})
+        self.assertEqual(body[:1] == b'{', MessageCodec.SUPPORTED[0] == MessageCodec.JSON)
+    
+    def test_flush_outbox_handles_short_writes(self):
+        """Test queued frames larger than the socket buffer arrive intact"""
+        a, b = socket.socketpair()
+        self.addCleanup(a.close)
+        self.addCleanup(b.close)
+        a.settimeout(10)
+        frames = [FRAME_HEADER.pack(len(p)) + p for p in (b'x' * 300000, b'', b'y' * 7)] * 3
+        expected = b''.join(frames)
+        
+        received = bytearray()
+        def reader():
+            while len(received) < len(expected):
+                received.extend(b.recv(65536))
+        thread = threading.Thread(target=reader)
+        thread.start()
+        self.node._flush_outbox({a: frames})
+        thread.join(10)
+        
+        self.assertEqual(bytes(received), expected)
+        self.assertEqual(self.node.messages_sent.get(), len(frames))
+    
+    def test_flush_outbox_drops_stalled_peer(self):
+        """Test a peer that never reads is closed without delaying one that does"""
+        slow, slow_peer = socket.socketpair()
+        fast, fast_peer = socket.socketpair()
+        for sock in (slow, slow_peer, fast, fast_peer):
+            self.addCleanup(sock.close)
+            sock.settimeout(10)
+        frame = FRAME_HEADER.pack(1 << 20) + b'z' * (1 << 20)
+        
+        received = bytearray()
+        def reader():
+            while len(received) < 4 * len(frame):
+                received.extend(fast_peer.recv(65536))
+        thread = threading.Thread(target=reader)
+        thread.start()
+        self.node._flush_outbox({slow: [frame] * 4, fast: [frame] * 4}, timeout=0.5)
+        thread.join(10)
+        
+        self.assertEqual(len(received), 4 * len(frame))
+        with self.assertRaises(OSError):
+            slow.send(b'x')  # Shut down after stalling
+    
+    def test_flood_burst_does_not_ban(self):
+        """Test one burst of excess messages is penalised once, not per message"""
+        sock, _ = self.start_session()
+        for _ in range(30):
+            sock.sendall(self.node.encode_frame({'type': 'ping', 'timestamp': time.time()},
+                                                MessageCodec.JSON))
+        time.sleep(0.5)
+        
+        score = self.node.banscore_manager.peer_scores.get('10.1.1.1')
+        self.assertEqual(score.get(), GSCNetworkNode.FLOOD_SCORE)
+        self.assertFalse(self.node.banscore_manager.is_banned('10.1.1.1'))
+    
+    def test_banned_peer_session_closed(self):
+        """Test a peer's session ends once it is banned, with a single ban record"""
+        sock, thread = self.start_session()
+        self.node.banscore_manager.add_score('10.1.1.1', 100, 'Test ban')
+        self.node.banscore_manager.add_score('10.1.1.1', 100, 'Ignored once banned')
+        try:
+            # Wakes the session if it is still waiting on a read
+            sock.sendall(self.node.encode_frame({'type': 'verack'}, MessageCodec.JSON))
+        except OSError:
+            pass  # Already closed
+        thread.join(5)
+        
+        self.assertFalse(thread.is_alive())
+        with open(self.node.banscore_manager.bans_file) as f:
+            self.assertEqual(len(f.readlines()), 1)
+    
+    def test_ban_log_reload(self):
+        """Test bans and unbans replay from the append-only log"""
+        bans = self.node.banscore_manager
+        bans.ban_peer('10.0.0.1', 'first')
+        bans.ban_peer('10.0.0.2', 'second')
+        bans.unban_peer('10.0.0.1')
+        
+        reloaded = BanscoreManager()
+        self.assertFalse(reloaded.is_banned('10.0.0.1'))
+        self.assertTrue(reloaded.is_banned('10.0.0.2'))
+        self.assertEqual(reloaded.banned_peers.get('10.0.0.2')['reason'], 'second')
+        
+        # Compaction drops the superseded records, keeping live bans
+        with open(reloaded.bans_file) as f:
+            self.assertEqual(len(f.readlines()), 3)
+        reloaded.compact(force=True)
+        with open(reloaded.bans_file) as f:
+            self.assertEqual(len(f.readlines()), 1)
+    
+    def test_ban_manager_construction_is_side_effect_free(self):
+        """Test creating a ban manager starts no thread and writes no file"""
+        threads = threading.active_count()
+        bans = BanscoreManager()
+        self.assertEqual(threading.active_count(), threads)
+        self.assertFalse(os.path.exists(bans.bans_file))
+        
+        bans.compact(force=True)  # Nothing superseded, nothing to write
+        self.assertFalse(os.path.exists(bans.bans_file))
+        
+        bans.ban_peer('10.0.0.3', 'test')
+        self.assertTrue(os.path.exists(bans.bans_file))
+    
+    def test_known_blocks_reset_on_new_tip(self):
+        """Test cached block hits are dropped when the chain tip changes"""
+        self.blockchain.get_latest_block.return_value = Mock(hash='tip1')
+        self.blockchain.get_block_by_hash.return_value = Mock()
+        self.assertTrue(self.node.has_block('abc'))
+        
+        self.blockchain.get_block_by_hash.return_value = None
+        self.assertTrue(self.node.has_block('abc'))  # Served from the cache
+        
+        self.blockchain.get_latest_block.return_value = Mock(hash='tip2')
+        self.assertFalse(self.node.has_block('abc'))
+    
+    def test_restart_after_stop(self):
+        """Test a stopped node can start again and serve new peers"""
+        node = GSCNetworkNode(self.blockchain, port=0)
+        with patch.object(node, 'discover_peers'):
+            self.assertTrue(node.start_server())
+            node.stop_server()
+            self.assertTrue(node.start_server())
+        self.addCleanup(node.stop_server)
+        
+        sock = socket.create_connection(('127.0.0.1', node.server_socket.getsockname()[1]), timeout=5)
+        self.addCleanup(sock.close)
+        self.assertEqual(self.read_message(sock)['type'], 'version')
+        self.assertIsNotNone(node.schedule_connect('127.0.0.1', 1))
+    
+    def test_dns_prune_tolerates_concurrent_removal(self):
+        """Test a successful DNS lookup survives another thread pruning the same seed"""
+        seeder = self.node.dns_seeder
+        seeder.dns_cache.set('stale.seed', (0, []))
+        # The snapshot still lists a seed another lookup has already pruned
+        snapshot = [('gone.seed', (0, [])), ('stale.seed', (0, []))]
+        answers = [(socket.AF_INET, socket.SOCK_STREAM, 6, '', ('10.2.2.2', 8333))]
+        
+        with patch.object(seeder.dns_cache, 'items', return_value=snapshot), \
+                patch('network_improved.socket.getaddrinfo', return_value=answers):
+            self.assertEqual(seeder.get_peers_from_dns('live.seed'), ['10.2.2.2'])
+        self.assertNotIn('stale.seed', seeder.dns_cache)
+        self.assertIn('live.seed', seeder.dns_cache)
+
+class TestThreadSafety(unittest.TestCase):
+    """Test lock-striped maps and rate limiting primitives"""
+    
+    def test_sharded_dict(self):
+        """Test ShardedDict behaves like a dict across shards"""
+        from thread_safety import ShardedDict
+        
+        shards = ShardedDict(nshards=4)
+        for i in range(100):
+            shards[f"key{i}"] = i
+        
+        self.assertEqual(len(shards), 100)
+        self.assertEqual(shards.get('key42'), 42)
+        self.assertIn('key7', shards)
+        self.assertEqual(shards.setdefault('key7', -1), 7)
+        self.assertTrue(shards.remove('key7'))
+        self.assertFalse(shards.remove('key7'))
+        self.assertEqual(sorted(shards.values()), [i for i in range(100) if i != 7])
+    
+    def test_sharded_dict_concurrent_setdefault(self):
+        """Test concurrent setdefault returns one shared value per key"""
+        from thread_safety import ShardedDict
+        
+        shards = ShardedDict()
+        results = []
+        def worker():
+            results.append(shards.setdefault('peer', object()))
+        threads = [threading.Thread(target=worker) for _ in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(len({id(value) for value in results}), 1)
+    
+    def test_token_bucket(self):
+        """Test token bucket bursts to capacity then refills"""
+        from thread_safety import TokenBucket
+        
+        bucket = TokenBucket(capacity=3, refill_rate=20)
+        self.assertTrue(all(bucket.try_acquire() for _ in range(3)))
+        self.assertFalse(bucket.try_acquire())
+        self.assertGreater(bucket.wait_time(), 0)
+        
+        time.sleep(0.1)
+        self.assertTrue(bucket.try_acquire())
+    
+    def test_sliding_window_counter(self):
+        """Test sliding window estimate rises with hits and decays after the window"""
+        from thread_safety import SlidingWindowCounter
+        
+        window = SlidingWindowCounter(0.2)
+        estimates = [window.hit() for _ in range(5)]
+        self.assertEqual(estimates, sorted(estimates))
+        self.assertGreaterEqual(estimates[-1], 5)
+        
+        time.sleep(0.5)
+        self.assertLessEqual(window.hit(), 2)
+
+class TestLegacyNetworkBroadcast(unittest.TestCase):
+    """Test chain fanout in the legacy network module"""
+    
+    def setUp(self):
+        """Set up a node with two listening peers"""
+        import network
+        from blockchain import GSCBlockchain as LegacyBlockchain
+        
+        self.old_cwd = os.getcwd()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        os.chdir(self.tmpdir.name)
+        self.node = network.GSCNetworkNode(LegacyBlockchain(), port=0)
+        
+        self.received = {}
+        self.listeners = []
+        for _ in range(2):
+            listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            listener.bind(('127.0.0.1', 0))
+            listener.listen(1)
+            listener.settimeout(10)
+            address = f"127.0.0.1:{listener.getsockname()[1]}"
+            thread = threading.Thread(target=self.accept_one, args=(listener, address))
+            thread.start()
+            self.listeners.append((listener, thread))
+            self.node.peers.add(address)
+    
+    def tearDown(self):
+        """Clean up after tests"""
+        self.node.stop()
+        for listener, thread in self.listeners:
+            thread.join(10)
+            listener.close()
+        os.chdir(self.old_cwd)
+        self.tmpdir.cleanup()
+    
+    def accept_one(self, listener, address):
+        """Collect everything one connection sends"""
+        conn, _ = listener.accept()
+        data = bytearray()
+        with conn:
+            while chunk := conn.recv(65536):
+                data.extend(chunk)
+        self.received[address] = bytes(data)
+    
+    def test_broadcast_blockchain_serializes_once(self):
+        """Test the chain is encoded once and every live peer gets the same bytes"""
+        self.node.peers.add('127.0.0.1:1')  # Nothing listens here
+        
+        with patch('network.json.dumps', wraps=json.dumps) as dumps:
+            self.assertTrue(self.node.broadcast_blockchain())
+        self.assertEqual(dumps.call_count, 1)
+        
+        for _, thread in self.listeners:
+            thread.join(10)
+        payloads = set(self.received.values())
+        self.assertEqual(len(self.received), 2)
+        self.assertEqual(len(payloads), 1)
+        
+        message = json.loads(payloads.pop())
+        self.assertEqual(message['type'], 'blockchain_broadcast')
+        self.assertEqual(message['chain_length'], len(self.node.blockchain.chain))
+        self.assertNotIn('127.0.0.1:1', self.node.peers)  # Dead peer dropped
+    
+    def test_request_blockchain_from_peers(self):
+        """Test the chain request reaches every peer"""
+        self.assertTrue(self.node.request_blockchain_from_peers())
+        
+        for _, thread in self.listeners:
+            thread.join(10)
+        self.assertEqual(len(self.received), 2)
+        for payload in self.received.values():
+            self.assertEqual(json.loads(payload)['type'], 'get_blockchain')
+    
+    def test_broadcast_after_stop_and_restart(self):
+        """Test a stopped node neither raises nor drops peers, and works again once restarted"""
+        self.node.stop()
+        self.node.broadcast_message({'type': 'ping'})
+        self.assertEqual(self.node._dial_all(['127.0.0.1:1']), [])
+        self.assertEqual(len(self.node.peers), 2)
+        
+        with patch.object(self.node, 'discover_peers'):
+            self.assertTrue(self.node.start_server())
+        self.assertTrue(self.node.request_blockchain_from_peers())
+        
+        for _, thread in self.listeners:
+            thread.join(10)
+        self.assertEqual(len(self.received), 2)
+
+class TestMainnetNetwork(unittest.TestCase):
+    """Test block sync and mempool exchange in the mainnet network node"""
+    
+    def setUp(self):
+        """Set up a node whose data directory is a temporary folder"""
+        from concurrent.futures import ThreadPoolExecutor
+        from mainnet.config import Config
+        from mainnet.mainnet_blockchain import MainnetBlockchain
+        from mainnet.mainnet_network import MainnetNetworkNode
+        
+        self.tmpdir = tempfile.TemporaryDirectory()
+        data_dir = patch.object(Config, 'DATA_DIR', self.tmpdir.name)
+        data_dir.start()
+        self.addCleanup(data_dir.stop)
+        
+        self.blockchain = MainnetBlockchain()
+        self.node = MainnetNetworkNode(self.blockchain, port=0)
+        # One validator worker is the tightest pool the node can run with
+        self.node._validator = ThreadPoolExecutor(max_workers=1)
+        self.node._block_sequencer = ThreadPoolExecutor(max_workers=1)
+    
+    def tearDown(self):
+        """Clean up after tests"""
+        self.node._validator.shutdown(wait=True)
+        self.node._block_sequencer.shutdown(wait=True)
+        self.tmpdir.cleanup()
+    
+    def make_blocks(self, count):
+        """Build blocks extending the current tip"""
+        from mainnet.mainnet_blockchain import MainnetBlock
+        
+        blocks = []
+        previous = self.blockchain.get_latest_block()
+        for _ in range(count):
+            previous = MainnetBlock(previous.index + 1, time.time(), [], previous.hash)
+            blocks.append(previous)
+        return blocks
+    
+    def wait_for_sync(self):
+        """Wait until every queued block batch has been added"""
+        self.node._block_sequencer.submit(lambda: None).result(timeout=10)
+    
+    def test_back_to_back_blocks_messages(self):
+        """Test two BLOCKS messages in a row both reach the chain in order"""
+        from mainnet.mainnet_network import NetworkMessage
+        
+        blocks = self.make_blocks(4)
+        peer = Mock()
+        for batch in (blocks[:2], blocks[2:]):
+            message = NetworkMessage(NetworkMessage.BLOCKS, {'blocks': [b.to_dict() for b in batch]})
+            self.node._handle_blocks(peer, message)
+        
+        self.wait_for_sync()
+        self.assertEqual([b.hash for b in self.blockchain.chain[1:]], [b.hash for b in blocks])
+        self.assertEqual(self.node.stats['blocks_synced'], 4)
+    
+    def test_synced_blocks_survive_replay(self):
+        """Test a block mined on top of synced blocks is replayed after a crash"""
+        from mainnet.mainnet_blockchain import MainnetBlockchain
+        from mainnet.mainnet_network import NetworkMessage
+        
+        synced = self.make_blocks(2)
+        message = NetworkMessage(NetworkMessage.BLOCKS, {'blocks': [b.to_dict() for b in synced]})
+        self.node._handle_blocks(Mock(), message)
+        self.wait_for_sync()
+        
+        mined = self.make_blocks(1)[0]
+        self.blockchain.chain.append(mined)
+        self.blockchain.append_block_to_disk(mined)
+        
+        # No snapshot was written, so loading replays the block log
+        restored = MainnetBlockchain()
+        restored.load_blockchain()
+        self.assertEqual([b.hash for b in restored.chain], [b.hash for b in self.blockchain.chain])
+    
+    def test_replay_warns_on_gap(self):
+        """Test a logged block that does not extend the tip is reported"""
+        from mainnet.mainnet_blockchain import MainnetBlockchain
+        
+        orphan = self.make_blocks(2)[1]
+        self.blockchain.append_block_to_disk(orphan)
+        
+        restored = MainnetBlockchain()
+        with self.assertLogs('mainnet.mainnet_blockchain', level='WARNING') as logs:
+            restored.load_blockchain()
+        self.assertEqual(len(restored.chain), 1)
+        self.assertIn('does not extend the chain', logs.output[0])
+    
+    def test_replay_stops_at_corrupt_record(self):
+        """Test startup survives a block log whose last record is damaged"""
+        import struct
+        from mainnet.config import Config
+        from mainnet.mainnet_blockchain import MainnetBlockchain
+        
+        good = self.make_blocks(1)[0]
+        self.blockchain.append_block_to_disk(good)
+        with open(Config.get_block_log_path(), 'ab') as f:
+            for record in (b'{"index": 2}', b'[1, 2]'):  # Missing fields, wrong type
+                f.write(struct.pack('!I', len(record)) + record)
+            f.write(struct.pack('!I', 100) + b'{"ind')  # Cut off mid-write
+        
+        restored = MainnetBlockchain()
+        with self.assertLogs('mainnet.mainnet_blockchain', level='WARNING') as logs:
+            restored.load_blockchain()
+        self.assertEqual([b.hash for b in restored.chain[1:]], [good.hash])
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn('stopping replay', logs.output[0])
+    
+    def make_transactions(self):
+        """Build a couple of unsigned transactions"""
+        from mainnet.mainnet_blockchain import MainnetTransaction
+        
+        return [MainnetTransaction('GSC1sender', 'GSC1receiver', 1.5 + i, 0.01, time.time() + i)
+                for i in range(2)]
+    
+    def test_mempool_payload_round_trip(self):
+        """Test both mempool payload shapes decode to the original transactions"""
+        from mainnet.mainnet_network import NetworkMessage, encode_mempool, decode_mempool
+        
+        transactions = self.make_transactions()
+        expected = [tx.to_dict() for tx in transactions]
+        for compact in (True, False):
+            message = NetworkMessage(NetworkMessage.MEMPOOL, encode_mempool(transactions, compact))
+            received = NetworkMessage.from_bytes(message.to_bytes()[4:])
+            self.assertEqual(decode_mempool(received.payload), expected)
+    
+    def test_mempool_dump_is_consumed(self):
+        """Test a mempool dump is added to ours instead of answered like a request"""
+        from mainnet.mainnet_network import NetworkMessage, encode_mempool
+        
+        transactions = self.make_transactions()
+        peer = Mock(addr_str='127.0.0.1:1', address=('127.0.0.1', 1))
+        with patch.object(self.blockchain, 'add_transaction_to_mempool', return_value=(True, 'ok')) as add:
+            for compact in (True, False):
+                message = NetworkMessage(NetworkMessage.MEMPOOL, encode_mempool(transactions, compact))
+                self.node._process_message(peer, message)
+        
+        self.assertEqual([call.args[0].tx_id for call in add.call_args_list],
+                         [tx.tx_id for tx in transactions] * 2)
+        peer.send_message.assert_not_called()
+    
+    def test_mempool_request_matches_peer_version(self):
+        """Test compact dumps only go to peers that advertised support for them"""
+        from mainnet.mainnet_network import NetworkMessage, COMPACT_MEMPOOL_VERSION
+        
+        self.blockchain.mempool = self.make_transactions()
+        for version, key in ((1, 'transactions'), (COMPACT_MEMPOOL_VERSION, 'rows')):
+            peer = Mock(version=version)
+            self.node._process_message(peer, NetworkMessage(NetworkMessage.MEMPOOL, {}))
+            reply = peer.send_message.call_args.args[0]
+            self.assertIn(key, reply.payload)
+    
+    def test_force_mempool_sync_returns_on_dump(self):
+        """Test a forced sync stops waiting as soon as a peer's mempool arrives"""
+        from mainnet.mainnet_network import NetworkMessage, encode_mempool
+        from mainnet.mempool_sync import MempoolSyncManager
+        
+        sync = MempoolSyncManager(self.blockchain, self.node)
+        peer = Mock(addr_str='127.0.0.1:1', address=('127.0.0.1', 1), is_alive=True, last_mempool_req=0)
+        dump = NetworkMessage(NetworkMessage.MEMPOOL, encode_mempool(self.make_transactions()))
+        
+        def answer(_payload):
+            # The peer's reply arrives on its reader thread
+            threading.Thread(target=self.node._process_message, args=(peer, dump)).start()
+        peer.send_raw.side_effect = answer
+        self.node.peers[peer.addr_str] = peer
+        
+        started = time.monotonic()
+        with patch.object(self.blockchain, 'add_transaction_to_mempool', return_value=(True, 'ok')):
+            sync.force_mempool_sync()
+        self.assertLess(time.monotonic() - started, 1.5)
+        peer.send_raw.assert_called_once()
+    
+    def test_peer_transactions_record_source(self):
+        """Test transactions relayed or dumped by a peer are attributed to it"""
+        from mainnet.mainnet_network import NetworkMessage, encode_mempool
+        from mainnet.mempool_sync import MempoolSyncManager
+        
+        sync = MempoolSyncManager(self.blockchain, self.node)
+        peer = Mock(addr_str='127.0.0.1:1', address=('127.0.0.1', 1))
+        relayed, dumped = self.make_transactions()
+        with patch.object(self.blockchain, 'add_transaction_to_mempool', return_value=(True, 'ok')):
+            self.node._process_message(peer, NetworkMessage(NetworkMessage.TX, {'transaction': relayed.to_dict()}))
+            self.node._process_message(peer, NetworkMessage(NetworkMessage.MEMPOOL, encode_mempool([dumped])))
+        
+        self.assertEqual(sync.transaction_sources[relayed.tx_id], '127.0.0.1:1')
+        self.assertEqual(sync.transaction_sources[dumped.tx_id], '127.0.0.1:1')
+    
+    def test_relay_sends_outside_node_lock(self):
+        """Test relaying a transaction doesn't hold the node lock while writing to peers"""
+        from mainnet.mainnet_network import new_known_tx_filter
+        
+        lock_free_during_send = []
+        
+        def probe():
+            acquired = self.node.lock.acquire(timeout=1)
+            if acquired:
+                self.node.lock.release()
+            lock_free_during_send.append(acquired)
+        
+        def send_raw(_payload):
+            # Another thread must be able to take the node lock mid-send
+            thread = threading.Thread(target=probe)
+            thread.start()
+            thread.join()
+            return True
+        
+        source, target = Mock(relay=True), Mock(relay=True, known_tx=new_known_tx_filter())
+        target.send_raw.side_effect = send_raw
+        self.node.peers.update({'10.0.0.1:1': source, '10.0.0.2:1': target})
+        
+        tx = self.make_transactions()[0]
+        self.node._relay_transaction(tx, exclude_peer=source)
+        self.node._relay_transaction(tx, exclude_peer=source)  # Already known: not resent
+        
+        self.assertEqual(lock_free_during_send, [True])
+        source.send_raw.assert_not_called()
+    
+    def test_broadcast_block_sends_one_frame_per_peer(self):
+        """Test a block broadcast writes one uncorked frame to each peer"""
+        peers = [Mock(), Mock()]
+        self.node.peers.update({'10.0.0.1:1': peers[0], '10.0.0.2:1': peers[1]})
+        
+        self.node.broadcast_block(self.make_blocks(1)[0])
+        for peer in peers:
+            peer.send_raw.assert_called_once()
+            peer.corked.assert_not_called()
+    
+    def test_known_tx_add_if_new_is_atomic(self):
+        """Test only one of many racing threads claims a tx id as new"""
+        from mainnet.mainnet_network import new_known_tx_filter
+        
+        known = new_known_tx_filter()
+        for round_id in range(50):
+            tx_id = f"tx{round_id}"
+            barrier = threading.Barrier(8)
+            claims = []
+            
+            def claim():
+                barrier.wait()
+                claims.append(known.add_if_new(tx_id))
+            
+            threads = [threading.Thread(target=claim) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(claims.count(True), 1)
+            self.assertIn(tx_id, known)
+
+
+class TestMainnetMining(unittest.TestCase):
+    """Test parallel mining in the mainnet blockchain"""
+    
+    def test_stop_event_abandons_block(self):
+        """Test setting the stop event ends parallel mining without adding a block"""
+        from concurrent.futures import ThreadPoolExecutor
+        from mainnet.config import Config
+        from mainnet.mainnet_blockchain import MainnetBlockchain
+        
+        blockchain = MainnetBlockchain()
+        blockchain.difficulty = 64  # Unreachable target
+        stop_event = threading.Event()
+        threading.Timer(0.2, stop_event.set).start()
+        
+        started = time.monotonic()
+        with patch.object(Config, 'MINING_CHUNK_SIZE', 1000), ThreadPoolExecutor(max_workers=2) as executor:
+            block = blockchain.mine_pending_transactions(
+                'GSC1miner', force_mine=True, executor=executor, workers=2, stop_event=stop_event
+            )
+        
+        self.assertIsNone(block)
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual(len(blockchain.chain), 1)
+
+
+class TestMainnetWallet(unittest.TestCase):
+    """Test mainnet wallet storage, migration and signing"""
+    
+    PASSWORD = "correct horse battery staple"
+    
+    def setUp(self):
+        """Point the wallet data directory at a temporary folder"""
+        from mainnet.config import Config
+        
+        self.tmpdir = tempfile.TemporaryDirectory()
+        data_dir = patch.object(Config, 'DATA_DIR', self.tmpdir.name)
+        data_dir.start()
+        self.addCleanup(data_dir.stop)
+        self.wallet_dir = os.path.join(self.tmpdir.name, Config.WALLET_DIR)
+        os.makedirs(self.wallet_dir)
+    
+    def tearDown(self):
+        """Clean up after tests"""
+        self.tmpdir.cleanup()
+    
+    def open_manager(self):
+        """Open a wallet manager on the temporary data directory"""
+        from mainnet.mainnet_wallet import MainnetWalletManager
+        
+        manager = MainnetWalletManager()
+        self.addCleanup(manager.db.close)
+        self.addCleanup(manager.flush)  # Runs first: cancels any pending flush timer
+        return manager
+    
+    def legacy_rsa_keys(self):
+        """Generate an RSA key pair in the PEM form pre-Ed25519 wallets stored"""
+        from cryptography.hazmat.primitives import serialization
+        from cryptography.hazmat.primitives.asymmetric import rsa
+        
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        private_pem = private_key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption()
+        )
+        public_pem = private_key.public_key().public_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PublicFormat.SubjectPublicKeyInfo
+        )
+        return private_pem, public_pem
+    
+    def encrypt_legacy_key(self, private_pem):
+        """Encrypt a key the way legacy wallets did (100000 PBKDF2 rounds, no count stored)"""
+        import base64
+        import hashlib
+        from cryptography.fernet import Fernet
+        
+        salt = os.urandom(32)
+        derived = hashlib.pbkdf2_hmac('sha256', self.PASSWORD.encode('utf-8'), salt, 100000, dklen=32)
+        return Fernet(base64.urlsafe_b64encode(derived)).encrypt(private_pem), salt
+    
+    def write_legacy_wallet(self, name):
+        """Write an encrypted RSA wallet in the legacy per-wallet JSON format"""
+        import base64
+        from mainnet.mainnet_wallet import MainnetWallet
+        
+        private_pem, public_pem = self.legacy_rsa_keys()
+        encrypted, salt = self.encrypt_legacy_key(private_pem)
+        address = MainnetWallet._generate_address(None, public_pem)
+        wallet_data = {
+            'name': name,
+            'address': address,
+            'public_key': base64.b64encode(public_pem).decode('ascii'),
+            'is_encrypted': True,
+            'created_at': 1600000000.0,
+            'last_accessed': 1600000000.0,
+            'failed_attempts': 0,
+            'locked_until': 0,
+            'backup_created': False,
+            'transaction_history': [{'tx_id': 'abc', 'amount': 5.0}],
+            'encrypted_private_key': base64.b64encode(encrypted).decode('ascii'),
+            'salt': base64.b64encode(salt).decode('ascii')
+        }
+        path = os.path.join(self.wallet_dir, f"{name}.wallet")
+        with open(path, 'w') as f:
+            json.dump(wallet_data, f, indent=2)
+        return path, private_pem, address
+    
+    def test_legacy_json_wallet_migrates(self):
+        """Test a legacy RSA .wallet file moves into the database with its keys intact"""
+        from mainnet.mainnet_blockchain import MainnetBlockchain
+        
+        path, private_pem, address = self.write_legacy_wallet('legacy')
+        blockchain = MainnetBlockchain()
+        blockchain.balances[address] = 42.0
+        
+        manager = self.open_manager()
+        self.assertFalse(os.path.exists(path))
+        self.assertTrue(os.path.exists(path + '.migrated'))
+        
+        # Reopen from the database alone
+        wallet = self.open_manager().open_wallet('legacy', self.PASSWORD)
+        self.assertEqual(wallet.version, 1)
+        self.assertEqual(wallet.address, address)
+        self.assertEqual(wallet.private_key, private_pem)
+        self.assertEqual(wallet.transaction_history, [{'tx_id': 'abc', 'amount': 5.0}])
+        self.assertEqual(blockchain.get_balance(wallet.address), 42.0)
+        self.assertEqual(manager.list_wallets(), ['legacy'])
+    
+    def test_reopen_existing_database(self):
+        """Test wallets saved to wallets.db load again with the same keys and password"""
+        manager = self.open_manager()
+        created = manager.create_wallet('main', self.PASSWORD)
+        created.unlock(self.PASSWORD)
+        
+        wallet = self.open_manager().open_wallet('main', self.PASSWORD)
+        self.assertEqual(wallet.address, created.address)
+        self.assertEqual(wallet.public_key, created.public_key)
+        self.assertEqual(wallet.private_key, created.private_key)
+        self.assertFalse(wallet.unlock("wrong password"))
+    
+    def test_database_without_iterations_column(self):
+        """Test a wallets.db from before iteration counts were stored is upgraded in place"""
+        import sqlite3
+        from mainnet.config import Config
+        from mainnet.mainnet_wallet import MainnetWallet
+        
+        private_pem, public_pem = self.legacy_rsa_keys()
+        encrypted, salt = self.encrypt_legacy_key(private_pem)
+        address = MainnetWallet._generate_address(None, public_pem)
+        
+        db = sqlite3.connect(os.path.join(self.wallet_dir, Config.WALLET_DB))
+        db.execute("""CREATE TABLE wallets (
+            name TEXT PRIMARY KEY, version INTEGER, address TEXT, public_key BLOB,
+            private_key BLOB, encrypted_priv BLOB, salt BLOB, is_encrypted INTEGER,
+            created_at REAL, last_accessed REAL, failed_attempts INTEGER, locked_until REAL,
+            backup_created INTEGER, tx_history BLOB)""")
+        db.execute("INSERT INTO wallets VALUES (?, 1, ?, ?, NULL, ?, ?, 1, 0, 0, 0, 0, 0, NULL)",
+                   ('old', address, public_pem, encrypted, salt))
+        db.commit()
+        db.close()
+        
+        wallet = self.open_manager().open_wallet('old', self.PASSWORD)
+        self.assertEqual(wallet.iterations, 100000)
+        self.assertEqual(wallet.address, address)
+        self.assertEqual(wallet.private_key, private_pem)
+    
+    def assert_signature_round_trip(self, wallet):
+        """Sign a transaction and check it verifies only while unchanged"""
+        from mainnet.mainnet_blockchain import MainnetTransaction
+        from mainnet.mainnet_wallet import MainnetWallet
+        
+        tx = MainnetTransaction(wallet.address, 'GSC1receiver', 12.5, 0.01, time.time())
+        signature = wallet.sign_transaction(tx)
+        
+        self.assertTrue(wallet.verify_signature(tx, signature))
+        # Any wallet can check it given the sender's public key
+        verifier = MainnetWallet('verifier')
+        self.assertTrue(verifier.verify_signature(tx, signature, wallet.public_key))
+        
+        tx.amount = 125.0
+        self.assertFalse(wallet.verify_signature(tx, signature))
+        self.assertFalse(verifier.verify_signature(tx, signature, wallet.public_key))
+    
+    def test_ed25519_signature_round_trip(self):
+        """Test version 2 (Ed25519) wallets sign and verify"""
+        wallet = self.open_manager().create_wallet('ed', self.PASSWORD)
+        self.assertEqual(wallet.version, 2)
+        self.assertEqual(len(wallet.public_key), 32)
+        
+        self.assertTrue(wallet.unlock(self.PASSWORD))
+        self.assert_signature_round_trip(wallet)
+    
+    def test_legacy_rsa_signature_round_trip(self):
+        """Test version 1 (RSA) wallets still sign and verify"""
+        self.write_legacy_wallet('legacy')
+        wallet = self.open_manager().open_wallet('legacy', self.PASSWORD)
+        self.assertEqual(wallet.version, 1)
+        
+        self.assert_signature_round_trip(wallet)
+    
+    def test_last_accessed_flushed_on_close(self):
+        """Test a batched last_accessed update reaches the database when the wallet closes"""
+        manager = self.open_manager()
+        manager.create_wallet('main')
+        stored = lambda: manager.db.execute(
+            "SELECT last_accessed FROM wallets WHERE name = 'main'").fetchone()[0]
+        before = stored()
+        
+        time.sleep(0.01)
+        wallet = manager.open_wallet('main')
+        self.assertEqual(stored(), before)  # Still waiting on the flush timer
+        
+        manager.close_wallet()
+        self.assertEqual(stored(), wallet.last_accessed)
+        self.assertGreater(stored(), before)
+        self.assertIsNone(manager._touch_timer)
+    
+    def test_backup_restore_round_trip(self):
+        """Test a restored backup has the original keys and password"""
+        manager = self.open_manager()
+        original = manager.create_wallet('main', self.PASSWORD)
+        backup_path = os.path.join(self.tmpdir.name, 'main.backup')
+        self.assertTrue(manager.backup_wallet('main', backup_path, self.PASSWORD))
+        private_key = original.private_key
+        
+        manager.delete_wallet('main', self.PASSWORD)
+        restored = manager.restore_wallet(backup_path, self.PASSWORD)
+        self.assertEqual(restored.address, original.address)
+        self.assertEqual(restored.public_key, original.public_key)
+        self.assertEqual(restored.private_key, private_key)
+        self.assertEqual(restored.version, original.version)
+        self.assertTrue(restored.backup_created)
+        
+        # And it persists like any other wallet
+        reopened = self.open_manager().open_wallet('main', self.PASSWORD)
+        self.assertEqual(reopened.private_key, private_key)
+
+
 class TestRPC(unittest.TestCase):
     """Test RPC functionality"""
     
@@ -583,6 +1440,12 @@ def run_tests():
     test_classes = [
         TestBlockchain,
         TestNetwork,
+        TestWireProtocol,
+        TestThreadSafety,
+        TestLegacyNetworkBroadcast,
+        TestMainnetNetwork,
+        TestMainnetMining,
+        TestMainnetWallet,
         TestRPC,
         TestSecurity,
         TestIntegration
@@ -108,6 +108,11 @@ class ThreadSafeDict:
         with self._lock:
             del self._dict[key]
     
+    def pop(self, key: Any, default: Any = None) -> Any:
+        """Thread-safe pop (default if the key is already gone)"""
+        with self._lock:
+            return self._dict.pop(key, default)
+    
     def keys(self):
         """Thread-safe keys"""
         with self._lock:
@@ -137,6 +142,95 @@ class ThreadSafeDict:
         """Thread-safe update"""
         with self._lock:
             self._dict.update(other)
+    
+    def setdefault(self, key: Any, default: Any = None) -> Any:
+        """Thread-safe setdefault"""
+        with self._lock:
+            return self._dict.setdefault(key, default)
+
+class ShardedDict:
+    """Dictionary split across independently locked shards
+    
+    Writers only lock the shard owning the key. Single-key reads take no lock;
+    a plain dict lookup is atomic under the GIL.
+    """
+    
+    def __init__(self, nshards: int = 32):
+        # Power of two so the shard index is a mask
+        self._mask = (1 << max(0, nshards - 1).bit_length()) - 1
+        self._shards = [{} for _ in range(self._mask + 1)]
+        self._locks = [threading.Lock() for _ in range(self._mask + 1)]
+    
+    def _index(self, key: Any) -> int:
+        return hash(key) & self._mask
+    
+    def get(self, key: Any, default: Any = None) -> Any:
+        """Lock-free get"""
+        return self._shards[self._index(key)].get(key, default)
+    
+    def set(self, key: Any, value: Any) -> None:
+        """Thread-safe set"""
+        i = self._index(key)
+        with self._locks[i]:
+            self._shards[i][key] = value
+    
+    def __setitem__(self, key: Any, value: Any) -> None:
+        self.set(key, value)
+    
+    def __getitem__(self, key: Any) -> Any:
+        return self._shards[self._index(key)][key]
+    
+    def __contains__(self, key: Any) -> bool:
+        """Lock-free contains"""
+        return key in self._shards[self._index(key)]
+    
+    def __delitem__(self, key: Any) -> None:
+        i = self._index(key)
+        with self._locks[i]:
+            del self._shards[i][key]
+    
+    def remove(self, key: Any) -> bool:
+        """Thread-safe remove, returns False if the key was missing"""
+        i = self._index(key)
+        with self._locks[i]:
+            return self._shards[i].pop(key, _MISSING) is not _MISSING
+    
+    def setdefault(self, key: Any, default: Any = None) -> Any:
+        """Thread-safe setdefault"""
+        i = self._index(key)
+        with self._locks[i]:
+            return self._shards[i].setdefault(key, default)
+    
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+    
+    def items(self):
+        """Snapshot of all items, one shard at a time"""
+        result = []
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                result.extend(shard.items())
+        return result
+    
+    def keys(self):
+        return [key for key, _ in self.items()]
+    
+    def values(self):
+        return [value for _, value in self.items()]
+    
+    def copy(self) -> dict:
+        return dict(self.items())
+    
+    def update(self, other: dict) -> None:
+        for key, value in other.items():
+            self.set(key, value)
+    
+    def clear(self) -> None:
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                shard.clear()
+
+_MISSING = object()
 
 class AtomicCounter:
     """Thread-safe counter"""
@@ -167,39 +261,79 @@ class AtomicCounter:
         with self._lock:
             self._value = value
 
-class RateLimiter:
-    """Thread-safe rate limiter"""
+class TokenBucket:
+    """Thread-safe token bucket rate limiter with O(1) state"""
+    
+    def __init__(self, capacity: float, refill_rate: float):
+        self.capacity = capacity
+        self.refill_rate = refill_rate  # tokens per second
+        self.tokens = capacity
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.refill_rate)
+        self.last_refill = now
+    
+    def try_acquire(self, cost: float = 1) -> bool:
+        """Take tokens if enough are available"""
+        with self.lock:
+            self._refill(time.monotonic())
+            if self.tokens >= cost:
+                self.tokens -= cost
+                return True
+            return False
+    
+    def wait_time(self, cost: float = 1) -> float:
+        """Get time to wait before enough tokens are available"""
+        with self.lock:
+            self._refill(time.monotonic())
+            return max(0.0, (cost - self.tokens) / self.refill_rate)
+
+class RateLimiter(TokenBucket):
+    """Thread-safe rate limiter: max_calls per time_window as a token bucket
+    
+    O(1) per check with two floats of state, instead of a log of call times.
+    """
     
     def __init__(self, max_calls: int, time_window: float):
+        super().__init__(capacity=max_calls, refill_rate=max_calls / time_window)
         self.max_calls = max_calls
         self.time_window = time_window
-        self.calls = ThreadSafeList()
-        self.lock = threading.RLock()
     
     def is_allowed(self) -> bool:
         """Check if call is allowed"""
-        current_time = time.time()
-        
-        # Remove old calls outside time window
+        return self.try_acquire()
+    
+    def idle_for(self) -> float:
+        """Seconds since this limiter was last checked"""
+        return time.monotonic() - self.last_refill
+
+class SlidingWindowCounter:
+    """Approximate sliding-window event counter (current window plus weighted previous)"""
+    
+    __slots__ = ('window', 'current', 'previous', 'current_start', 'lock')
+    
+    def __init__(self, window: float = 1.0):
+        self.window = window
+        self.current = 0
+        self.previous = 0
+        self.current_start = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def hit(self) -> float:
+        """Record an event and return the estimated count over the last window"""
         with self.lock:
-            self.calls = ThreadSafeList([
-                call_time for call_time in self.calls
-                if current_time - call_time < self.time_window
-            ])
-            
-            if len(self.calls) < self.max_calls:
-                self.calls.append(current_time)
-                return True
+            now = time.monotonic()
+            elapsed = now - self.current_start
+            if elapsed >= self.window:
+                self.previous = self.current if elapsed < 2 * self.window else 0
+                self.current = 0
+                self.current_start = now - (elapsed % self.window)
             
-            return False
-    
-    def wait_time(self) -> float:
-        """Get time to wait before next allowed call"""
-        if len(self.calls) == 0:
-            return 0.0
-        
-        oldest_call = min(self.calls)
-        return max(0.0, self.time_window - (time.time() - oldest_call))
+            self.current += 1
+            weight = 1.0 - (now - self.current_start) / self.window
+            return self.previous * weight + self.current
 
 @contextmanager
 def timeout_context(seconds: float):